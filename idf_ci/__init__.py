@@ -7,14 +7,46 @@ __all__ = [
     'IdfPytestPlugin',
     'PytestApp',
     'PytestCase',
+    'PytestCaseRecord',
     'build',
     'get_all_apps',
     'get_ci_settings',
     'get_pytest_cases',
 ]
 
+import importlib
+import typing as t
 
-from idf_ci.envs import GitlabEnvVars
-from idf_ci.idf_pytest import IdfPytestPlugin, PytestApp, PytestCase, get_pytest_cases
-from idf_ci.scripts import build, get_all_apps
-from idf_ci.settings import CiSettings, get_ci_settings
+if t.TYPE_CHECKING:
+    from idf_ci.envs import GitlabEnvVars
+    from idf_ci.idf_pytest import IdfPytestPlugin, PytestApp, PytestCase, PytestCaseRecord, get_pytest_cases
+    from idf_ci.scripts import build, get_all_apps
+    from idf_ci.settings import CiSettings, get_ci_settings
+
+# the exported names are imported on first access, so that importing a light submodule, e.g. the CLI, doesn't import
+# pytest and idf-build-apps
+_LAZY_ATTRS = {
+    'CiSettings': 'idf_ci.settings',
+    'GitlabEnvVars': 'idf_ci.envs',
+    'IdfPytestPlugin': 'idf_ci.idf_pytest',
+    'PytestApp': 'idf_ci.idf_pytest',
+    'PytestCase': 'idf_ci.idf_pytest',
+    'PytestCaseRecord': 'idf_ci.idf_pytest',
+    'build': 'idf_ci.scripts',
+    'get_all_apps': 'idf_ci.scripts',
+    'get_ci_settings': 'idf_ci.settings',
+    'get_pytest_cases': 'idf_ci.idf_pytest',
+}
+
+
+def __getattr__(name: str) -> t.Any:
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> t.List[str]:
+    return sorted([*globals(), *_LAZY_ATTRS])
@@ -10,6 +10,16 @@ if sys.version_info < (3, 12):
 else:
     from typing import TypedDict  # noqa
 
+if sys.version_info < (3, 8):
+    from typing_extensions import Protocol
+else:
+    from typing import Protocol  # noqa
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    tomllib = None  # parse with tomlkit instead
+
 PathLike = t.Union[str, os.PathLike]
 
 
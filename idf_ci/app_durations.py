@@ -0,0 +1,207 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Build durations of the apps, and sharding the apps across parallel build jobs by them.
+
+Apps are keyed by (app dir relative to the current directory, target, config name), which stays the same across
+pipelines, unlike the build directories.
+"""
+
+import glob
+import json
+import logging
+import os
+import statistics
+import typing as t
+from collections import defaultdict
+
+from .app_list import LazyAppList
+from .utils import lpt_partition, project_relative_path
+
+if t.TYPE_CHECKING:
+    from idf_build_apps import App
+
+logger = logging.getLogger(__name__)
+
+AppKey = t.Tuple[str, str, str]
+
+
+def get_app_key(app: 'App') -> AppKey:
+    """Get the key of the app, which stays the same across pipelines.
+
+    :param app: App
+
+    :returns: Tuple of (app dir, target, config name)
+    """
+    return project_relative_path(app.app_dir, os.curdir), app.target, app.config_name or ''
+
+
+def dump_build_durations(apps: t.Iterable['App'], junitxml: str, filepath: str) -> None:
+    """Record the build durations of the built apps, one app per line.
+
+    The durations are read from the JUnit XML report written by idf-build-apps, where each build is recorded as a
+    test case named by the build path of the app.
+
+    :param apps: Apps. Apps that are not built are ignored
+    :param junitxml: Path to the JUnit XML report of the build
+    :param filepath: Path to the output file
+    """
+    import xml.etree.ElementTree as ET
+
+    from idf_build_apps.constants import BuildStatus
+
+    from .idf_pytest.durations import iter_junit_durations
+
+    durations: t.Dict[str, float] = {}
+    if os.path.isfile(junitxml):
+        try:
+            durations = dict(iter_junit_durations(junitxml))
+        except ET.ParseError as e:
+            logger.warning('Skipping invalid JUnit XML file %s: %s', junitxml, e)
+    else:
+        # not written if the build stopped at the first failure
+        logger.debug('JUnit XML file %s not found, no build duration is recorded', junitxml)
+
+    with open(filepath, 'w') as fw:
+        for app in apps:
+            duration = durations.get(app.build_path)
+            if app.build_status not in (BuildStatus.SUCCESS, BuildStatus.FAILED) or not duration:
+                continue
+
+            app_dir, target, config = get_app_key(app)
+            fw.write(json.dumps({'app_dir': app_dir, 'target': target, 'config': config, 'duration': duration}) + '\n')
+
+
+def load_build_durations(filepatterns: t.Iterable[str]) -> t.Dict[AppKey, float]:
+    """Load the build durations of the apps recorded by :func:`dump_build_durations`.
+
+    :param filepatterns: Glob patterns of the recorded files
+
+    :returns: Dict of app key to its mean build duration in seconds
+    """
+    durations: t.Dict[AppKey, t.List[float]] = defaultdict(list)
+    for pattern in filepatterns:
+        for filepath in sorted(glob.glob(pattern, recursive=True)):
+            with open(filepath) as fr:
+                for line in fr:
+                    line = line.strip()
+                    if not line:
+                        continue
+
+                    try:
+                        d = json.loads(line)
+                        durations[(d['app_dir'], d['target'], d['config'])].append(float(d['duration']))
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning('Skipping invalid build duration line in %s: %s', filepath, e)
+
+    return {key: sum(values) / len(values) for key, values in durations.items()}
+
+
+def estimate_build_durations(
+    apps: t.Sequence['App'],
+    durations: t.Dict[AppKey, float],
+    default_duration: float,
+) -> t.List[float]:
+    """Estimate the build durations of the apps.
+
+    Apps without recorded build duration are counted as the median of the known ones.
+
+    :param apps: Apps
+    :param durations: Dict of app key to its build duration in seconds
+    :param default_duration: Build duration in seconds of each app, if no app has recorded build duration
+
+    :returns: Build durations in seconds of the apps
+    """
+    keys = [get_app_key(app) for app in apps]
+    known_durations = [durations[key] for key in keys if key in durations]
+    if known_durations:
+        default_duration = statistics.median(known_durations)
+
+    return [durations.get(key, default_duration) for key in keys]
+
+
+def shard_apps_by_duration(
+    apps: t.Sequence['App'],
+    durations: t.Dict[AppKey, float],
+    parallel_count: int,
+    *,
+    default_duration: float = 60,
+) -> t.List[t.List['App']]:
+    """Shard the apps into parallel jobs of similar total build durations.
+
+    :param apps: Apps
+    :param durations: Dict of app key to its build duration in seconds
+    :param parallel_count: Number of parallel jobs
+    :param default_duration: Build duration in seconds of each app, if no app has recorded build duration
+
+    :returns: Apps of each parallel job, in the original order
+    """
+    shards = lpt_partition(estimate_build_durations(apps, durations, default_duration), parallel_count)
+    return [[apps[i] for i in shard] for shard in shards]
+
+
+def dump_app_shards(shards: t.Dict[str, t.List[t.List['App']]], filepath: str) -> None:
+    """Record the apps of each parallel job.
+
+    :param shards: Dict of the build job name to the apps of each of its parallel jobs
+    :param filepath: Path to the output file
+    """
+    with open(filepath, 'w') as fw:
+        json.dump(
+            {
+                name: [[list(get_app_key(app)) for app in apps] for apps in job_shards]
+                for name, job_shards in shards.items()
+            },
+            fw,
+        )
+
+
+def select_app_shard(
+    apps: t.Sequence['App'],
+    filepath: str,
+    name: str,
+    parallel_count: int,
+    parallel_index: int,
+) -> t.Optional[t.List['App']]:
+    """Select the apps of the parallel job recorded by :func:`dump_app_shards`.
+
+    Apps that are not recorded in any parallel job are distributed by count, so that no app is missed.
+
+    :param apps: All apps of the build job
+    :param filepath: Path to the recorded file
+    :param name: Name of the build job
+    :param parallel_count: Total number of parallel jobs
+    :param parallel_index: Index of the current parallel job (1-based)
+
+    :returns: Apps of the parallel job, or None if the apps of the build job are not recorded with the same
+        parallel count
+    """
+    if not os.path.isfile(filepath):
+        return None
+
+    with open(filepath) as fr:
+        job_shards = json.load(fr).get(name)
+
+    if not job_shards or len(job_shards) != parallel_count:
+        logger.debug('No recorded app shards of %s with parallel count %d', name, parallel_count)
+        return None
+
+    shard_index = {tuple(key): i for i, shard in enumerate(job_shards) for key in shard}
+
+    # apps read lazily are validated only if selected
+    keys = apps.keys() if isinstance(apps, LazyAppList) else [get_app_key(app) for app in apps]
+
+    res = []
+    unrecorded_count = 0
+    for app_index, key in enumerate(keys):
+        i = shard_index.get(key)
+        if i is None:
+            i = unrecorded_count % parallel_count
+            unrecorded_count += 1
+
+        if i == parallel_index - 1:
+            res.append(apps[app_index])
+
+    if unrecorded_count:
+        logger.warning('%d apps are not recorded in %s, distributed by count', unrecorded_count, filepath)
+
+    return res
@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Find apps for multiple targets, sharing the loaded manifest files.
+
+``get_all_apps`` used to call :func:`idf_build_apps.find_apps` once per requested target, loading the manifest files
+each time. Here the find arguments, which load the manifest files, are created once with the default build targets
+extended by the requested ones, and passed to :func:`idf_build_apps.find_apps` for each target.
+"""
+
+import logging
+import typing as t
+
+from idf_build_apps import App, find_apps
+from idf_build_apps.args import FindArguments
+from idf_build_apps.constants import PREVIEW_TARGETS
+
+logger = logging.getLogger(__name__)
+
+
+def get_find_arguments(
+    paths: t.List[str],
+    target: str,
+    *,
+    default_build_targets: t.List[str],
+    **kwargs,
+) -> t.Tuple[FindArguments, t.List[str]]:
+    """Get the find arguments shared by all the requested targets.
+
+    :param paths: Paths to search for apps
+    :param target: Target(s) separated by commas, 'all' stands for the default build targets
+    :param default_build_targets: Default build targets
+    :param kwargs: Other arguments passed to :class:`idf_build_apps.args.FindArguments`
+
+    :returns: Tuple of (find arguments, targets to search for)
+    """
+    requested = target.split(',')
+    find_arguments = FindArguments(
+        paths=paths,
+        target='all',
+        # same as searching each requested target with it added to the default build targets
+        default_build_targets=[*default_build_targets, *(_t for _t in requested if _t != 'all')],
+        **kwargs,
+    )
+
+    targets: t.List[str] = []
+    for _t in requested:
+        if _t != 'all':
+            targets.append(_t)
+            continue
+
+        # the default build targets without the requested ones, filtered the same way
+        extra_targets = set(find_arguments.additional_build_targets or [])
+        if find_arguments.enable_preview_targets:
+            extra_targets.update(PREVIEW_TARGETS)
+        targets.extend(
+            _dt
+            for _dt in find_arguments.default_build_targets or []
+            if _dt in default_build_targets or _dt in extra_targets
+        )
+
+    return find_arguments, list(dict.fromkeys(targets))
+
+
+def find_apps_by_arguments(find_arguments: FindArguments, targets: t.List[str]) -> t.List[App]:
+    """Find apps for all the targets with the same find arguments.
+
+    The result is the same as calling :func:`idf_build_apps.find_apps` for each target.
+
+    :param find_arguments: Find arguments returned by :func:`get_find_arguments`
+    :param targets: Targets to search for
+
+    :returns: List of found apps
+    """
+    apps: t.Set[App] = set()
+    for _t in targets:
+        # copied without validation, the manifest files are not loaded again
+        apps.update(find_apps(find_arguments=find_arguments.model_copy(update={'target': _t})))
+
+    logger.debug('Found %d apps for targets %s', len(apps), ', '.join(targets))
+
+    return sorted(apps)
+
+
+def find_apps_for_targets(
+    paths: t.List[str],
+    target: str,
+    *,
+    default_build_targets: t.List[str],
+    **kwargs,
+) -> t.List[App]:
+    """Find apps for multiple targets in one pass.
+
+    :param paths: Paths to search for apps
+    :param target: Target(s) separated by commas, 'all' stands for the default build targets
+    :param default_build_targets: Default build targets
+    :param kwargs: Other arguments passed to :class:`idf_build_apps.args.FindArguments`
+
+    :returns: List of found apps
+    """
+    find_arguments, targets = get_find_arguments(paths, target, default_build_targets=default_build_targets, **kwargs)
+    return find_apps_by_arguments(find_arguments, targets)
@@ -0,0 +1,233 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Persistent index of the apps found by idf-build-apps.
+
+The apps found in each search path are stored in a JSON file, keyed by the find arguments, the content of the manifest
+files, and a fingerprint of the search path. Only the search paths whose fingerprint changed are searched again.
+
+The fingerprint of a search path inside a git work tree is the tree hash of ``HEAD`` plus the status of the
+uncommitted files, so that the index file could be shared between CI jobs of the same commit. Otherwise, it's computed
+from the names, sizes and modification times of all the files under the search path. Hidden folders and build
+directories are ignored in both cases.
+"""
+
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import typing as t
+from pathlib import Path
+
+import idf_build_apps
+from idf_build_apps import App
+from idf_build_apps.app import AppDeserializer
+from idf_build_apps.args import FindArguments
+from pydantic import Field, create_model
+
+from .app_finder import find_apps_by_arguments, get_find_arguments
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+MAX_INDEX_ENTRIES = 16
+
+
+def _sha256(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def _file_sha256(filepath: str) -> str:
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as fr:
+        h.update(fr.read())
+    return h.hexdigest()
+
+
+def _is_excluded(relpath: str, exclude_dir_patterns: t.Sequence[str]) -> bool:
+    return any(
+        part.startswith('.') or any(fnmatch.fnmatch(part, pat) for pat in exclude_dir_patterns)
+        for part in relpath.split('/')[:-1]
+    )
+
+
+def path_fingerprint(path: str, *, exclude_dir_patterns: t.Sequence[str] = ()) -> str:
+    """Get the fingerprint of all files under the path.
+
+    :param path: Folder path
+    :param exclude_dir_patterns: Glob patterns of the folder names to ignore, like the
+        build directories. Hidden folders are always ignored.
+
+    :returns: sha256 hex digest
+    """
+    try:
+        tree, prefix = subprocess.run(
+            ['git', 'rev-parse', 'HEAD:./', '--show-prefix'],
+            cwd=path,
+            check=True,
+            capture_output=True,
+            encoding='utf-8',
+        ).stdout.splitlines()[:2]
+        status = subprocess.run(
+            ['git', 'status', '--porcelain', '-z', '--untracked-files=all', '--', '.'],
+            cwd=path,
+            check=True,
+            capture_output=True,
+            encoding='utf-8',
+        ).stdout
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        tree = None
+
+    parts = []
+    if tree is None:
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not _is_excluded(d + '/', exclude_dir_patterns))
+            for f in sorted(files):
+                filepath = os.path.join(root, f)
+                stat = os.stat(filepath)
+                parts.append(f'{os.path.relpath(filepath, path)}:{stat.st_size}:{stat.st_mtime_ns}')
+        return _sha256('files', *parts)
+
+    # uncommitted files are identified by their status, size and modification time
+    parts.append(tree)
+    entries = iter(status.split('\0'))
+    for entry in entries:
+        if not entry:
+            continue
+        if entry[0] in 'RC':
+            # renamed or copied, followed by the original path
+            entry += ' <- ' + next(entries, '')
+
+        # paths are relative to the repository root
+        relpath = entry[3:].split(' <- ')[0]
+        if prefix and relpath.startswith(prefix):
+            relpath = relpath[len(prefix) :]
+        if _is_excluded(relpath, exclude_dir_patterns):
+            continue
+
+        parts.append(entry)
+        try:
+            stat = os.stat(os.path.join(path, relpath))
+        except OSError:
+            continue
+        parts.append(f'{stat.st_size}:{stat.st_mtime_ns}')
+
+    return _sha256('git', *parts)
+
+
+def _build_dir_patterns(find_arguments: FindArguments) -> t.List[str]:
+    patterns = []
+    for d in (getattr(find_arguments, 'build_dir', None), getattr(find_arguments, 'work_dir', None)):
+        if d and not os.path.isabs(d):
+            # placeholders like `@t` are expanded per app
+            patterns.append(re.sub(r'@\w', '*', Path(d).parts[0]))
+    return patterns
+
+
+def _arguments_key(find_arguments: FindArguments, targets: t.List[str]) -> str:
+    arguments = find_arguments.model_dump(exclude={'paths'})
+    parts = [
+        idf_build_apps.__version__,
+        os.getenv('IDF_PATH', ''),
+        json.dumps(arguments, sort_keys=True, default=str),
+        ','.join(targets),
+    ]
+    # manifest files are loaded while initializing the find arguments
+    for filepath in sorted(find_arguments.manifest_files or []):
+        parts.append(_file_sha256(str(filepath)) if os.path.isfile(filepath) else str(filepath))
+    if find_arguments.compare_manifest_sha_filepath and os.path.isfile(find_arguments.compare_manifest_sha_filepath):
+        parts.append(_file_sha256(find_arguments.compare_manifest_sha_filepath))
+
+    return _sha256(*parts)
+
+
+def _load_index(index_filepath: str) -> t.Dict[str, t.Any]:
+    try:
+        with open(index_filepath) as fr:
+            index = json.load(fr)
+    except FileNotFoundError:
+        return {'version': INDEX_VERSION, 'entries': {}}
+    except ValueError:
+        logger.warning('Ignoring invalid app index file %s', index_filepath)
+        return {'version': INDEX_VERSION, 'entries': {}}
+
+    if index.get('version') != INDEX_VERSION:
+        return {'version': INDEX_VERSION, 'entries': {}}
+
+    return index
+
+
+def _write_index(index_filepath: str, index: t.Dict[str, t.Any]) -> None:
+    # keep the most recently used entries
+    entries = index['entries']
+    for key in list(entries)[:-MAX_INDEX_ENTRIES]:
+        entries.pop(key)
+
+    os.makedirs(os.path.dirname(os.path.abspath(index_filepath)), exist_ok=True)
+    tmp_filepath = f'{index_filepath}.{os.getpid()}.tmp'
+    with open(tmp_filepath, 'w') as fw:
+        json.dump(index, fw)
+    os.replace(tmp_filepath, index_filepath)
+
+
+def find_apps_with_index(
+    paths: t.List[str],
+    target: str,
+    *,
+    index_filepath: str,
+    default_build_targets: t.List[str],
+    **kwargs,
+) -> t.List[App]:
+    """Find apps like :func:`idf_ci.app_finder.find_apps_for_targets`, reusing the results stored in the index file.
+
+    :param paths: Paths to search for apps
+    :param target: Target(s) separated by commas, 'all' stands for the default build targets
+    :param index_filepath: Path to the index file, created if not exists
+    :param default_build_targets: Default build targets
+    :param kwargs: Other arguments passed to :class:`idf_build_apps.args.FindArguments`
+
+    :returns: List of found apps
+    """
+    find_arguments, targets = get_find_arguments(paths, target, default_build_targets=default_build_targets, **kwargs)
+    key = _arguments_key(find_arguments, targets)
+
+    index = _load_index(index_filepath)
+    # pop and insert again to mark it as the most recently used one
+    entry: t.Dict[str, t.Any] = index['entries'].pop(key, {})
+
+    deserializer = create_model(
+        '_IndexDeserializer',
+        app=(
+            t.Union[tuple(FindArguments._KNOWN_APP_CLASSES.values())],  # type: ignore[arg-type]
+            Field(discriminator='build_system'),
+        ),
+        __base__=AppDeserializer,
+    )
+
+    exclude_dir_patterns = _build_dir_patterns(find_arguments)
+    apps: t.Set[App] = set()
+    refreshed: t.Dict[str, t.Any] = {}
+    for path in find_arguments.paths:
+        fingerprint = path_fingerprint(path, exclude_dir_patterns=exclude_dir_patterns)
+        cached = entry.get(path)
+        if cached is not None and cached['fingerprint'] == fingerprint:
+            logger.debug('Loading apps in path %s from app index', path)
+            apps.update(deserializer.from_json_list(cached['apps']))
+        else:
+            logger.debug('Searching for apps in path %s, not indexed or modified', path)
+            found = find_apps_by_arguments(find_arguments.model_copy(update={'paths': [path]}), targets)
+            cached = {'fingerprint': fingerprint, 'apps': [app.to_json() for app in found]}
+            apps.update(found)
+
+        refreshed[path] = cached
+
+    index['entries'][key] = refreshed
+    _write_index(index_filepath, index)
+
+    return sorted(apps)
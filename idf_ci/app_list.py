@@ -0,0 +1,233 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Compact format of the app list files, like ``test_related_apps.txt``.
+
+The default format is one JSON app per line, and all the apps are validated while reading. The compact format is a
+single JSON object storing the apps as a table: each row holds, per field, the index of the value in a table of the
+distinct values, so that the app directories, targets and configs shared by many apps are stored only once. Rows are
+validated into apps only when accessed, so a parallel build job only pays for the apps of its own shard.
+
+Like the test case records, files ending with ``.msgpack`` are written with msgpack, which is required to be
+installed, and are always in the compact format.
+"""
+
+import json
+import os
+import typing as t
+
+from idf_build_apps import App
+from idf_build_apps.app import AppDeserializer
+from idf_build_apps.args import FindArguments
+from pydantic import Field, create_model
+
+from .utils import project_relative_path
+
+COMPACT_FORMAT = 'idf-ci-compact-app-list'
+COMPACT_FORMAT_VERSION = 1
+
+# the field is not set in the row
+_MISSING = -1
+
+
+def _value_key(value: t.Any) -> t.Tuple[t.Any, ...]:
+    # `True == 1`, tell them apart by the type
+    if isinstance(value, (list, dict)):
+        return type(value), json.dumps(value, sort_keys=True)
+    return type(value), value
+
+
+def dump_compact_apps(apps: t.Iterable[App], filepath: str) -> None:
+    """Dump the apps to a file in the compact format.
+
+    :param apps: Apps to dump
+    :param filepath: Path to the output file
+    """
+    fields: t.List[str] = []
+    field_indices: t.Dict[str, int] = {}
+    values: t.List[t.Any] = []
+    value_indices: t.Dict[t.Tuple[t.Any, ...], int] = {}
+    rows = []
+    for app in apps:
+        row: t.List[int] = [_MISSING] * len(fields)
+        for field, value in app.model_dump(mode='json').items():
+            if field not in field_indices:
+                field_indices[field] = len(fields)
+                fields.append(field)
+                row.append(_MISSING)
+
+            key = _value_key(value)
+            if key not in value_indices:
+                value_indices[key] = len(values)
+                values.append(value)
+
+            row[field_indices[field]] = value_indices[key]
+        rows.append(row)
+
+    # the format goes first, to tell the compact JSON files apart by the beginning
+    data = {
+        'format': COMPACT_FORMAT,
+        'version': COMPACT_FORMAT_VERSION,
+        'fields': fields,
+        'values': values,
+        'apps': rows,
+    }
+
+    if filepath.endswith('.msgpack'):
+        import msgpack
+
+        with open(filepath, 'wb') as fwb:
+            fwb.write(msgpack.packb(data))
+    else:
+        with open(filepath, 'w') as fw:
+            json.dump(data, fw, separators=(',', ':'))
+            fw.write('\n')
+
+
+def is_compact_app_list(filepath: str) -> bool:
+    """Check if the app list file is in the compact format.
+
+    :param filepath: Path to the app list file
+
+    :returns: True if the file is in the compact format
+    """
+    if filepath.endswith('.msgpack'):
+        return True
+
+    with open(filepath) as fr:
+        head = fr.read(len(COMPACT_FORMAT) + 16)
+
+    return head.startswith(f'{{"format":"{COMPACT_FORMAT}"')
+
+
+class LazyAppList(t.Sequence[App]):
+    """Apps read from an app list file in the compact format, validated when accessed.
+
+    Validated apps are kept, so accessing the same app again returns the same object.
+
+    :param fields: Names of the app fields
+    :param values: Distinct values of the fields
+    :param rows: Indices of the values of each app, one per field
+    """
+
+    def __init__(self, fields: t.List[str], values: t.List[t.Any], rows: t.List[t.List[int]]) -> None:
+        self._fields = fields
+        self._field_indices = {field: i for i, field in enumerate(fields)}
+        self._values = values
+        self._rows = rows
+
+        self._apps: t.Dict[int, App] = {}
+        self._deserializer: t.Optional[t.Type[AppDeserializer]] = None
+        self._preserve: t.Optional[bool] = None
+
+    @classmethod
+    def from_file(cls, filepath: str) -> 'LazyAppList':
+        """Read the app list file in the compact format.
+
+        :param filepath: Path to the app list file
+
+        :returns: Apps in the file
+
+        :raises ValueError: If the file is not in the compact format, or of another version
+        """
+        if filepath.endswith('.msgpack'):
+            import msgpack
+
+            with open(filepath, 'rb') as frb:
+                data = msgpack.unpackb(frb.read())
+        else:
+            with open(filepath) as fr:
+                data = json.load(fr)
+
+        if data.get('format') != COMPACT_FORMAT or data.get('version') != COMPACT_FORMAT_VERSION:
+            raise ValueError(
+                f'{filepath} is not an app list of format {COMPACT_FORMAT} version {COMPACT_FORMAT_VERSION}'
+            )
+
+        return cls(data['fields'], data['values'], data['apps'])
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @t.overload
+    def __getitem__(self, index: int) -> App: ...
+
+    @t.overload
+    def __getitem__(self, index: slice) -> t.List[App]: ...
+
+    def __getitem__(self, index: t.Union[int, slice]) -> t.Union[App, t.List[App]]:
+        if isinstance(index, slice):
+            return [self._get_app(i) for i in range(*index.indices(len(self._rows)))]
+
+        if index < 0:
+            index += len(self._rows)
+        if not 0 <= index < len(self._rows):
+            raise IndexError('app index out of range')
+
+        return self._get_app(index)
+
+    @property
+    def preserve(self) -> t.Optional[bool]:
+        """Overrides ``preserve`` of all the apps if set, including the ones validated later."""
+        return self._preserve
+
+    @preserve.setter
+    def preserve(self, value: t.Optional[bool]) -> None:
+        self._preserve = value
+        if value is not None:
+            for app in self._apps.values():
+                app.preserve = value
+
+    def get_field(self, index: int, field: str) -> t.Any:
+        """Get the value of a field of the app, without validating the app.
+
+        :param index: Index of the app
+        :param field: Name of the field
+
+        :returns: The value, or None if not set
+        """
+        i = self._field_indices.get(field)
+        row = self._rows[index]
+        if i is None or i >= len(row) or row[i] == _MISSING:
+            return None
+
+        return self._values[row[i]]
+
+    def keys(self) -> t.List[t.Tuple[str, str, str]]:
+        """Get the keys of the apps, like :func:`idf_ci.app_durations.get_app_key`, without validating the apps.
+
+        :returns: List of (app dir, target, config name), one per app
+        """
+        # most apps share the app dirs, relate each of them once
+        relpaths: t.Dict[str, str] = {}
+        res = []
+        for i in range(len(self._rows)):
+            app_dir = self.get_field(i, 'app_dir')
+            if app_dir not in relpaths:
+                relpaths[app_dir] = project_relative_path(app_dir, os.curdir)
+            res.append((relpaths[app_dir], self.get_field(i, 'target'), self.get_field(i, 'config_name') or ''))
+
+        return res
+
+    def _get_app(self, index: int) -> App:
+        app = self._apps.get(index)
+        if app is None:
+            if self._deserializer is None:
+                self._deserializer = create_model(
+                    '_CompactAppDeserializer',
+                    app=(
+                        t.Union[tuple(FindArguments._KNOWN_APP_CLASSES.values())],  # type: ignore[arg-type]
+                        Field(discriminator='build_system'),
+                    ),
+                    __base__=AppDeserializer,
+                )
+
+            row = self._rows[index]
+            data = {
+                field: self._values[row[i]] for i, field in enumerate(self._fields[: len(row)]) if row[i] != _MISSING
+            }
+            app = self._deserializer.model_validate({'app': data}).app
+            if self._preserve is not None:
+                app.preserve = self._preserve
+            self._apps[index] = app
+
+        return app
@@ -0,0 +1,283 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Reuse of the builds of previous pipelines, keyed by the input fingerprints of the apps.
+
+The fingerprint of an app hashes the files tracked by git in the app dir, in the dirs of the components listed in
+``depends_components``, and in the ``depends_filepatterns``, together with the sdkconfig files, the target, the config
+name and the toolchain version. Apps without ``depends_components`` may depend on any component, and are never reused.
+
+The fingerprints of the successful builds are recorded in S3 with the commit SHA, so that the artifacts of the apps
+with the same fingerprint can be downloaded from the S3 prefix of that commit instead of building them again.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import subprocess
+import typing as t
+
+from .utils import project_relative_path
+
+if t.TYPE_CHECKING:
+    from idf_build_apps import App
+
+logger = logging.getLogger(__name__)
+
+
+def get_toolchain_version(toolchain_version: t.Optional[str] = None) -> t.Optional[str]:
+    """Get the toolchain version used in the fingerprints.
+
+    :param toolchain_version: Toolchain version set in the settings
+
+    :returns: The set toolchain version, or the digest of ``$IDF_PATH/tools/tools.json`` which pins the toolchain
+        versions of ESP-IDF, or None if neither is available
+    """
+    if toolchain_version:
+        return toolchain_version
+
+    tools_json = os.path.join(os.getenv('IDF_PATH', ''), 'tools', 'tools.json')
+    if not os.getenv('IDF_PATH') or not os.path.isfile(tools_json):
+        return None
+
+    with open(tools_json, 'rb') as fr:
+        return hashlib.sha256(fr.read()).hexdigest()
+
+
+class AppFingerprinter:
+    """Compute the input fingerprints of the apps.
+
+    Files shared by several apps, like the component files, are listed and hashed only once.
+
+    :param component_dirs: Dirs to find the components in, the first match wins. Environment variables are expanded
+    :param toolchain_version: Toolchain version
+    """
+
+    def __init__(self, component_dirs: t.Iterable[str], toolchain_version: str) -> None:
+        self.component_dirs = [os.path.expandvars(d) for d in component_dirs]
+        self.toolchain_version = toolchain_version
+
+        self._dir_files: t.Dict[str, t.Optional[t.List[str]]] = {}
+        self._file_digests: t.Dict[str, str] = {}
+
+    def _list_files(self, dirpath: str) -> t.Optional[t.List[str]]:
+        # untracked files, like the build dirs, are not inputs of the build
+        dirpath = os.path.realpath(dirpath)
+        if dirpath not in self._dir_files:
+            try:
+                output = subprocess.run(
+                    ['git', 'ls-files', '-z'],
+                    cwd=dirpath,
+                    check=True,
+                    capture_output=True,
+                ).stdout
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.debug('Failed to list the files tracked by git in %s: %s', dirpath, e)
+                self._dir_files[dirpath] = None
+            else:
+                self._dir_files[dirpath] = sorted(f for f in output.decode('utf-8').split('\0') if f)
+
+        return self._dir_files[dirpath]
+
+    def _file_digest(self, filepath: str) -> str:
+        if filepath not in self._file_digests:
+            try:
+                with open(filepath, 'rb') as fr:
+                    self._file_digests[filepath] = hashlib.sha256(fr.read()).hexdigest()
+            except OSError:
+                # deleted but not staged yet
+                self._file_digests[filepath] = ''
+
+        return self._file_digests[filepath]
+
+    def _find_component_dir(self, name: str) -> t.Optional[str]:
+        for d in self.component_dirs:
+            component_dir = os.path.join(d, name)
+            if os.path.isdir(component_dir):
+                return component_dir
+
+        return None
+
+    def fingerprint(self, app: 'App') -> t.Optional[str]:
+        """Compute the input fingerprint of the app.
+
+        :param app: App
+
+        :returns: Hex digest of the inputs, or None if the inputs of the app can't be determined
+        """
+        if not app.depends_components:
+            return None
+
+        components = sorted(set(app.depends_components))
+        dirs = [app.app_dir]
+        for name in components:
+            component_dir = self._find_component_dir(name)
+            if component_dir is None:
+                logger.debug('Component %s of app %s not found, not reusing the build', name, app)
+                return None
+            dirs.append(component_dir)
+
+        h = hashlib.sha256()
+
+        def _update(*items: str) -> None:
+            for item in items:
+                h.update(item.encode('utf-8') + b'\0')
+
+        _update(self.toolchain_version, app.target, app.config_name or '')
+        for f in app.sdkconfig_files:
+            if os.path.isfile(f):
+                _update('sdkconfig', self._file_digest(f))
+
+        # paths are relative to the dirs, which may be in other folders in other pipelines
+        for key, d in zip(['app', *(f'component:{name}' for name in components)], dirs):
+            dir_files = self._list_files(d)
+            if dir_files is None:
+                return None
+
+            _update(key)
+            for f in dir_files:
+                _update(f, self._file_digest(os.path.join(os.path.realpath(d), f)))
+
+        for pattern in sorted(app.depends_filepatterns):
+            for f in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(f):
+                    _update('file', f, self._file_digest(f))
+
+        return h.hexdigest()
+
+
+def get_app_fingerprints(apps: t.Iterable['App']) -> t.Dict[int, str]:
+    """Compute the input fingerprints of the apps to be built, by the build cache settings.
+
+    :param apps: Apps
+
+    :returns: Dict of the index of the app to its fingerprint. Apps that won't be built, or whose inputs can't be
+        determined, are not included
+    """
+    from idf_build_apps.constants import BuildStatus
+
+    from .settings import get_ci_settings
+
+    build_pipeline = get_ci_settings().gitlab.build_pipeline
+    toolchain_version = get_toolchain_version(build_pipeline.build_cache_toolchain_version)
+    if toolchain_version is None:
+        logger.info('Toolchain version not available, not reusing the builds of previous pipelines')
+        return {}
+
+    fingerprinter = AppFingerprinter(build_pipeline.build_cache_component_dirs, toolchain_version)
+    res = {}
+    for i, app in enumerate(apps):
+        if app.build_status not in (BuildStatus.UNKNOWN, BuildStatus.SHOULD_BE_BUILT):
+            continue
+
+        fingerprint = fingerprinter.fingerprint(app)
+        if fingerprint is not None:
+            res[i] = fingerprint
+
+    return res
+
+
+def _get_build_cache_entries(fingerprints: t.Iterable[str]) -> t.Dict[str, t.Dict[str, str]]:
+    from .idf_gitlab.api import ArtifactManager
+
+    try:
+        return ArtifactManager().get_build_cache_entries(fingerprints)
+    except Exception as e:
+        # building the apps again is always safe
+        logger.warning('Failed to get the builds of previous pipelines: %s', e)
+        return {}
+
+
+def find_cached_builds(apps: t.Sequence['App']) -> t.Dict[int, str]:
+    """Find the apps built in previous pipelines with the same input fingerprints.
+
+    :param apps: Apps
+
+    :returns: Dict of the index of the app to the commit SHA of its previous build
+    """
+    fingerprints = get_app_fingerprints(apps)
+    if not fingerprints:
+        return {}
+
+    entries = _get_build_cache_entries(set(fingerprints.values()))
+
+    res = {}
+    for i, fingerprint in fingerprints.items():
+        entry = entries.get(fingerprint)
+        # the artifacts are restored to the recorded build dir
+        if entry and entry.get('build_dir') == project_relative_path(apps[i].build_path, os.curdir):
+            res[i] = entry['commit_sha']
+
+    logger.info('Found previous builds of %d apps with the same inputs, %d in total', len(res), len(apps))
+    return res
+
+
+def restore_cached_builds(apps: t.Sequence['App']) -> t.Dict[int, str]:
+    """Download the artifacts of the apps built in previous pipelines with the same input fingerprints.
+
+    The restored apps are marked as successfully built, so that they're skipped by ``build_apps`` but still recorded
+    in the app info files.
+
+    :param apps: Apps to be built
+
+    :returns: Dict of the index of the app to its fingerprint, for the apps that are not restored
+    """
+    from idf_build_apps.constants import BuildStatus
+
+    from .idf_gitlab.api import ArtifactManager
+
+    fingerprints = get_app_fingerprints(apps)
+    if not fingerprints:
+        return {}
+
+    entries = _get_build_cache_entries(set(fingerprints.values()))
+    manager = ArtifactManager()
+
+    res = {}
+    for i, fingerprint in fingerprints.items():
+        app = apps[i]
+        entry = entries.get(fingerprint)
+        if not entry or entry.get('build_dir') != project_relative_path(app.build_path, os.curdir):
+            res[i] = fingerprint
+            continue
+
+        try:
+            count = manager.download_artifacts(commit_sha=entry['commit_sha'], build_dir=app.build_path)
+        except Exception as e:
+            logger.warning('Failed to download the artifacts of app %s from commit %s: %s', app, entry['commit_sha'], e)
+            count = 0
+
+        # the artifacts may be expired
+        if not count:
+            res[i] = fingerprint
+            continue
+
+        app.build_status = BuildStatus.SUCCESS
+        app.build_comment = f'Reused the build of commit {entry["commit_sha"]}'
+        logger.info('Reused the build of app %s from commit %s', app, entry['commit_sha'])
+
+    return res
+
+
+def record_cached_builds(apps: t.Sequence['App'], fingerprints: t.Dict[int, str]) -> None:
+    """Record the input fingerprints of the successfully built apps, with the current commit SHA.
+
+    :param apps: Built apps
+    :param fingerprints: Dict of the index of the app to its fingerprint
+    """
+    from idf_build_apps.constants import BuildStatus
+
+    from .idf_gitlab.api import ArtifactManager
+
+    build_dirs = {
+        fingerprint: project_relative_path(apps[i].build_path, os.curdir)
+        for i, fingerprint in fingerprints.items()
+        if apps[i].build_status == BuildStatus.SUCCESS
+    }
+    if not build_dirs:
+        return
+
+    try:
+        ArtifactManager().put_build_cache_entries(build_dirs)
+    except Exception as e:
+        logger.warning('Failed to record the builds: %s', e)
@@ -23,12 +23,13 @@ from idf_ci.build_collect.models import (
     ProjectInfo,
 )
 from idf_ci.idf_pytest import PytestCase
+from idf_ci.utils import canonical_path
 
 logger = logging.getLogger(__name__)
 
 
 def normalize_path(path: str) -> str:
-    return Path(path).absolute().as_posix()
+    return canonical_path(path)
 
 
 def collect_build_apps(
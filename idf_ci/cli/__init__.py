@@ -11,18 +11,25 @@ from ast import literal_eval
 
 import click
 
+from idf_ci.cli._lazy_group import LazyGroup
 from idf_ci.cli._options import create_config_file
-from idf_ci.cli.build_group import build
-from idf_ci.cli.config_group import config
-from idf_ci.cli.gitlab_group import gitlab
-from idf_ci.cli.test_group import test
 from idf_ci.settings import _refresh_ci_settings
 from idf_ci.utils import setup_logging
 
 logger = logging.getLogger(__name__)
 
 
-@click.group(context_settings={'show_default': True, 'help_option_names': ['-h', '--help']})
+# the groups are imported only when used, to keep the startup fast
+@click.group(
+    cls=LazyGroup,
+    lazy_subcommands={
+        'build': 'idf_ci.cli.build_group:build',
+        'config': 'idf_ci.cli.config_group:config',
+        'gitlab': 'idf_ci.cli.gitlab_group:gitlab',
+        'test': 'idf_ci.cli.test_group:test',
+    },
+    context_settings={'show_default': True, 'help_option_names': ['-h', '--help']},
+)
 @click.option(
     '-c',
     '--config-file',
@@ -114,9 +121,3 @@ def completions():
 
     After modifying the shell config, you need to start a new shell in order for the changes to be loaded.
     """)
-
-
-click_cli.add_command(build)
-click_cli.add_command(config)
-click_cli.add_command(test)
-click_cli.add_command(gitlab)
@@ -0,0 +1,33 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+import importlib
+import typing as t
+
+import click
+
+
+class LazyGroup(click.Group):
+    """Click group that imports the modules of its subcommands only when they are used.
+
+    :param lazy_subcommands: Mapping of the subcommand name to its import path, in format ``module:attr``
+    """
+
+    def __init__(self, *args, lazy_subcommands: t.Optional[t.Dict[str, str]] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> t.List[str]:
+        return sorted([*super().list_commands(ctx), *self.lazy_subcommands])
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> t.Optional[click.Command]:
+        if cmd_name in self.lazy_subcommands:
+            return self._load_command(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name: str) -> click.Command:
+        module_name, attr = self.lazy_subcommands[cmd_name].split(':')
+        cmd = getattr(importlib.import_module(module_name), attr)
+        if not isinstance(cmd, click.Command):
+            raise ValueError(f'Lazy loading of {self.lazy_subcommands[cmd_name]} failed, not a click command')
+
+        return cmd
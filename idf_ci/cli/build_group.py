@@ -7,9 +7,6 @@ import time
 
 import click
 
-from idf_ci.build_collect.scripts import collect_apps, format_as_html, format_as_json
-from idf_ci.scripts import build as build_cmd
-
 from .._compat import UNDEF
 from ._options import (
     create_config_file,
@@ -61,6 +58,8 @@ def run(
     filter_expr,
 ):
     """Execute the build process for applications"""
+    from idf_ci.scripts import build as build_cmd
+
     start_time = time.time()
     apps, ret = build_cmd(
         paths=paths,
@@ -104,6 +103,8 @@ def collect(
     output_format,
 ):
     """Collect all applications, corresponding test cases and output the result in JSON format."""
+    from idf_ci.build_collect.scripts import collect_apps, format_as_html, format_as_json
+
     result = collect_apps(paths=paths, include_only_enabled=include_only_enabled_apps)
 
     if output_format == 'json':
@@ -9,7 +9,6 @@ from pydantic import BaseModel
 from tomlkit import TOMLDocument, load
 from tomlkit import dumps as toml_dumps
 
-from idf_ci.scripts import preprocess_args
 from idf_ci.settings import CiSettings, get_ci_settings, pick_toml_file
 
 from ._options import option_modified_files
@@ -223,6 +222,8 @@ def _format_toml_value(path: str, value: t.Any) -> str:
 @option_modified_files
 def get_modified_components(modified_files: t.Optional[t.List[str]]):
     """Get components modified by the given files."""
+    from idf_ci.scripts import preprocess_args
+
     processed_args = preprocess_args(
         modified_files=modified_files,
     )
@@ -10,10 +10,6 @@ from idf_ci.cli._options import (
     option_modified_files,
     option_paths,
 )
-from idf_ci.idf_gitlab import ArtifactManager
-from idf_ci.idf_gitlab import build_child_pipeline as build_child_pipeline_cmd
-from idf_ci.idf_gitlab import pipeline_variables as pipeline_variables_cmd
-from idf_ci.idf_gitlab import test_child_pipeline as test_child_pipeline_cmd
 from idf_ci.settings import get_ci_settings
 
 
@@ -36,6 +32,8 @@ def pipeline_variables():
     \b
     https://docs.espressif.com/projects/idf-ci/en/latest/references/api/idf_ci.idf_gitlab.html#idf_ci.idf_gitlab.pipeline_variables
     """
+    from idf_ci.idf_gitlab.scripts import pipeline_variables as pipeline_variables_cmd
+
     for k, v in pipeline_variables_cmd().items():
         click.echo(f'{k}={v}')
 
@@ -51,6 +49,8 @@ def pipeline_variables():
 @click.argument('yaml_output', required=False)
 def build_child_pipeline(paths, modified_files, compare_manifest_sha_filepath, yaml_output):
     """Generate build child pipeline yaml file."""
+    from idf_ci.idf_gitlab.pipeline import build_child_pipeline as build_child_pipeline_cmd
+
     build_child_pipeline_cmd(
         paths=paths,
         modified_files=modified_files,
@@ -60,10 +60,13 @@ def build_child_pipeline(paths, modified_files, compare_manifest_sha_filepath, y
 
 
 @gitlab.command()
+@option_modified_files
 @click.argument('yaml_output', required=False)
-def test_child_pipeline(yaml_output):
+def test_child_pipeline(modified_files, yaml_output):
     """Generate test child pipeline yaml file."""
-    test_child_pipeline_cmd(yaml_output)
+    from idf_ci.idf_gitlab.pipeline import test_child_pipeline as test_child_pipeline_cmd
+
+    test_child_pipeline_cmd(yaml_output, modified_files=modified_files)
 
 
 def validate_artifact_type(
@@ -120,6 +123,8 @@ def download_artifacts(artifact_type, commit_sha, branch, folder, presigned_json
     specified pipeline and use it to download artifacts. This option cannot be used
     together with --presigned-json.
     """
+    from idf_ci.idf_gitlab.api import ArtifactManager
+
     if presigned_json and pipeline_id:
         raise click.ClickException('Cannot use both --presigned-json and --pipeline-id options together')
 
@@ -155,6 +160,8 @@ def upload_artifacts(artifact_type, commit_sha, branch, build_dir, folder):
     This command uploads artifacts to S3 storage only. GitLab's built-in storage is not
     supported. The commit SHA is required to identify where to store the artifacts.
     """
+    from idf_ci.idf_gitlab.api import ArtifactManager
+
     manager = ArtifactManager()
     manager.upload_artifacts(
         commit_sha=commit_sha,
@@ -188,6 +195,8 @@ def generate_presigned_json(commit_sha, branch, artifact_type, expire_in_days, o
     This command generates presigned URLs for artifacts that would be uploaded to S3
     storage. The URLs can be used to download the artifacts directly from S3.
     """
+    from idf_ci.idf_gitlab.api import ArtifactManager
+
     manager = ArtifactManager()
     presigned_urls = manager.generate_presigned_json(
         commit_sha=commit_sha,
@@ -208,6 +217,8 @@ def generate_presigned_json(commit_sha, branch, artifact_type, expire_in_days, o
 @click.argument('filename', required=True)
 def download_known_failure_cases_file(filename):
     """Download known failure cases file from S3 storage."""
+    from idf_ci.idf_gitlab.api import ArtifactManager
+
     s3_client = ArtifactManager().s3_client
 
     if s3_client:
@@ -1,13 +1,11 @@
 # SPDX-FileCopyrightText: 2025-2026 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
+import json
 import logging
 import os
 
 import click
 
-from idf_ci import get_pytest_cases
-
-from ..idf_pytest.models import GroupedPytestCases
 from ._options import create_config_file, option_pytest
 
 logger = logging.getLogger(__name__)
@@ -53,6 +51,8 @@ def collect(
     output,
 ):
     """Collect and process pytest cases."""
+    from idf_ci.idf_pytest import GroupedPytestCases, get_pytest_cases
+
     grouped_cases = GroupedPytestCases(
         get_pytest_cases(
             paths=paths or ['.'],
@@ -75,3 +75,122 @@ def collect(
         with open(output, 'w') as f:
             f.write(result)
         click.echo(f'Created test cases collection file: {output}')
+
+
+@test.command()
+@click.argument('filepatterns', nargs=-1)
+@click.option(
+    '-o',
+    '--output',
+    type=click.Path(dir_okay=False, file_okay=True),
+    help='Output file. Default to the `test_impact_index_filepath` setting, or "test_impact_index.json"',
+)
+def impact_index(filepatterns, output):
+    """Build the test impact index from the project_description.json files matching the glob patterns.
+
+    Default to the project_description.json files in the build directories.
+    """
+    from idf_ci.idf_pytest.impact import build_test_impact_index
+    from idf_ci.settings import get_ci_settings
+
+    if output is None:
+        output = get_ci_settings().test_impact_index_filepath or 'test_impact_index.json'
+
+    index = build_test_impact_index(filepatterns or ['**/build*/project_description.json'])
+    index.dump(output)
+    click.echo(f'Created test impact index of {len(index)} apps: {output}')
+
+
+@test.group()
+@click.option(
+    '--store',
+    type=click.Path(dir_okay=False, file_okay=True),
+    help='Path to the duration store file. Default to the `gitlab.test_pipeline.duration_store_filepath` setting',
+)
+@click.pass_context
+def durations(ctx, store):
+    """Group of commands of the test case duration store."""
+    if store is None:
+        from idf_ci.settings import get_ci_settings
+
+        store = get_ci_settings().gitlab.test_pipeline.duration_store_filepath
+
+    ctx.obj = store
+
+
+@durations.command()
+@click.argument('filepatterns', nargs=-1, required=True)
+@click.option('--window', default=20, help='Number of the most recent runs kept for each test case')
+@click.pass_obj
+def ingest(store, filepatterns, window):
+    """Ingest the results of the JUnit XML files matching the glob patterns."""
+    from idf_ci.idf_pytest.durations import DurationStore
+
+    with DurationStore(store, window=window) as s:
+        count = s.ingest(filepatterns)
+
+    click.echo(f'Ingested {count} test case results into {store}')
+
+
+@durations.command()
+@click.argument('caseids', nargs=-1)
+@click.option(
+    '--format',
+    '_format',
+    type=click.Choice(['raw', 'json']),
+    default='raw',
+    help='Output format',
+)
+@click.pass_obj
+def show(store, caseids, _format):
+    """Show the statistics of the test cases. All test cases if no case id is provided."""
+    from idf_ci.idf_pytest.durations import DurationStore
+
+    if not os.path.isfile(store):
+        raise click.ClickException(f'Duration store {store} does not exist')
+
+    with DurationStore(store) as s:
+        stats = s.stats(caseids or None)
+
+    if _format == 'json':
+        click.echo(json.dumps({caseid: v._asdict() for caseid, v in stats.items()}, indent=2))
+        return
+
+    for caseid, v in stats.items():
+        click.echo(
+            f'{caseid}: runs={v.runs} p50={v.p50:.2f}s p95={v.p95:.2f}s flake_rate={v.flake_rate:.2%} '
+            f'last_failed={v.last_failed}'
+        )
+
+
+@durations.command(name='export')
+@click.argument('output', type=click.Path(dir_okay=False, file_okay=True))
+@click.pass_obj
+def export_store(store, output):
+    """Export the duration store into a compact file, to be uploaded as an artifact."""
+    from idf_ci.idf_pytest.durations import DurationStore
+
+    if not os.path.isfile(store):
+        raise click.ClickException(f'Duration store {store} does not exist')
+
+    with DurationStore(store) as s:
+        s.export_store(output)
+
+    click.echo(f'Exported duration store {store} to {output}')
+
+
+@durations.command(name='import')
+@click.argument('input_file', metavar='INPUT', type=click.Path(dir_okay=False, file_okay=True))
+@click.option('--window', default=20, help='Number of the most recent runs kept for each test case')
+@click.pass_obj
+def import_store(store, input_file, window):
+    """Merge an exported duration store into the duration store. The duration store is created if not exists."""
+    from idf_ci.idf_pytest.durations import DurationStore
+
+    if not os.path.isfile(input_file):
+        raise click.ClickException(f'Duration store {input_file} does not exist')
+
+    with DurationStore(store, window=window) as s:
+        count = s.import_store(input_file)
+
+    click.echo(f'Imported {count} test case results from {input_file} into {store}')
@@ -0,0 +1,187 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Mapping of modified files to the components they belong to.
+
+The component mapping regexes are merged into one alternation, so that each file is searched only once. When several
+regexes match a file, the leftmost match wins.
+"""
+
+import logging
+import os
+import re
+import typing as t
+from functools import lru_cache
+
+from .utils import canonical_path
+
+logger = logging.getLogger(__name__)
+
+# numeric backreferences would point to other groups once the regexes are merged
+_NUMERIC_BACKREF_REGEX = re.compile(r'\\[1-9]')
+
+
+@lru_cache(maxsize=None)
+def compile_regexes(regexes: t.Tuple[str, ...]) -> t.Tuple[re.Pattern, ...]:
+    """Compile the regexes, cached by the regex strings.
+
+    :param regexes: Regex strings
+
+    :returns: Compiled regex patterns, without duplicates
+    """
+    return tuple({re.compile(regex): None for regex in regexes})
+
+
+def _merge_regexes(patterns: t.Sequence[re.Pattern]) -> t.Optional[re.Pattern]:
+    if not patterns:
+        return None
+
+    if any(
+        # global inline flags, e.g. ``(?i)``, would apply to all the merged regexes
+        p.flags & ~re.UNICODE or p.groups < 1 or _NUMERIC_BACKREF_REGEX.search(p.pattern)
+        for p in patterns
+    ):
+        return None
+
+    try:
+        return re.compile('|'.join(f'(?P<_c{i}>{p.pattern})' for i, p in enumerate(patterns)))
+    except re.error:
+        # e.g. group names used in several regexes
+        return None
+
+
+class ComponentMapper:
+    """Compiled component mapping settings.
+
+    :param mapping_regexes: Regexes to extract the component name from a file path, with the name as the first group
+    :param exclude_regexes: Regexes of file paths that don't belong to any component
+    :param ignored_file_extensions: Extensions of the files that don't belong to any component
+    """
+
+    def __init__(
+        self,
+        mapping_regexes: t.Iterable[str],
+        exclude_regexes: t.Iterable[str] = (),
+        ignored_file_extensions: t.Iterable[str] = (),
+    ) -> None:
+        self.mapping_patterns = compile_regexes(tuple(mapping_regexes))
+        self.exclude_patterns = compile_regexes(tuple(exclude_regexes))
+        self.ignored_file_extensions = frozenset(ignored_file_extensions)
+
+        self._mapping_regex = _merge_regexes(self.mapping_patterns)
+        # group index of the component name for each alternative
+        self._component_groups: t.Dict[str, int] = {}
+        if self._mapping_regex is not None:
+            self._component_groups = {
+                name: index + 1 for name, index in self._mapping_regex.groupindex.items() if name.startswith('_c')
+            }
+
+        self._exclude_regex: t.Optional[re.Pattern] = None
+        if self.exclude_patterns:
+            try:
+                self._exclude_regex = re.compile('|'.join(f'(?:{p.pattern})' for p in self.exclude_patterns))
+            except re.error:
+                pass
+
+    def is_ignored(self, path: str) -> bool:
+        """Check if the file is ignored by its extension.
+
+        :param path: File path
+
+        :returns: True if the file extension is ignored, False otherwise
+        """
+        return os.path.splitext(path)[1] in self.ignored_file_extensions
+
+    def is_excluded(self, abs_path: str) -> bool:
+        """Check if the file is excluded from the component mapping.
+
+        :param abs_path: Absolute POSIX file path
+
+        :returns: True if any exclude regex matches, False otherwise
+        """
+        if self._exclude_regex is not None:
+            return self._exclude_regex.search(abs_path) is not None
+
+        return any(p.search(abs_path) for p in self.exclude_patterns)
+
+    def search_component(self, path: str) -> t.Optional[t.Tuple[str, int]]:
+        """Search the component name in the path, without checking the exclusions.
+
+        :param path: POSIX path to search in
+
+        :returns: Component name and the end index of the match, or None if no mapping regex matches
+        """
+        if self._mapping_regex is not None:
+            match = self._mapping_regex.search(path)
+            if match is None:
+                return None
+            return match.group(self._component_groups[match.lastgroup]), match.end()  # type: ignore[index]
+
+        # the leftmost match wins, same as the merged regex
+        leftmost = None
+        for p in self.mapping_patterns:
+            match = p.search(path)
+            if match and (leftmost is None or match.start() < leftmost.start()):
+                leftmost = match
+
+        return (leftmost.group(1), leftmost.end()) if leftmost else None
+
+    def match_component(self, abs_path: str) -> t.Optional[str]:
+        """Get the component name from the file path, without checking the exclusions.
+
+        :param abs_path: Absolute POSIX file path
+
+        :returns: Component name, or None if no mapping regex matches
+        """
+        res = self.search_component(abs_path)
+        return res[0] if res else None
+
+    def get_component(self, path: str) -> t.Optional[str]:
+        """Get the component the file belongs to.
+
+        :param path: File path, relative to the current working directory
+
+        :returns: Component name, or None if the file doesn't belong to any component
+        """
+        if self.is_ignored(path):
+            return None
+
+        # always use absolute path as posix string
+        abs_path = canonical_path(path)
+        if self.is_excluded(abs_path):
+            logger.debug(f'Excluding {abs_path} from component mapping')
+            return None
+
+        return self.match_component(abs_path)
+
+    def get_modified_components(self, modified_files: t.Iterable[str]) -> t.Set[str]:
+        """Get the set of components that have been modified based on the provided files.
+
+        :param modified_files: Iterable of file paths that have been modified
+
+        :returns: Set of component names that have been modified
+        """
+        modified_components = set()
+
+        for modified_file in modified_files:
+            component = self.get_component(modified_file)
+            if component is not None:
+                modified_components.add(component)
+
+        return modified_components
+
+
+@lru_cache(maxsize=16)
+def get_component_mapper(
+    mapping_regexes: t.Tuple[str, ...],
+    exclude_regexes: t.Tuple[str, ...],
+    ignored_file_extensions: t.Tuple[str, ...],
+) -> ComponentMapper:
+    """Get the component mapper of the given settings, built once and cached.
+
+    :param mapping_regexes: Regexes to extract the component name from a file path
+    :param exclude_regexes: Regexes of file paths that don't belong to any component
+    :param ignored_file_extensions: Extensions of the files that don't belong to any component
+
+    :returns: Component mapper
+    """
+    return ComponentMapper(mapping_regexes, exclude_regexes, ignored_file_extensions)
@@ -6,25 +6,23 @@ import os
 import re
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
+from idf_ci.component_mapping import ComponentMapper, compile_regexes
 from idf_ci.settings import get_ci_settings
+from idf_ci.utils import PATH_CACHE_SIZE, canonical_path, project_relative_path
 
 logger = logging.getLogger(__name__)
 
 
-def _normalized_path(path: str) -> str:
-    raw_path = Path(path)
-    if not raw_path.is_absolute():
-        return raw_path.as_posix()
+def _normalized_path(path: str, project_root: Optional[str] = None) -> str:
+    if not os.path.isabs(path):
+        return Path(path).as_posix()
 
-    settings = get_ci_settings()
-    abs_path = raw_path.as_posix()
+    if project_root is None:
+        project_root = get_ci_settings().project_root.as_posix()
 
-    try:
-        return Path(abs_path).relative_to(settings.project_root).as_posix()
-    except ValueError:
-        return abs_path
+    return project_relative_path(path, project_root)
 
 
 def _component_mapping_search_path(path: str) -> str:
@@ -32,23 +30,28 @@ def _component_mapping_search_path(path: str) -> str:
     return f'{search_path.rstrip("/")}/'
 
 
-def _component_mapping_for_path(path: str) -> Optional[Tuple[str, str, str]]:
-    settings = get_ci_settings()
-    normalized_path = _normalized_path(path)
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _component_mapping_for_normalized_path(normalized_path: str, mapper: ComponentMapper) -> Optional[Tuple[str, str]]:
     candidate = _component_mapping_search_path(normalized_path)
+    res = mapper.search_component(candidate)
+    if res is None:
+        return None
 
-    for regex in settings.all_component_mapping_regexes:
-        match = regex.search(candidate)
-        if not match:
-            continue
+    component, end = res
+    root = candidate[:end].rstrip('/')
+    if not normalized_path.startswith('/'):
+        root = root.lstrip('/')
 
-        root = candidate[: match.end()].rstrip('/')
-        if not normalized_path.startswith('/'):
-            root = root.lstrip('/')
+    return component, root
 
-        return match.group(1), root, normalized_path
 
-    return None
+def _component_mapping_for_path(path: str, project_root: Optional[str] = None) -> Optional[Tuple[str, str, str]]:
+    normalized_path = _normalized_path(path, project_root)
+    res = _component_mapping_for_normalized_path(normalized_path, get_ci_settings().component_mapper)
+    if res is None:
+        return None
+
+    return res[0], res[1], normalized_path
 
 
 def folder_for_path(path: str) -> str:
@@ -66,20 +69,34 @@ def collapse_folders(folders: Iterable[str]) -> List[str]:
     return collapsed
 
 
-def extract_targets(path: str) -> Set[str]:
-    settings = get_ci_settings()
+@lru_cache()
+def _overlapping_target_regexes(regexes: Tuple[str, ...]) -> Tuple[re.Pattern, ...]:
+    # lookahead regexes to find the overlapping matches, e.g. esp32 and esp32s2 in esp32_esp32s2
+    return tuple(re.compile(f'(?={regex.pattern})', regex.flags) for regex in compile_regexes(regexes))
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _extract_targets(path: str, overlapping_regexes: Tuple[re.Pattern, ...]) -> FrozenSet[str]:
     candidates = [path]
     if not path.endswith('/'):
         candidates.append(f'{path}/')
 
     found_targets: Set[str] = set()
     for candidate in candidates:
-        for regex in settings.all_component_target_regexes:
-            overlapping_regex = re.compile(f'(?={regex.pattern})', regex.flags)
-            for match in overlapping_regex.findall(candidate):
+        for regex in overlapping_regexes:
+            for match in regex.findall(candidate):
                 found_targets.add(match[0] if isinstance(match, tuple) else match)
 
-    return found_targets
+    return frozenset(found_targets)
+
+
+def extract_targets(path: str) -> Set[str]:
+    settings = get_ci_settings()
+    overlapping_regexes = _overlapping_target_regexes(
+        tuple(settings.component_target_regexes + settings.extend_component_target_regexes)
+    )
+
+    return set(_extract_targets(path, overlapping_regexes))
 
 
 def targets_for_folders(folders: List[str]) -> List[str]:
@@ -94,18 +111,14 @@ def targets_for_folders(folders: List[str]) -> List[str]:
     return sorted(found_targets)
 
 
-def _is_path_excluded(path: str) -> bool:
-    abs_path = Path(os.path.abspath(path)).as_posix()
-    settings = get_ci_settings()
-
-    return any(regex.search(abs_path) for regex in settings.all_component_mapping_exclude_regexes)
-
-
 @lru_cache()
 def component_targets_from_files(
     modified_files: Iterable[str],
 ) -> Dict[str, List[str]]:
     component_groups: Dict[str, Set[str]] = {}
+    settings = get_ci_settings()
+    project_root = settings.project_root.as_posix()
+    mapper = settings.component_mapper
 
     for path in modified_files:
         if not isinstance(path, str):
@@ -115,15 +128,16 @@ def component_targets_from_files(
         if not path:
             continue
 
-        if _is_path_excluded(path):
+        if mapper.is_excluded(canonical_path(path)):
             logger.debug('Skipping excluded path for component mapping: %s', path)
             continue
 
-        component_mapping = _component_mapping_for_path(path)
+        normalized_path = _normalized_path(path, project_root)
+        component_mapping = _component_mapping_for_normalized_path(normalized_path, mapper)
         if component_mapping is None:
             continue
 
-        component, root, normalized_path = component_mapping
+        component, root = component_mapping
         folder = folder_for_path(normalized_path)
         if not folder.startswith(root):
             folder = root
@@ -142,22 +156,13 @@ def component_targets_from_files(
     return res
 
 
-def combined_targets_for_components(
-    modified_files: Iterable[str],
+def _combined_targets(
+    component_targets: Dict[str, List[str]],
     check_components: Iterable[str],
 ) -> List[str]:
-    component_targets = component_targets_from_files(tuple(modified_files))
     combined_targets: Set[str] = set()
-    if not check_components:
-        for k in component_targets:
-            targets = component_targets.get(k)
-            if not targets:
-                continue
-            if targets == ['all']:
-                return ['all']
-            combined_targets.update(targets)
-
-    for component in check_components:
+    # all the modified components when no component is checked
+    for component in check_components or component_targets:
         targets = component_targets.get(component)
         if not targets:
             continue
@@ -168,11 +173,40 @@ def combined_targets_for_components(
     return sorted(combined_targets)
 
 
+def combined_targets_for_components(
+    modified_files: Iterable[str],
+    check_components: Iterable[str],
+) -> List[str]:
+    return _combined_targets(component_targets_from_files(tuple(modified_files)), check_components)
+
+
+def _should_skip(targets: List[str], current_target: str) -> bool:
+    return bool(targets) and 'all' not in targets and current_target not in targets
+
+
 def should_skip_build_for_components(
     modified_files: Iterable[str],
     check_components: Iterable[str],
     current_target: str,
 ) -> bool:
     targets = combined_targets_for_components(modified_files, check_components)
-    should_skip = bool(targets) and 'all' not in targets and current_target not in targets
-    return should_skip
+    return _should_skip(targets, current_target)
+
+
+def should_skip_builds_for_components(
+    modified_files: Iterable[str],
+    checks: Iterable[Tuple[Optional[Iterable[str]], str]],
+) -> List[bool]:
+    # batched should_skip_build_for_components, the targets are combined once for each distinct set of components
+    component_targets = component_targets_from_files(tuple(modified_files))
+
+    targets_by_components: Dict[FrozenSet[str], List[str]] = {}
+    res = []
+    for check_components, current_target in checks:
+        key = frozenset(check_components or ())
+        targets = targets_by_components.get(key)
+        if targets is None:
+            targets = targets_by_components[key] = _combined_targets(component_targets, key)
+        res.append(_should_skip(targets, current_target))
+
+    return res
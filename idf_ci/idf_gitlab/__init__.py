@@ -9,7 +9,32 @@ __all__ = [
     'test_child_pipeline',
 ]
 
+import importlib
+import typing as t
 
-from .api import ArtifactManager, ArtifactParams
-from .pipeline import build_child_pipeline, test_child_pipeline
-from .scripts import pipeline_variables
+if t.TYPE_CHECKING:
+    from .api import ArtifactManager, ArtifactParams
+    from .pipeline import build_child_pipeline, test_child_pipeline
+    from .scripts import pipeline_variables
+
+# imported on first access, the gitlab and minio clients are slow to import
+_LAZY_ATTRS = {
+    'ArtifactManager': '.api',
+    'ArtifactParams': '.api',
+    'build_child_pipeline': '.pipeline',
+    'pipeline_variables': '.scripts',
+    'test_child_pipeline': '.pipeline',
+}
+
+
+def __getattr__(name: str) -> t.Any:
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> t.List[str]:
+    return sorted([*globals(), *_LAZY_ATTRS])
@@ -1,6 +1,7 @@
 # SPDX-FileCopyrightText: 2025-2026 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
 import glob
+import io
 import json
 import logging
 import os
@@ -593,7 +594,7 @@ class ArtifactManager:
         folder: t.Optional[str] = None,
         presigned_json: t.Optional[str] = None,
         build_dir: t.Optional[str] = None,
-    ) -> None:
+    ) -> int:
         """Download artifacts from S3 or via presigned URLs.
 
         When presigned_json is provided, downloads artifacts from presigned URLs.
@@ -610,6 +611,8 @@ class ArtifactManager:
         :param build_dir: Optional build directory to download artifacts for only. When
             provided, relative paths are resolved from ``folder``.
 
+        :returns: Number of the downloaded files or zip files
+
         :raises ValueError: If S3 artifacts are not enabled
         """
         if not self.settings.gitlab.artifacts.s3.enable:
@@ -649,7 +652,7 @@ class ArtifactManager:
                         artifact_type=art_type,
                     )
             logger.info(f'Downloaded {downloaded_count} artifacts in {time.time() - start_time:.2f} seconds')
-            return
+            return downloaded_count
 
         # download from presigned urls
         logger.info(f'Downloading artifacts under {from_path} from presigned JSON')
@@ -670,6 +673,7 @@ class ArtifactManager:
                     art_type,
                 )
         logger.info(f'Downloaded {downloaded_count} artifacts in {time.time() - start_time:.2f} seconds')
+        return downloaded_count
 
     def upload_artifacts(
         self,
@@ -823,6 +827,91 @@ class ArtifactManager:
 
         return presigned_urls
 
+    ###############
+    # Build Cache #
+    ###############
+    def _build_cache_object_name(self, fingerprint: str) -> str:
+        return f'{self.settings.gitlab.project}/build_cache/{fingerprint}.json'
+
+    def get_build_cache_entries(self, fingerprints: t.Iterable[str]) -> t.Dict[str, t.Dict[str, str]]:
+        """Get the recorded builds of the app input fingerprints.
+
+        :param fingerprints: Input fingerprints of the apps
+
+        :returns: Dict of the fingerprint to its recorded build, with the ``commit_sha`` and the ``build_dir``.
+            Fingerprints without recorded builds are not included
+
+        :raises ValueError: If S3 artifacts are not enabled
+        :raises S3Error: If S3 is not configured
+        """
+        if not self.settings.gitlab.artifacts.s3.enable:
+            raise ValueError('S3 artifacts are not enabled in the CI settings')
+
+        s3_client = self.s3_client
+        if not s3_client:
+            raise S3Error('Configure S3 storage to reuse the builds')
+
+        bucket = self.settings.gitlab.artifacts.s3.build_cache_bucket
+
+        def _get_entry_task(_fingerprint: str) -> t.Optional[t.Tuple[str, t.Dict[str, str]]]:
+            try:
+                response = s3_client.get_object(bucket, self._build_cache_object_name(_fingerprint))
+            except minio.error.S3Error as e:
+                if e.code == 'NoSuchKey':
+                    return None
+                raise
+
+            try:
+                return _fingerprint, json.loads(response.data)
+            finally:
+                response.close()
+                response.release_conn()
+
+        tasks = [lambda _fingerprint=fingerprint: _get_entry_task(_fingerprint) for fingerprint in fingerprints]
+        return dict(execute_concurrent_tasks(tasks, task_name='getting build cache entry'))
+
+    def put_build_cache_entries(
+        self,
+        build_dirs: t.Dict[str, str],
+        *,
+        commit_sha: t.Optional[str] = None,
+    ) -> None:
+        """Record the builds of the app input fingerprints.
+
+        :param build_dirs: Dict of the fingerprint to the build directory of the app, relative to the project root
+        :param commit_sha: Optional commit SHA. If no commit_sha provided, will use 1)
+            PIPELINE_COMMIT_SHA env var, 2) latest commit from current branch
+
+        :raises ValueError: If S3 artifacts are not enabled
+        :raises S3Error: If S3 is not configured
+        """
+        if not self.settings.gitlab.artifacts.s3.enable:
+            raise ValueError('S3 artifacts are not enabled in the CI settings')
+
+        s3_client = self.s3_client
+        if not s3_client:
+            raise S3Error('Configure S3 storage to record the builds')
+
+        params = ArtifactParams(commit_sha=commit_sha)
+        bucket = self.settings.gitlab.artifacts.s3.build_cache_bucket
+
+        def _put_entry_task(_fingerprint: str, _build_dir: str) -> None:
+            data = json.dumps({'commit_sha': params.commit_sha, 'build_dir': _build_dir}).encode('utf-8')
+            s3_client.put_object(
+                bucket,
+                self._build_cache_object_name(_fingerprint),
+                io.BytesIO(data),
+                len(data),
+                content_type='application/json',
+            )
+
+        tasks = [
+            lambda _fingerprint=fingerprint, _build_dir=build_dir: _put_entry_task(_fingerprint, _build_dir)
+            for fingerprint, build_dir in build_dirs.items()
+        ]
+        execute_concurrent_tasks(tasks, task_name='putting build cache entry')
+        logger.info(f'Recorded {len(tasks)} builds of commit {params.commit_sha}')
+
     def _download_presigned_json_from_pipeline(
         self, pipeline_id: str, presigned_json_filename: str = 'presigned.json'
     ) -> str:
@@ -0,0 +1,224 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Cache of the generated child pipeline files, keyed by the digest of the generation inputs.
+
+Retries of the generator jobs, and pipelines with the same inputs, get the generated files back from the cache instead
+of finding the apps and collecting the test cases again.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import typing as t
+
+from ..envs import GitlabEnvVars
+from ..settings import get_ci_settings
+
+logger = logging.getLogger(__name__)
+
+# not affecting the generated files
+_IGNORED_ENV_VARS = frozenset(
+    [
+        'GITLAB_HTTPS_SERVER',
+        'GITLAB_ACCESS_TOKEN',
+        'IDF_S3_SERVER',
+        'IDF_S3_ACCESS_KEY',
+        'IDF_S3_SECRET_KEY',
+        'IDF_S3_TIMEOUT_TOTAL',
+    ]
+)
+
+
+def _idf_ci_version() -> str:
+    try:
+        from importlib.metadata import version
+    except ImportError:  # python 3.7
+        return ''
+
+    try:
+        return version('idf-ci')
+    except Exception:
+        return ''
+
+
+def _file_digest(filepath: str) -> str:
+    if not os.path.isfile(filepath):
+        return ''
+
+    with open(filepath, 'rb') as fr:
+        return hashlib.sha256(fr.read()).hexdigest()
+
+
+def _tracked_files_digest(filepatterns: t.Sequence[str]) -> t.Optional[str]:
+    if not filepatterns:
+        return ''
+
+    # object ids of the files in the index, without reading the files
+    try:
+        output = subprocess.run(
+            ['git', 'ls-files', '-s', '-z', '--', *(f':(glob){pattern}' for pattern in filepatterns)],
+            check=True,
+            capture_output=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.debug('Failed to list the files tracked by git: %s', e)
+        return None
+
+    return hashlib.sha256(output).hexdigest()
+
+
+def get_inputs_digest(
+    name: str,
+    *,
+    modified_files: t.Optional[t.Sequence[str]] = None,
+    filepaths: t.Iterable[t.Optional[str]] = (),
+    filepatterns: t.Iterable[str] = (),
+    args: t.Optional[t.Dict[str, t.Any]] = None,
+) -> t.Optional[str]:
+    """Compute the digest of the inputs of generating a child pipeline.
+
+    The inputs include the CI settings, the environment variables read by ``GitlabEnvVars``, and the git object ids
+    of the files tracked by git matching ``generation_cache_filepatterns`` of the pipeline, besides the given ones.
+
+    :param name: Name of the child pipeline, ``build`` or ``test``
+    :param modified_files: Modified files
+    :param filepaths: Paths to the input files. Missing files are also part of the inputs
+    :param filepatterns: Glob patterns of the input files, like the artifacts of the previous jobs
+    :param args: Other arguments of the generation, serializable to JSON
+
+    :returns: Hex digest of the inputs, or None if the files tracked by git can't be listed
+    """
+    settings = get_ci_settings()
+    pipeline_settings = settings.gitlab.test_pipeline if name == 'test' else settings.gitlab.build_pipeline
+
+    tracked_files_digest = _tracked_files_digest(pipeline_settings.generation_cache_filepatterns)
+    if tracked_files_digest is None:
+        return None
+
+    envs = {k: v for k, v in GitlabEnvVars().model_dump().items() if k not in _IGNORED_ENV_VARS}
+
+    h = hashlib.sha256()
+
+    def _update(*items: str) -> None:
+        for item in items:
+            h.update(item.encode('utf-8') + b'\0')
+
+    _update(name, _idf_ci_version(), settings.model_dump_json(), json.dumps(envs, sort_keys=True, default=str))
+    _update('modified_files', json.dumps(sorted(modified_files) if modified_files is not None else None))
+    _update('tracked_files', tracked_files_digest)
+    _update('args', json.dumps(args, sort_keys=True))
+
+    for filepath in filepaths:
+        if filepath:
+            _update('file', filepath, _file_digest(filepath))
+
+    for pattern in filepatterns:
+        for filepath in sorted(glob.glob(pattern, recursive=True)):
+            _update('file', filepath, _file_digest(filepath))
+
+    return h.hexdigest()
+
+
+class GenerationCache:
+    """Cached output files of generating a child pipeline.
+
+    Each entry is a folder named by the input digest, holding copies of the output files and folders.
+
+    :param cache_dir: Path to the cache folder
+    :param digest: Digest of the generation inputs
+    """
+
+    def __init__(self, cache_dir: str, digest: str) -> None:
+        self.cache_dir = cache_dir
+        self.digest = digest
+
+    @property
+    def entry_dir(self) -> str:
+        return os.path.join(self.cache_dir, self.digest)
+
+    def restore(self, outputs: t.Sequence[str]) -> bool:
+        """Restore the cached output files.
+
+        Outputs that didn't exist while generating are removed.
+
+        :param outputs: Paths to the output files or folders, same as the ones stored
+
+        :returns: True if restored, False if not cached
+        """
+        manifest = os.path.join(self.entry_dir, 'outputs.json')
+        if not os.path.isfile(manifest):
+            return False
+
+        with open(manifest) as fr:
+            stored = json.load(fr)
+
+        if stored != list(outputs):
+            logger.debug('Cached outputs %s differ from %s', stored, outputs)
+            return False
+
+        for i, output in enumerate(outputs):
+            if os.path.isdir(output):
+                shutil.rmtree(output)
+            elif os.path.isfile(output):
+                os.remove(output)
+
+            cached = os.path.join(self.entry_dir, str(i))
+            if os.path.isdir(cached):
+                shutil.copytree(cached, output)
+            elif os.path.isfile(cached):
+                if os.path.dirname(output):
+                    os.makedirs(os.path.dirname(output), exist_ok=True)
+                shutil.copyfile(cached, output)
+
+        return True
+
+    def store(self, outputs: t.Sequence[str]) -> None:
+        """Store the output files.
+
+        :param outputs: Paths to the output files or folders. Missing ones are recorded as missing
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # entries are complete once renamed, in case of concurrent generator jobs
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir)
+        try:
+            for i, output in enumerate(outputs):
+                if os.path.isdir(output):
+                    shutil.copytree(output, os.path.join(tmp_dir, str(i)))
+                elif os.path.isfile(output):
+                    shutil.copyfile(output, os.path.join(tmp_dir, str(i)))
+
+            with open(os.path.join(tmp_dir, 'outputs.json'), 'w') as fw:
+                json.dump(list(outputs), fw)
+
+            if os.path.isdir(self.entry_dir):
+                shutil.rmtree(self.entry_dir)
+            os.rename(tmp_dir, self.entry_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+
+def get_generation_cache(name: str, **kwargs: t.Any) -> t.Optional[GenerationCache]:
+    """Get the cache of generating the child pipeline with the given inputs.
+
+    :param name: Name of the child pipeline, ``build`` or ``test``
+    :param kwargs: Inputs passed to :func:`get_inputs_digest`
+
+    :returns: The cache, or None if ``generation_cache_dir`` of the pipeline is not set, or the inputs can't be
+        determined
+    """
+    settings = get_ci_settings()
+    pipeline_settings = settings.gitlab.test_pipeline if name == 'test' else settings.gitlab.build_pipeline
+    if not pipeline_settings.generation_cache_dir:
+        return None
+
+    digest = get_inputs_digest(name, **kwargs)
+    if digest is None:
+        return None
+
+    return GenerationCache(os.path.join(pipeline_settings.generation_cache_dir, name), digest)
@@ -3,20 +3,40 @@
 """This file is used for generating the child pipeline for build jobs."""
 
 import logging
+import math
 import os
+import re
+import shutil
+import statistics
 import typing as t
+from functools import lru_cache
 
 import yaml
 from idf_build_apps import App
-from jinja2 import Environment
-
+from jinja2 import Environment, Template, nodes
+
+from idf_ci.app_durations import (
+    dump_app_shards,
+    estimate_build_durations,
+    load_build_durations,
+    shard_apps_by_duration,
+)
+from idf_ci.app_list import dump_compact_apps
+from idf_ci.build_cache import find_cached_builds
 from idf_ci.envs import GitlabEnvVars
-from idf_ci.idf_pytest import GroupedPytestCases, get_pytest_cases
+from idf_ci.idf_gitlab.generation_cache import get_generation_cache
+from idf_ci.idf_pytest import GroupedPytestCases, PytestCase, PytestCaseRecord, get_pytest_cases
+from idf_ci.idf_pytest.durations import CaseDurationStats, DurationStore, load_junit_stats
 from idf_ci.scripts import get_all_apps
 from idf_ci.settings import CiSettings, get_ci_settings
+from idf_ci.utils import canonical_path, lpt_partition
 
 logger = logging.getLogger(__name__)
 
+_JINJA_ENV = Environment()
+# stands for the rendered jobs in the rendered YAML template
+_JOBS_PLACEHOLDER = '\0idf-ci-jobs\0'
+
 
 def _parallel_count(item_count: int, runs_per_job: int) -> int:
     if item_count <= 0:
@@ -25,6 +45,194 @@ def _parallel_count(item_count: int, runs_per_job: int) -> int:
     return (item_count - 1) // runs_per_job + 1
 
 
+class ParallelPlan(t.NamedTuple):
+    """Number of parallel jobs chosen for a job by the available runners."""
+
+    job_name: str
+    item_count: int
+    total_duration: float
+    runner_count: int
+    parallel_count: int
+    expected_duration: float
+
+
+def _runner_count(runner_counts: t.Dict[str, int], tags: t.Iterable[str]) -> int:
+    return runner_counts.get(','.join(sorted(tags)), 0)
+
+
+def _plan_parallel_count(
+    durations: t.Sequence[float],
+    runner_count: int,
+    startup_overhead: float,
+) -> t.Tuple[int, float]:
+    """Choose the number of parallel jobs with the least expected duration.
+
+    Each parallel job is expected to take the startup overhead plus an even share of the total duration, or the
+    duration of the longest item if it's longer. Parallel jobs more than the runners wait for the previous ones.
+
+    :param durations: Durations in seconds of the items
+    :param runner_count: Number of the available runners
+    :param startup_overhead: Startup overhead in seconds of each job
+
+    :returns: Tuple of (number of parallel jobs, expected duration in seconds). The fewest jobs on ties
+    """
+    total = sum(durations)
+    longest = max(durations)
+
+    best_count, best_duration = 1, math.inf
+    for count in range(1, len(durations) + 1):
+        expected_duration = math.ceil(count / runner_count) * (startup_overhead + max(total / count, longest))
+        if expected_duration < best_duration:
+            best_count, best_duration = count, expected_duration
+
+    return best_count, best_duration
+
+
+def _render_parallel_plans(plans: t.List[ParallelPlan]) -> str:
+    if not plans:
+        return ''
+
+    lines = ['# Parallel jobs chosen by the available runners:']
+    for plan in plans:
+        lines.append(
+            f'#   {plan.job_name}: {plan.item_count} items, {plan.total_duration:.0f}s in total, '
+            f'{plan.runner_count} runners -> parallel {plan.parallel_count}, '
+            f'expected {plan.expected_duration:.0f}s'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+@lru_cache(maxsize=None)
+def _get_template(source: str) -> Template:
+    return _JINJA_ENV.from_string(source)
+
+
+@lru_cache(maxsize=None)
+def _outputs_jobs_unfiltered(source: str) -> bool:
+    # `{{ jobs }}` is the only way the template uses `jobs`, no filters, tests, or assignments
+    ast = _JINJA_ENV.parse(source)
+    names = [node for node in ast.find_all(nodes.Name) if node.name == 'jobs']
+    outputs = [
+        node
+        for output in ast.find_all(nodes.Output)
+        for node in output.nodes
+        if isinstance(node, nodes.Name) and node.name == 'jobs'
+    ]
+    return len(names) == len(outputs)
+
+
+def _write_pipeline_yaml(
+    fw: t.TextIO,
+    yaml_jinja: str,
+    jobs_jinja: str,
+    context: t.Dict[str, t.Any],
+    jobs_context: t.Optional[t.Dict[str, t.Any]] = None,
+) -> None:
+    """Render the pipeline YAML template into the file, with the jobs template streamed in place of ``jobs``.
+
+    The jobs are written chunk by chunk, instead of being rendered into one string and rendered again within the
+    pipeline YAML template. This only works when the pipeline YAML template outputs ``{{ jobs }}`` exactly once and
+    unfiltered. Otherwise, like ``{{ jobs | indent(2) }}``, the jobs are rendered into one string first.
+
+    :param fw: Output file
+    :param yaml_jinja: Jinja2 template of the pipeline YAML
+    :param jobs_jinja: Jinja2 template of the jobs
+    :param context: Variables of both templates
+    :param jobs_context: Extra variables of the jobs template
+    """
+    jobs_context = {**context, **(jobs_context or {})}
+    if _outputs_jobs_unfiltered(yaml_jinja):
+        rendered = _get_template(yaml_jinja).render({**context, 'jobs': _JOBS_PLACEHOLDER})
+        if rendered.count(_JOBS_PLACEHOLDER) == 1:
+            head, _, tail = rendered.partition(_JOBS_PLACEHOLDER)
+            fw.write(head)
+            fw.writelines(_get_template(jobs_jinja).generate(jobs_context))
+            fw.write(tail)
+            return
+
+    # customized template not rendering the jobs exactly once, or transforming them
+    fw.write(_get_template(yaml_jinja).render({**context, 'jobs': _get_template(jobs_jinja).render(jobs_context)}))
+
+
+def _write_nodes_file(dirpath: str, index: int, job_name: str, nodes: str) -> str:
+    filepath = os.path.join(dirpath, f'{index}_{re.sub(r"[^A-Za-z0-9]+", "_", job_name).strip("_")}.txt')
+    os.makedirs(dirpath, exist_ok=True)
+    with open(filepath, 'w') as fw:
+        fw.write(nodes + '\n')
+
+    return filepath
+
+
+def _prioritize_cases(
+    cases: t.Sequence[t.Union[PytestCase, PytestCaseRecord]],
+    durations: t.Dict[str, float],
+    case_stats: t.Dict[str, CaseDurationStats],
+    modified_dirs: t.Set[str],
+    default_duration: float,
+) -> t.List[t.Union[PytestCase, PytestCaseRecord]]:
+    """Order the test cases to fail fast.
+
+    Test cases failed in the most recent run come first, then the flaky ones, then the ones in the folders of the
+    modified test scripts, then the rest. Each part is ordered by ascending duration.
+
+    :param cases: Test cases
+    :param durations: Dict of case id to its duration in seconds
+    :param case_stats: Dict of case id to its statistics
+    :param modified_dirs: Canonical paths of the folders of the modified test scripts
+    :param default_duration: Duration in seconds of the test cases not in ``durations``
+
+    :returns: Ordered test cases
+    """
+
+    def _key(case: t.Union[PytestCase, PytestCaseRecord]) -> t.Tuple[int, float]:
+        stats = case_stats.get(case.caseid)
+        if stats and stats.last_failed:
+            priority = 0
+        elif stats and stats.flake_rate > 0:
+            priority = 1
+        elif os.path.dirname(canonical_path(case.path)) in modified_dirs:
+            priority = 2
+        else:
+            priority = 3
+        return priority, durations.get(case.caseid, default_duration)
+
+    return sorted(cases, key=_key)
+
+
+def _split_cases_by_duration(
+    cases: t.Sequence[t.Union[PytestCase, PytestCaseRecord]],
+    durations: t.Dict[str, float],
+    *,
+    target_duration: float,
+    max_cases_per_job: int,
+    default_duration: float,
+) -> t.List[t.List[t.Union[PytestCase, PytestCaseRecord]]]:
+    """Split the test cases into jobs of about the target duration.
+
+    The longest test cases are assigned first, each to the job with the least total duration that is not full yet.
+
+    :param cases: Test cases
+    :param durations: Dict of case id to its duration in seconds
+    :param target_duration: Target duration in seconds of each job
+    :param max_cases_per_job: Maximum number of test cases in each job
+    :param default_duration: Duration in seconds of the test cases not in ``durations``
+
+    :returns: Test cases of each job, in the original order
+    """
+    if not cases:
+        return []
+
+    case_durations = [durations.get(c.caseid, default_duration) for c in cases]
+    job_count = max(
+        math.ceil(sum(case_durations) / target_duration),
+        _parallel_count(len(cases), max_cases_per_job),
+    )
+    job_count = min(max(job_count, 1), len(cases))
+
+    jobs = lpt_partition(case_durations, job_count, max_items_per_bin=max_cases_per_job)
+    return [[cases[i] for i in job] for job in jobs]
+
+
 def _get_fake_pass_job(settings: CiSettings, workflow_name: str) -> t.Dict[str, t.Any]:
     # no matter being used in build or test child pipeline,
     # always use the same fake_pass job that extends the build job template
@@ -51,13 +259,39 @@ def _get_fake_pass_job(settings: CiSettings, workflow_name: str) -> t.Dict[str,
     }
 
 
-def dump_apps_to_txt(apps: t.List[App], output_file: str) -> None:
-    """Dump a list of apps to a text file, one app per line."""
+def dump_apps_to_txt(apps: t.Sequence[App], output_file: str) -> None:
+    """Dump a list of apps to a text file, one app per line.
+
+    The compact format is used instead if ``compact_collected_apps`` is set, or the file ends with ``.msgpack``.
+    """
+    if get_ci_settings().compact_collected_apps or output_file.endswith('.msgpack'):
+        dump_compact_apps(apps, output_file)
+        return
+
     with open(output_file, 'w') as fw:
         for app in apps:
             fw.write(app.model_dump_json() + '\n')
 
 
+def _shard_apps(
+    apps: t.Sequence[App],
+    cached: t.Set[int],
+    durations: t.Dict[t.Tuple[str, str, str], float],
+    parallel_count: int,
+) -> t.List[t.List[App]]:
+    shards = shard_apps_by_duration(
+        [app for i, app in enumerate(apps) if i not in cached],
+        durations,
+        parallel_count,
+        default_duration=get_ci_settings().gitlab.build_pipeline.default_app_duration,
+    )
+    # downloading the cached builds is cheap, spread them by count
+    for i, app_index in enumerate(sorted(cached)):
+        shards[i % parallel_count].append(apps[app_index])
+
+    return shards
+
+
 def build_child_pipeline(
     *,
     paths: t.Optional[t.List[str]] = None,
@@ -65,8 +299,18 @@ def build_child_pipeline(
     compare_manifest_sha_filepath: t.Optional[str] = None,
     yaml_output: t.Optional[str] = None,
 ) -> None:
-    """Generate build child pipeline."""
-    envs = GitlabEnvVars()
+    """Generate build child pipeline.
+
+    When the build durations of the apps are recorded in ``gitlab.build_pipeline.duration_filepatterns``, the apps of
+    each build job are sharded into the parallel jobs by their build durations, recorded in
+    ``gitlab.build_pipeline.app_shards_filepath``.
+
+    When ``gitlab.build_pipeline.build_cache`` is enabled, apps built in previous pipelines with the same input
+    fingerprints are not counted while choosing the number of parallel jobs, since they're only downloaded.
+
+    When ``gitlab.build_pipeline.generation_cache_dir`` is set, the generated files are cached by the digest of the
+    inputs, and restored if generated before.
+    """
     settings = get_ci_settings()
 
     if compare_manifest_sha_filepath and not os.path.isfile(compare_manifest_sha_filepath):
@@ -75,6 +319,49 @@ def build_child_pipeline(
     if yaml_output is None:
         yaml_output = settings.gitlab.build_pipeline.yaml_filename
 
+    build_pipeline = settings.gitlab.build_pipeline
+    outputs = [
+        yaml_output,
+        settings.collected_test_related_apps_filepath,
+        settings.collected_non_test_related_apps_filepath,
+        build_pipeline.app_shards_filepath,
+    ]
+    cache = None
+    # the builds of previous pipelines, stored in S3, are not part of the inputs
+    if not build_pipeline.build_cache:
+        cache = get_generation_cache(
+            'build',
+            modified_files=modified_files,
+            # the test impact index selects the test related apps
+            filepaths=[compare_manifest_sha_filepath, settings.test_impact_index_filepath],
+            filepatterns=build_pipeline.duration_filepatterns,
+            args={'paths': paths},
+        )
+    if cache is not None and cache.restore(outputs):
+        logger.info('Restored the build child pipeline generated with the same inputs in %s', yaml_output)
+        return
+
+    _generate_build_child_pipeline(
+        paths=paths,
+        modified_files=modified_files,
+        compare_manifest_sha_filepath=compare_manifest_sha_filepath,
+        yaml_output=yaml_output,
+    )
+
+    if cache is not None:
+        cache.store(outputs)
+
+
+def _generate_build_child_pipeline(
+    *,
+    paths: t.Optional[t.List[str]],
+    modified_files: t.Optional[t.List[str]],
+    compare_manifest_sha_filepath: t.Optional[str],
+    yaml_output: str,
+) -> None:
+    envs = GitlabEnvVars()
+    settings = get_ci_settings()
+
     # Check if we should run quick pipeline
     if envs.select_by_filter_expr:
         # we only build test related apps
@@ -83,7 +370,7 @@ def build_child_pipeline(
             marker_expr='not host_test',
             filter_expr=envs.select_by_filter_expr,
         )
-        non_test_related_apps: t.List[App] = []
+        non_test_related_apps: t.Sequence[App] = []
         dump_apps_to_txt(test_related_apps, settings.collected_test_related_apps_filepath)
     else:
         test_related_apps, non_test_related_apps = get_all_apps(
@@ -96,13 +383,43 @@ def build_child_pipeline(
         dump_apps_to_txt(non_test_related_apps, settings.collected_non_test_related_apps_filepath)
 
     apps_total = len(test_related_apps) + len(non_test_related_apps)
-    test_related_parallel_count = _parallel_count(
-        len(test_related_apps),
-        settings.gitlab.build_pipeline.runs_per_job,
+    build_pipeline = settings.gitlab.build_pipeline
+    durations = (
+        load_build_durations(build_pipeline.duration_filepatterns) if build_pipeline.duration_filepatterns else {}
     )
-    non_test_related_parallel_count = _parallel_count(
-        len(non_test_related_apps),
-        settings.gitlab.build_pipeline.runs_per_job,
+
+    test_related_cached: t.Set[int] = set()
+    non_test_related_cached: t.Set[int] = set()
+    if build_pipeline.build_cache:
+        test_related_cached = set(find_cached_builds(test_related_apps))
+        non_test_related_cached = set(find_cached_builds(non_test_related_apps))
+
+    plans: t.List[ParallelPlan] = []
+    runner_count = _runner_count(build_pipeline.runner_counts, build_pipeline.job_tags)
+
+    def _build_parallel_count(job_name: str, all_apps: t.Sequence[App], cached: t.Set[int]) -> int:
+        apps = [app for i, app in enumerate(all_apps) if i not in cached]
+        if not apps:
+            # still need a job to download the cached builds
+            return 1 if cached else 0
+
+        if not runner_count:
+            return _parallel_count(len(apps), build_pipeline.runs_per_job)
+
+        app_durations = estimate_build_durations(apps, durations, build_pipeline.default_app_duration)
+        parallel_count, expected_duration = _plan_parallel_count(
+            app_durations, runner_count, build_pipeline.job_startup_overhead
+        )
+        plans.append(
+            ParallelPlan(job_name, len(apps), sum(app_durations), runner_count, parallel_count, expected_duration)
+        )
+        return parallel_count
+
+    test_related_parallel_count = _build_parallel_count(
+        f'build_test_related_apps{build_pipeline.job_name_suffix}', test_related_apps, test_related_cached
+    )
+    non_test_related_parallel_count = _build_parallel_count(
+        f'build_non_test_related_apps{build_pipeline.job_name_suffix}', non_test_related_apps, non_test_related_cached
     )
 
     if not apps_total:
@@ -117,32 +434,45 @@ def build_child_pipeline(
         len(test_related_apps),
         len(non_test_related_apps),
     )
+    if build_pipeline.build_cache:
+        logger.info(
+            'Reusing the builds of %d apps from previous pipelines, not counted in the parallel counts',
+            len(test_related_cached) + len(non_test_related_cached),
+        )
     logger.info(
         'Test related parallel count: %d, Non-test related parallel count: %d',
         test_related_parallel_count,
         non_test_related_parallel_count,
     )
 
-    job_template = Environment().from_string(settings.gitlab.build_pipeline.job_template_jinja)
-    jobs_template = Environment().from_string(settings.gitlab.build_pipeline.jobs_jinja)
-    yaml_template = Environment().from_string(settings.gitlab.build_pipeline.yaml_jinja)
-
-    with open(yaml_output, 'w') as fw:
-        fw.write(
-            yaml_template.render(
-                job_template=job_template.render(
-                    settings=settings,
+    if durations:
+        logger.info('Found build durations of %d apps, sharding the apps by build durations', len(durations))
+        dump_app_shards(
+            {
+                'test_related': _shard_apps(
+                    test_related_apps, test_related_cached, durations, test_related_parallel_count
                 ),
-                jobs=jobs_template.render(
-                    settings=settings,
-                    test_related_apps_count=len(test_related_apps),
-                    test_related_parallel_count=test_related_parallel_count,
-                    non_test_related_apps_count=len(non_test_related_apps),
-                    non_test_related_parallel_count=non_test_related_parallel_count,
+                'non_test_related': _shard_apps(
+                    non_test_related_apps, non_test_related_cached, durations, non_test_related_parallel_count
                 ),
-                settings=settings,
-                test_related_apps_count=len(test_related_apps),
-            )
+            },
+            build_pipeline.app_shards_filepath,
+        )
+
+    with open(yaml_output, 'w') as fw:
+        fw.write(_render_parallel_plans(plans))
+        _write_pipeline_yaml(
+            fw,
+            build_pipeline.yaml_jinja,
+            build_pipeline.jobs_jinja,
+            {
+                'job_template': _get_template(build_pipeline.job_template_jinja).render(settings=settings),
+                'settings': settings,
+                'test_related_apps_count': len(test_related_apps),
+                'test_related_parallel_count': test_related_parallel_count,
+                'non_test_related_apps_count': len(non_test_related_apps),
+                'non_test_related_parallel_count': non_test_related_parallel_count,
+            },
         )
 
     logger.info('Build child pipeline generated successfully in %s', yaml_output)
@@ -152,6 +482,9 @@ def test_child_pipeline(
     yaml_output: str,
     *,
     cases: t.Optional[GroupedPytestCases] = None,
+    durations: t.Optional[t.Dict[str, float]] = None,
+    case_stats: t.Optional[t.Dict[str, CaseDurationStats]] = None,
+    modified_files: t.Optional[t.List[str]] = None,
 ) -> None:
     """This function is used to generate the child pipeline for test jobs.
 
@@ -194,12 +527,72 @@ def test_child_pipeline(
                 - generic
             variables:
                 nodes: "'nodeid1' 'nodeid2'"
+
+    When the durations of the test cases are known, the test cases of each group are split into jobs of about
+    ``job_target_duration`` seconds, each with its own ``nodes``, named like ``esp32 - generic 1/2``.
+
+    The test cases of each job are ordered to fail fast when ``fail_fast_ordering`` is set. Test cases failed
+    recently, flaky ones, and the ones of the modified test scripts run first, then the rest by ascending duration.
+
+    When ``nodes_file_threshold`` is set, longer ``nodes`` are written into files under ``nodes_dirpath``, and the
+    jobs refer to them with the ``nodes_file`` variable instead.
+
+    When ``gitlab.test_pipeline.generation_cache_dir`` is set, the generated files are cached by the digest of the
+    inputs, and restored if generated before. Only if the test cases and their durations are not provided.
+
+    :param yaml_output: Path to the output YAML file
+    :param cases: Test cases. Collected from the current directory if not provided
+    :param durations: Dict of case id to its duration in seconds. The median durations in ``case_stats`` if not
+        provided
+    :param case_stats: Dict of case id to its statistics. Loaded from ``duration_store_filepath`` or
+        ``duration_filepatterns`` if neither ``durations`` nor ``case_stats`` is provided
+    :param modified_files: Modified files. Read from the ``CHANGED_FILES_SEMICOLON_SEPARATED`` environment variable
+        if not provided
     """
     settings = get_ci_settings()
 
     if yaml_output is None:
         yaml_output = settings.gitlab.test_pipeline.yaml_filename
 
+    test_pipeline = settings.gitlab.test_pipeline
+    outputs = [yaml_output]
+    if test_pipeline.nodes_file_threshold:
+        outputs.append(test_pipeline.nodes_dirpath)
+    cache = None
+    # the given test cases and durations are not part of the inputs
+    if cases is None and durations is None and case_stats is None:
+        cache = get_generation_cache(
+            'test',
+            modified_files=modified_files,
+            filepaths=[test_pipeline.duration_store_filepath, settings.collected_test_related_apps_filepath],
+            filepatterns=[*settings.built_app_list_filepatterns, *test_pipeline.duration_filepatterns],
+        )
+    if cache is not None and cache.restore(outputs):
+        logger.info('Restored the test child pipeline generated with the same inputs in %s', yaml_output)
+        return
+
+    _generate_test_child_pipeline(
+        yaml_output,
+        cases=cases,
+        durations=durations,
+        case_stats=case_stats,
+        modified_files=modified_files,
+    )
+
+    if cache is not None:
+        cache.store(outputs)
+
+
+def _generate_test_child_pipeline(
+    yaml_output: str,
+    *,
+    cases: t.Optional[GroupedPytestCases],
+    durations: t.Optional[t.Dict[str, float]],
+    case_stats: t.Optional[t.Dict[str, CaseDurationStats]],
+    modified_files: t.Optional[t.List[str]],
+) -> None:
+    settings = get_ci_settings()
+
     if cases is None:
         cases = GroupedPytestCases(get_pytest_cases())
 
@@ -209,38 +602,111 @@ def test_child_pipeline(
             yaml.safe_dump(_get_fake_pass_job(settings, settings.gitlab.test_pipeline.workflow_name), fw)
         return
 
-    jobs = []
+    test_pipeline = settings.gitlab.test_pipeline
+    if durations is None and case_stats is None:
+        if os.path.isfile(test_pipeline.duration_store_filepath):
+            with DurationStore(test_pipeline.duration_store_filepath) as store:
+                case_stats = store.stats()
+        elif test_pipeline.duration_filepatterns:
+            case_stats = load_junit_stats(test_pipeline.duration_filepatterns)
+
+    if case_stats is None:
+        case_stats = {}
+    if durations is None:
+        durations = {caseid: s.p50 for caseid, s in case_stats.items()}
+
+    envs = GitlabEnvVars()
+    if modified_files is None and envs.CHANGED_FILES_SEMICOLON_SEPARATED:
+        modified_files = envs.CHANGED_FILES_SEMICOLON_SEPARATED.split(';')
+    # same as the modified pytest cases while selecting the apps to build
+    modified_dirs = {
+        os.path.dirname(canonical_path(f)) for f in modified_files or [] if os.path.splitext(f)[1] == '.py'
+    }
+
+    default_duration = test_pipeline.default_case_duration
+    if durations:
+        known_durations = [durations[c.caseid] for c in cases.cases if c.caseid in durations]
+        if known_durations:
+            default_duration = statistics.median(known_durations)
+        logger.info('Found durations of %d test cases, %d in total', len(known_durations), len(cases.cases))
+
+    if test_pipeline.nodes_file_threshold and os.path.isdir(test_pipeline.nodes_dirpath):
+        # files of the previous generation
+        shutil.rmtree(test_pipeline.nodes_dirpath)
+
+    jobs: t.List[t.Dict[str, t.Any]] = []
+    plans: t.List[ParallelPlan] = []
     for key, grouped_cases in cases.grouped_cases.items():
-        jobs.append(
-            {
-                'name': f'{key.target_selector} - {key.env_selector}',
-                'tags': sorted(key.runner_tags),
-                # quote nodeids to avoid special chars issues
-                'nodes': '"' + ' '.join([f"'{c.item.nodeid}'" for c in grouped_cases]) + '"',
-                'parallel_count': _parallel_count(
+        name = f'{key.target_selector} - {key.env_selector}'
+        runner_count = _runner_count(test_pipeline.runner_counts, key.runner_tags)
+        job_cases: t.List[t.List[t.Union[PytestCase, PytestCaseRecord]]]
+        if runner_count:
+            case_durations = [durations.get(c.caseid, default_duration) for c in grouped_cases]
+            parallel_count, expected_duration = _plan_parallel_count(
+                case_durations, runner_count, test_pipeline.job_startup_overhead
+            )
+            plans.append(
+                ParallelPlan(
+                    f'{name}{test_pipeline.job_name_suffix}',
                     len(grouped_cases),
-                    settings.gitlab.test_pipeline.runs_per_job,
-                ),
+                    sum(case_durations),
+                    runner_count,
+                    parallel_count,
+                    expected_duration,
+                )
+            )
+            if durations:
+                job_cases = [[grouped_cases[i] for i in job] for job in lpt_partition(case_durations, parallel_count)]
+                parallel_count = 1
+            else:
+                job_cases = [grouped_cases]
+        elif durations:
+            job_cases = _split_cases_by_duration(
+                grouped_cases,
+                durations,
+                target_duration=test_pipeline.job_target_duration,
+                max_cases_per_job=test_pipeline.runs_per_job,
+                default_duration=default_duration,
+            )
+            parallel_count = 1
+        else:
+            job_cases = [grouped_cases]
+            # split by pytest --parallel-count
+            parallel_count = _parallel_count(len(grouped_cases), test_pipeline.runs_per_job)
+
+        if test_pipeline.fail_fast_ordering:
+            job_cases = [
+                _prioritize_cases(_cases, durations, case_stats, modified_dirs, default_duration)
+                for _cases in job_cases
+            ]
+
+        for i, _cases in enumerate(job_cases, 1):
+            job_name = name if len(job_cases) == 1 else f'{name} {i}/{len(job_cases)}'
+            # quote nodeids to avoid special chars issues
+            nodes = ' '.join([f"'{c.nodeid}'" for c in _cases])
+            job: t.Dict[str, t.Any] = {
+                'name': job_name,
+                'tags': sorted(key.runner_tags),
+                'parallel_count': parallel_count,
                 **cases.additional_dict.get(key, {}),
             }
-        )
-
-    job_template = Environment().from_string(settings.gitlab.test_pipeline.job_template_jinja)
-    jobs_template = Environment().from_string(settings.gitlab.test_pipeline.jobs_jinja)
-    yaml_template = Environment().from_string(settings.gitlab.test_pipeline.yaml_jinja)
+            if test_pipeline.nodes_file_threshold and len(nodes) > test_pipeline.nodes_file_threshold:
+                job['nodes_file'] = _write_nodes_file(test_pipeline.nodes_dirpath, len(jobs), job_name, nodes)
+            else:
+                job['nodes'] = f'"{nodes}"'
+            jobs.append(job)
 
     with open(yaml_output, 'w') as fw:
-        fw.write(
-            yaml_template.render(
-                default_template=job_template.render(
-                    settings=settings,
-                ),
-                jobs=jobs_template.render(
-                    jobs=jobs,
-                    settings=settings,
-                ),
-                settings=settings,
-            )
+        fw.write(_render_parallel_plans(plans))
+        _write_pipeline_yaml(
+            fw,
+            test_pipeline.yaml_jinja,
+            test_pipeline.jobs_jinja,
+            {
+                'default_template': _get_template(test_pipeline.job_template_jinja).render(settings=settings),
+                'settings': settings,
+            },
+            {'jobs': jobs},
         )
 
     logger.info('Test child pipeline generated successfully in %s', yaml_output)
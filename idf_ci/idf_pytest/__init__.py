@@ -10,10 +10,20 @@ __all__ = [
     'IdfPytestPlugin',
     'PytestApp',
     'PytestCase',
+    'PytestCaseRecord',
+    'dump_case_records',
     'get_pytest_cases',
+    'load_case_records',
 ]
 
-from idf_ci.idf_pytest.models import GroupedPytestCases, PytestApp, PytestCase
+from idf_ci.idf_pytest.models import (
+    GroupedPytestCases,
+    PytestApp,
+    PytestCase,
+    PytestCaseRecord,
+    dump_case_records,
+    load_case_records,
+)
 from idf_ci.idf_pytest.plugin import (
     IDF_CI_PLUGIN_KEY,
     IDF_CI_PYTEST_CASE_KEY,
@@ -0,0 +1,291 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Durations of the test cases recorded in JUnit XML reports.
+
+Test cases are keyed by the ``name`` attribute of the ``testcase`` elements, which is the case id
+(``<target>.<config>.<test function name>``) in the reports of ESP-IDF test jobs.
+"""
+
+import glob
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import typing as t
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+
+from .._compat import PathLike
+
+logger = logging.getLogger(__name__)
+
+# number of the case ids queried at once, SQLite limits the variables to 999 before 3.32
+_QUERY_BATCH_SIZE = 500
+
+
+def iter_junit_results(filepath: PathLike) -> t.Iterator[t.Tuple[str, float, bool]]:
+    """Iterate over the test cases that were run in a JUnit XML report.
+
+    Skipped test cases are ignored.
+
+    :param filepath: Path to the JUnit XML file
+
+    :returns: Iterator of (case id, duration in seconds, failed or not)
+    """
+    for _, elem in ET.iterparse(filepath):
+        if elem.tag != 'testcase':
+            continue
+
+        name = elem.get('name')
+        duration = elem.get('time')
+        if name and duration and elem.find('skipped') is None:
+            try:
+                yield name, float(duration), elem.find('failure') is not None or elem.find('error') is not None
+            except ValueError:
+                logger.debug('Invalid duration %s of test case %s in %s', duration, name, filepath)
+
+        elem.clear()
+
+
+def iter_junit_durations(filepath: PathLike) -> t.Iterator[t.Tuple[str, float]]:
+    """Iterate over the durations of the test cases that were run in a JUnit XML report.
+
+    :param filepath: Path to the JUnit XML file
+
+    :returns: Iterator of (case id, duration in seconds)
+    """
+    for caseid, duration, _ in iter_junit_results(filepath):
+        yield caseid, duration
+
+
+def load_junit_durations(filepatterns: t.Iterable[str]) -> t.Dict[str, float]:
+    """Load the durations of the test cases from JUnit XML reports.
+
+    :param filepatterns: Glob patterns of the JUnit XML files
+
+    :returns: Dict of case id to its mean duration in seconds
+    """
+    durations: t.Dict[str, t.List[float]] = defaultdict(list)
+    for pattern in filepatterns:
+        for filepath in sorted(glob.glob(pattern, recursive=True)):
+            try:
+                for caseid, duration in iter_junit_durations(filepath):
+                    durations[caseid].append(duration)
+            except ET.ParseError as e:
+                logger.warning('Skipping invalid JUnit XML file %s: %s', filepath, e)
+
+    return {caseid: sum(values) / len(values) for caseid, values in durations.items()}
+
+
+def load_junit_stats(filepatterns: t.Iterable[str]) -> t.Dict[str, 'CaseDurationStats']:
+    """Load the statistics of the test cases from JUnit XML reports, without a store file.
+
+    :param filepatterns: Glob patterns of the JUnit XML files
+
+    :returns: Dict of case id to its statistics
+    """
+    with DurationStore(':memory:') as store:
+        store.ingest(filepatterns)
+        return store.stats()
+
+
+def _percentile(sorted_values: t.Sequence[float], percent: float) -> float:
+    # nearest-rank method
+    return sorted_values[max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)]
+
+
+class CaseDurationStats(t.NamedTuple):
+    """Statistics of the recent runs of a test case."""
+
+    runs: int
+    p50: float
+    p95: float
+    flake_rate: float
+    """Rate of the failed runs. 0 if the test case never passed, since it's failing instead of flaky."""
+    last_failed: bool
+    """Whether the most recent run failed."""
+
+
+class DurationStore:
+    """Local store of the recent results of the test cases, backed by a SQLite file.
+
+    The file could be passed between pipelines as an artifact, and merged with :meth:`import_store`.
+
+    :param filepath: Path to the SQLite file. Created if not exists
+    :param window: Number of the most recent runs kept for each test case
+    """
+
+    def __init__(self, filepath: PathLike, *, window: int = 20) -> None:
+        self.filepath = filepath
+        self.window = window
+
+        self._conn = sqlite3.connect(str(filepath))
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                caseid TEXT NOT NULL,
+                duration REAL NOT NULL,
+                failed INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS results_caseid ON results (caseid, id);
+            CREATE TABLE IF NOT EXISTS ingested_files (
+                digest TEXT PRIMARY KEY
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> 'DurationStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _add_results(self, results: t.Iterable[t.Tuple[str, float, bool]]) -> int:
+        rows = list(results)
+        self._conn.executemany('INSERT INTO results (caseid, duration, failed) VALUES (?, ?, ?)', rows)
+        # drop the runs out of the window
+        self._conn.executemany(
+            'DELETE FROM results WHERE caseid = ? AND id NOT IN '
+            '(SELECT id FROM results WHERE caseid = ? ORDER BY id DESC LIMIT ?)',
+            [(caseid, caseid, self.window) for caseid in {row[0] for row in rows}],
+        )
+        return len(rows)
+
+    def ingest(self, filepatterns: t.Iterable[str]) -> int:
+        """Ingest the results of the JUnit XML reports.
+
+        Reports that were ingested before, by their content, are skipped.
+
+        :param filepatterns: Glob patterns of the JUnit XML files
+
+        :returns: Number of the ingested test case results
+        """
+        count = 0
+        for pattern in filepatterns:
+            for filepath in sorted(glob.glob(pattern, recursive=True)):
+                with open(filepath, 'rb') as fr:
+                    digest = hashlib.sha256(fr.read()).hexdigest()
+
+                if self._conn.execute('SELECT 1 FROM ingested_files WHERE digest = ?', (digest,)).fetchone():
+                    logger.debug('Skipping ingested JUnit XML file %s', filepath)
+                    continue
+
+                try:
+                    results = list(iter_junit_results(filepath))
+                except ET.ParseError as e:
+                    logger.warning('Skipping invalid JUnit XML file %s: %s', filepath, e)
+                    continue
+
+                with self._conn:
+                    count += self._add_results(results)
+                    self._conn.execute('INSERT INTO ingested_files (digest) VALUES (?)', (digest,))
+
+        return count
+
+    def _iter_results(self, caseids: t.Optional[t.Iterable[str]]) -> t.Iterator[t.Tuple[str, float, int]]:
+        # ordered by case id, and by run within each test case
+        if caseids is None:
+            yield from self._conn.execute('SELECT caseid, duration, failed FROM results ORDER BY caseid, id')
+            return
+
+        # looked up by the (caseid, id) index in batches, within the limit of the SQL variables
+        sorted_caseids = sorted(set(caseids))
+        for i in range(0, len(sorted_caseids), _QUERY_BATCH_SIZE):
+            batch = sorted_caseids[i : i + _QUERY_BATCH_SIZE]
+            yield from self._conn.execute(
+                'SELECT caseid, duration, failed FROM results '
+                f'WHERE caseid IN ({", ".join("?" * len(batch))}) ORDER BY caseid, id',
+                batch,
+            )
+
+    def stats(self, caseids: t.Optional[t.Iterable[str]] = None) -> t.Dict[str, CaseDurationStats]:
+        """Get the statistics of the test cases.
+
+        :param caseids: Case ids to query. All test cases in the store if not provided
+
+        :returns: Dict of case id to its statistics. Test cases without results are not included
+        """
+        results: t.Dict[str, t.List[t.Tuple[float, bool]]] = defaultdict(list)
+        for caseid, duration, failed in self._iter_results(caseids):
+            results[caseid].append((duration, bool(failed)))
+
+        res = {}
+        for caseid, runs in results.items():
+            durations = sorted(d for d, _ in runs)
+            failures = sum(1 for _, failed in runs if failed)
+            res[caseid] = CaseDurationStats(
+                runs=len(runs),
+                p50=_percentile(durations, 50),
+                p95=_percentile(durations, 95),
+                flake_rate=failures / len(runs) if failures < len(runs) else 0.0,
+                last_failed=runs[-1][1],
+            )
+
+        return res
+
+    def get(self, caseid: str) -> t.Optional[CaseDurationStats]:
+        """Get the statistics of a test case.
+
+        :param caseid: Case id
+
+        :returns: Statistics of the test case, or None if it has no results
+        """
+        return self.stats([caseid]).get(caseid)
+
+    def durations(self) -> t.Dict[str, float]:
+        """Get the median durations of the test cases.
+
+        :returns: Dict of case id to its median duration in seconds
+        """
+        return {caseid: s.p50 for caseid, s in self.stats().items()}
+
+    def export_store(self, filepath: PathLike) -> None:
+        """Export the store into a compact SQLite file.
+
+        :param filepath: Path to the exported file. Overwritten if exists
+        """
+        if os.path.abspath(filepath) == os.path.abspath(self.filepath):
+            raise ValueError(f'Cannot export the duration store {filepath} to itself')
+
+        if os.path.isfile(filepath):
+            os.remove(filepath)
+
+        with self._conn:
+            dest = sqlite3.connect(str(filepath))
+            try:
+                self._conn.backup(dest)
+                dest.execute('VACUUM')
+            finally:
+                dest.close()
+
+    def import_store(self, filepath: PathLike) -> int:
+        """Merge the results of another store file into this store.
+
+        Results of the other store are treated as older than the results of this store.
+
+        :param filepath: Path to the other store file
+
+        :returns: Number of the imported test case results
+        """
+        if not os.path.isfile(filepath):
+            raise FileNotFoundError(f'Duration store {filepath} does not exist')
+
+        other = DurationStore(filepath, window=self.window)
+        try:
+            results = other._conn.execute('SELECT caseid, duration, failed FROM results ORDER BY id').fetchall()
+            digests = other._conn.execute('SELECT digest FROM ingested_files').fetchall()
+        finally:
+            other.close()
+
+        with self._conn:
+            current = self._conn.execute('SELECT caseid, duration, failed FROM results ORDER BY id').fetchall()
+            self._conn.execute('DELETE FROM results')
+            self._add_results([*results, *current])
+            self._conn.executemany('INSERT OR IGNORE INTO ingested_files (digest) VALUES (?)', digests)
+
+        return len(results)
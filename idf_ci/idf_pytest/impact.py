@@ -0,0 +1,236 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Test impact index, the components and source files each app depends on.
+
+The index is built from the ``project_description.json`` files generated while building the apps. Test cases are
+selected only if the apps they require depend on the modified files.
+"""
+
+import glob
+import json
+import logging
+import os
+import typing as t
+
+from .._compat import PathLike
+from ..utils import project_relative_path
+
+if t.TYPE_CHECKING:
+    from .models import PytestCase, PytestCaseRecord
+
+logger = logging.getLogger(__name__)
+
+_CaseT = t.TypeVar('_CaseT', bound=t.Union['PytestCase', 'PytestCaseRecord'])
+
+# modifying other files in the component folders, like headers, CMakeLists.txt and Kconfig, may affect the apps
+SOURCE_FILE_EXTENSIONS = frozenset(['.c', '.cc', '.cpp', '.cxx', '.S', '.s'])
+
+
+def _parent_dirs(path: str) -> t.Iterator[str]:
+    while True:
+        path = os.path.dirname(path)
+        if not path:
+            yield '.'
+            return
+        yield path
+
+
+class TestImpactIndex:
+    """Components and source files of the built apps, keyed by the build directories.
+
+    All paths are relative to the project root, in POSIX format.
+    """
+
+    __test__ = False  # not a test class for pytest
+
+    def __init__(self) -> None:
+        self._paths: t.List[str] = []
+        self._path_ids: t.Dict[str, int] = {}
+        # build dir -> (component name -> component dir id, source file ids)
+        self._apps: t.Dict[str, t.Tuple[t.Dict[str, int], t.FrozenSet[int]]] = {}
+        # component dir ids of all the apps, computed on the first use
+        self._component_dirs: t.Optional[t.FrozenSet[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._apps)
+
+    def _path_id(self, path: str) -> int:
+        if path not in self._path_ids:
+            self._path_ids[path] = len(self._paths)
+            self._paths.append(path)
+        return self._path_ids[path]
+
+    def add_project_description(self, filepath: PathLike) -> None:
+        """Add the app built with the ``project_description.json`` file.
+
+        :param filepath: Path to the ``project_description.json`` file
+        """
+        with open(filepath) as fr:
+            desc = json.load(fr)
+
+        # paths are absolute in the build job, which may run in another folder
+        root = desc.get('idf_path') or os.curdir
+
+        def _rel(path: str) -> str:
+            return project_relative_path(path, root)
+
+        build_dir = _rel(desc.get('build_dir') or os.path.dirname(filepath))
+        components = {}
+        sources = set()
+        for name, info in desc.get('build_component_info', {}).items():
+            if not info.get('dir'):
+                continue
+            components[name] = self._path_id(_rel(info['dir']))
+            for src in info.get('sources', info.get('srcs', [])):
+                sources.add(self._path_id(_rel(src)))
+
+        if desc.get('project_path'):
+            components[desc.get('project_name', '')] = self._path_id(_rel(desc['project_path']))
+
+        self._apps[build_dir] = (components, frozenset(sources))
+        self._component_dirs = None
+
+    def _is_in_component_dirs(self, path: str, component_dirs: t.AbstractSet[int]) -> bool:
+        for d in _parent_dirs(path):
+            dir_id = self._path_ids.get(d)
+            if dir_id is not None and dir_id in component_dirs:
+                return True
+        return False
+
+    def is_impacted(
+        self,
+        build_dir: str,
+        modified_files: t.Optional[t.Iterable[str]] = None,
+        modified_components: t.Optional[t.Iterable[str]] = None,
+    ) -> t.Optional[bool]:
+        """Check if the app depends on the modified files, or the modified components if no file is provided.
+
+        A modified file is a dependency if it's a source file of the app, or a non-source file in the folder of any
+        component of the app. Files outside the folders of the components of all the indexed apps, like a root
+        ``conftest.py``, ``pytest.ini`` or the CI scripts, may affect any app.
+
+        :param build_dir: Build directory of the app, relative to the project root
+        :param modified_files: Modified files, relative to the project root
+        :param modified_components: Modified components
+
+        :returns: True or False, or None if the app is not in the index, or any modified file is outside the indexed
+            component folders
+        """
+        if build_dir not in self._apps:
+            return None
+
+        components, sources = self._apps[build_dir]
+        if modified_files is None:
+            return bool(set(modified_components or []) & components.keys())
+
+        if self._component_dirs is None:
+            self._component_dirs = frozenset(
+                dir_id for app_components, _ in self._apps.values() for dir_id in app_components.values()
+            )
+
+        component_dirs = set(components.values())
+        res: t.Optional[bool] = False
+        for f in modified_files:
+            file_id = self._path_ids.get(f)
+            if file_id is not None and file_id in sources:
+                return True
+
+            if not self._is_in_component_dirs(f, self._component_dirs):
+                # unknown to the index, keep looking for a known dependency
+                res = None
+                continue
+
+            if os.path.splitext(f)[1] in SOURCE_FILE_EXTENSIONS:
+                continue
+
+            if self._is_in_component_dirs(f, component_dirs):
+                return True
+
+        return res
+
+    def filter_cases(
+        self,
+        cases: t.Sequence[_CaseT],
+        modified_files: t.Optional[t.List[str]] = None,
+        modified_components: t.Optional[t.List[str]] = None,
+    ) -> t.List[_CaseT]:
+        """Select the test cases that require any app depending on the modified files or components.
+
+        Test cases requiring apps that are not in the index are always selected, and so are all the test cases if any
+        modified file is outside the indexed component folders.
+
+        :param cases: Test cases
+        :param modified_files: Modified files, relative to the current directory
+        :param modified_components: Modified components, used only if no file is provided
+
+        :returns: Selected test cases
+        """
+        if modified_files is not None:
+            modified_files = [project_relative_path(f, os.curdir) for f in modified_files]
+
+        impacted: t.Dict[str, bool] = {}
+        res = []
+        for case in cases:
+            for app in case.apps:
+                build_dir = project_relative_path(app.build_dir, os.curdir)
+                if build_dir not in impacted:
+                    impacted[build_dir] = self.is_impacted(build_dir, modified_files, modified_components) is not False
+                if impacted[build_dir]:
+                    res.append(case)
+                    break
+
+        logger.info('Selected %d test cases impacted by the modifications, %d in total', len(res), len(cases))
+        return res
+
+    def dump(self, filepath: PathLike) -> None:
+        """Write the index to a JSON file.
+
+        :param filepath: Path to the output file
+        """
+        with open(filepath, 'w') as fw:
+            json.dump(
+                {
+                    'paths': self._paths,
+                    'apps': {
+                        build_dir: {'components': components, 'sources': sorted(sources)}
+                        for build_dir, (components, sources) in sorted(self._apps.items())
+                    },
+                },
+                fw,
+                separators=(',', ':'),
+            )
+
+    @classmethod
+    def load(cls, filepath: PathLike) -> 'TestImpactIndex':
+        """Read the index from a JSON file written by :meth:`dump`.
+
+        :param filepath: Path to the JSON file
+
+        :returns: The index
+        """
+        with open(filepath) as fr:
+            d = json.load(fr)
+
+        index = cls()
+        index._paths = d['paths']
+        index._path_ids = {p: i for i, p in enumerate(index._paths)}
+        index._apps = {build_dir: (v['components'], frozenset(v['sources'])) for build_dir, v in d['apps'].items()}
+        return index
+
+
+def build_test_impact_index(filepatterns: t.Iterable[str]) -> TestImpactIndex:
+    """Build the test impact index from the ``project_description.json`` files.
+
+    :param filepatterns: Glob patterns of the ``project_description.json`` files
+
+    :returns: The index
+    """
+    index = TestImpactIndex()
+    for pattern in filepatterns:
+        for filepath in sorted(glob.glob(pattern, recursive=True)):
+            try:
+                index.add_project_description(filepath)
+            except (ValueError, OSError) as e:
+                logger.warning('Skipping invalid project description file %s: %s', filepath, e)
+
+    return index
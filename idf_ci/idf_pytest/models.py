@@ -6,12 +6,15 @@ import os
 import typing as t
 from collections import defaultdict
 from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
 from typing import NamedTuple
 
 import pytest
 from pytest_embedded.plugin import parse_multi_dut_args
 
-from idf_ci.utils import to_list
+from idf_ci._compat import Protocol
+from idf_ci.utils import canonical_path, to_list
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +23,7 @@ class PytestApp:
     """Represents a pytest app."""
 
     def __init__(self, path: str, target: str, config: str) -> None:
-        self.path = os.path.abspath(path)
+        self.path = canonical_path(path)
         self.target = target
         self.config = config or 'default'
 
@@ -38,7 +41,137 @@ class PytestApp:
 
         :returns: The build directory for the app.
         """
-        return os.path.join(self.path, f'build_{self.target}_{self.config}')
+        return f'{self.path}/build_{self.target}_{self.config}'
+
+
+class _Marker(NamedTuple):
+    name: str
+    kwargs: t.Dict[str, t.Any]
+
+
+class _CaseItem(Protocol):
+    """Attributes of the ``pytest.Function`` read by :class:`PytestCase`."""
+
+    @property
+    def nodeid(self) -> str: ...
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def originalname(self) -> str: ...
+
+    @property
+    def path(self) -> Path: ...
+
+    @property
+    def own_markers(self) -> t.Sequence[t.Any]: ...
+
+    def iter_markers(self) -> t.Iterator[t.Any]: ...
+
+
+class DetachedItem:
+    """Picklable snapshot of the ``pytest.Function`` attributes used by :class:`PytestCase`."""
+
+    def __init__(self, item: pytest.Function) -> None:
+        self.nodeid = item.nodeid
+        self.path = item.path
+        self.name = item.name
+        self.originalname = item.originalname
+        # only the kwargs read by `PytestCase.skipped_targets`, others may not be picklable
+        self.own_markers = [
+            _Marker(m.name, {k: v for k, v in m.kwargs.items() if k in ('targets', 'reason')}) for m in item.own_markers
+        ]
+        self._markers = [_Marker(m.name, {}) for m in item.iter_markers()]
+
+    def iter_markers(self) -> t.Iterator[_Marker]:
+        return iter(self._markers)
+
+
+def get_runner_tags(targets: t.Iterable[str], env_markers: t.Iterable[str]) -> t.Tuple[str, ...]:
+    """Get the runner tags of a test case.
+
+    :param targets: Targets of the test case apps
+    :param env_markers: Environment markers of the test case
+
+    :returns: Sorted runner tags, ``<target>_<count>`` for the targets used by multiple apps
+    """
+    t_amount: t.Dict[str, int] = defaultdict(int)
+    for target in sorted(targets):
+        t_amount[target] += 1
+
+    tags: t.Set[str] = set()
+    for target in t_amount:
+        if t_amount[target] > 1:
+            tags.add(f'{target}_{t_amount[target]}')
+        else:
+            tags.add(target)
+
+    tags.update(env_markers)
+
+    return tuple(sorted(tags))
+
+
+def get_caseid(name: str, apps: t.Sequence[PytestApp], all_markers: t.Collection[str]) -> str:
+    """Get the case id of a test case.
+
+    :param name: Name of the test function
+    :param apps: Apps of the test case
+    :param all_markers: All markers of the test case
+
+    :returns: Case id, like ``esp32.default.test_foo``
+    """
+    if len(apps) == 1:
+        target_str = apps[0].target
+        configs: t.Union[str, t.Tuple[str, ...]] = apps[0].config
+    else:
+        target_str = str(tuple(app.target for app in apps))
+        configs = tuple(app.config for app in apps)
+
+    if 'qemu' in all_markers:
+        target_str += '_qemu'
+
+    return f'{target_str}.{configs}.{name}'
+
+
+def get_skip_reason_if_not_built(
+    name: str, apps: t.Sequence[PytestApp], app_dirs: t.Optional[t.Collection[str]] = None
+) -> t.Optional[str]:
+    """Check if all binaries of the test case are built in the app lists.
+
+    :param name: Name of the test function
+    :param apps: Apps of the test case
+    :param app_dirs: App folder paths to check, prefer a set for large lists
+
+    :returns: Skip reason string if not all binaries are built, None otherwise
+    """
+    if app_dirs is None:
+        # ignore this feature
+        return None
+
+    bin_found = [0] * len(apps)
+    for i, app in enumerate(apps):
+        if app.build_dir in app_dirs:
+            bin_found[i] = 1
+
+    if sum(bin_found) == 0:
+        msg = f'Skip test case {name} because all following binaries are not listed in the app lists: '
+        for app in apps:
+            msg += f'\n - {app.build_dir}'
+
+        return msg
+
+    if sum(bin_found) == len(apps):
+        return None
+
+    # some found, some not, looks suspicious
+    msg = f'Found some binaries of test case {name} are not listed in the app lists.'
+    for i, app in enumerate(apps):
+        if bin_found[i] == 0:
+            msg += f'\n - {app.build_dir}'
+
+    msg += '\nMight be an issue with .build-test-rules.yml files'
+    return msg
 
 
 class PytestCase:
@@ -48,7 +181,11 @@ class PytestCase:
 
     def __init__(self, apps: t.List[PytestApp], item: pytest.Function) -> None:
         self.apps = apps
-        self.item = item
+        self._item: t.Optional[pytest.Function] = item
+        # the item, or its snapshot once detached
+        self._case_item: _CaseItem = item
+
+        self._cache: t.Dict[str, t.Any] = {}
 
     @classmethod
     def get_param(cls, item: pytest.Function, key: str, default: t.Any = None) -> t.Any:
@@ -96,15 +233,52 @@ class PytestCase:
         )
 
     def __hash__(self) -> int:
-        return hash((self.path, self.name, self.apps, self.all_markers))
+        return hash((self.path, self.name, tuple(self.apps), frozenset(self.all_markers)))
+
+    def _markers_cache(self) -> t.Dict[str, t.Any]:
+        # values derived from the markers, kept until `invalidate_markers_cache` is called
+        return self._cache
+
+    def invalidate_markers_cache(self) -> None:
+        """Drop the cached values derived from the markers, like ``all_markers`` and ``caseid``.
+
+        Call it after adding or removing markers of the pytest item, or of its parents.
+        """
+        self._cache = {}
+
+    @property
+    def item(self) -> pytest.Function:
+        """The pytest item of the test case.
+
+        :raises AttributeError: If the test case is detached from the pytest session
+        """
+        if self._item is None:
+            raise AttributeError(f'Test case {self.nodeid} is detached from the pytest session')
+        return self._item
+
+    @property
+    def nodeid(self) -> str:
+        return self._case_item.nodeid
+
+    def detach(self) -> 'PytestCase':
+        """Get a copy of the test case that no longer refers to the pytest session.
+
+        The copy has no :attr:`item`, the other attributes are the same.
+
+        :returns: PytestCase instance that could be pickled
+        """
+        case = PytestCase(apps=self.apps, item=self.item)
+        case._item = None
+        case._case_item = DetachedItem(self.item)
+        return case
 
     @property
     def path(self) -> str:
-        return str(self.item.path)
+        return str(self._case_item.path)
 
     @property
     def name(self) -> str:
-        return self.item.originalname
+        return self._case_item.originalname
 
     @property
     def targets(self) -> t.List[str]:
@@ -117,7 +291,19 @@ class PytestCase:
 
     @property
     def env_markers(self) -> t.Set[str]:
-        return {marker for marker in self.all_markers if marker in self.KNOWN_ENV_MARKERS}
+        return self._env_markers(self._markers_cache())
+
+    # the helpers below take the cache, so that each public property looks it up once
+
+    def _all_markers(self, cache: t.Dict[str, t.Any]) -> t.Set[str]:
+        if 'all_markers' not in cache:
+            cache['all_markers'] = {marker.name for marker in self._case_item.iter_markers()}
+        return cache['all_markers']
+
+    def _env_markers(self, cache: t.Dict[str, t.Any]) -> t.Set[str]:
+        if 'env_markers' not in cache:
+            cache['env_markers'] = {marker for marker in self._all_markers(cache) if marker in self.KNOWN_ENV_MARKERS}
+        return cache['env_markers']
 
     @property
     def env_selector(self) -> str:
@@ -126,20 +312,10 @@ class PytestCase:
 
     @property
     def runner_tags(self) -> t.Tuple[str, ...]:
-        t_amount: t.Dict[str, int] = defaultdict(int)
-        for target in sorted(self.targets):
-            t_amount[target] += 1
-
-        tags: t.Set[str] = set()
-        for target in t_amount:
-            if t_amount[target] > 1:
-                tags.add(f'{target}_{t_amount[target]}')
-            else:
-                tags.add(target)
-
-        tags.update(self.env_markers)
-
-        return tuple(sorted(tags))
+        cache = self._markers_cache()
+        if 'runner_tags' not in cache:
+            cache['runner_tags'] = get_runner_tags(self.targets, self._env_markers(cache))
+        return cache['runner_tags']
 
     @property
     def configs(self) -> t.List[str]:
@@ -147,11 +323,10 @@ class PytestCase:
 
     @property
     def caseid(self) -> str:
-        target_str = self.targets[0] if self.is_single_dut else str(tuple(self.targets))
-        if 'qemu' in self.all_markers:
-            target_str += '_qemu'
-        configs = self.configs[0] if self.is_single_dut else tuple(self.configs)
-        return f'{target_str}.{configs}.{self.name}'
+        cache = self._markers_cache()
+        if 'caseid' not in cache:
+            cache['caseid'] = get_caseid(self.name, self.apps, self._all_markers(cache))
+        return cache['caseid']
 
     @property
     def is_single_dut(self) -> bool:
@@ -163,7 +338,7 @@ class PytestCase:
 
     @property
     def all_markers(self) -> t.Set[str]:
-        return {marker.name for marker in self.item.iter_markers()}
+        return self._all_markers(self._markers_cache())
 
     def skipped_targets(self) -> t.Dict[str, str]:
         """Get targets that are marked with skip markers for current test case.
@@ -173,7 +348,7 @@ class PytestCase:
         skip_markers = ['temp_skip_ci', 'temp_skip']
         targets: t.Dict[str, str] = {}
 
-        for _m in self.item.own_markers:
+        for _m in self._case_item.own_markers:
             if _m.name in skip_markers:
                 # if no targets or reason provided, ignore, there must be something wrong
                 if not _m.kwargs.get('targets') or not _m.kwargs.get('reason'):
@@ -184,40 +359,192 @@ class PytestCase:
 
         return targets
 
-    def get_skip_reason_if_not_built(self, app_dirs: t.Optional[t.List[str]] = None) -> t.Optional[str]:
+    def get_skip_reason_if_not_built(self, app_dirs: t.Optional[t.Collection[str]] = None) -> t.Optional[str]:
         """Check if all binaries of the test case are built in the app lists.
 
-        :param app_dirs: App folder paths to check
+        :param app_dirs: App folder paths to check, prefer a set for large lists
 
         :returns: Skip reason string if not all binaries are built, None otherwise
         """
-        if app_dirs is None:
-            # ignore this feature
-            return None
+        return get_skip_reason_if_not_built(self.name, self.apps, app_dirs)
+
+
+class PytestCaseRecord:
+    """Immutable snapshot of a :class:`PytestCase`.
+
+    All the markers, targets, configs and other derived values are computed once when
+    created. Unlike :class:`PytestCase`, a record does not refer to the pytest session,
+    so that it could be cached, pickled, or serialized with :meth:`to_dict`.
+    """
+
+    __slots__ = (
+        '_skipped_targets',
+        'all_markers',
+        'apps',
+        'caseid',
+        'configs',
+        'env_markers',
+        'name',
+        'nodeid',
+        'path',
+        'runner_tags',
+        'targets',
+    )
+
+    nodeid: str
+    path: str
+    name: str
+    apps: t.Tuple[PytestApp, ...]
+    targets: t.Tuple[str, ...]
+    configs: t.Tuple[str, ...]
+    all_markers: t.FrozenSet[str]
+    env_markers: t.FrozenSet[str]
+    runner_tags: t.Tuple[str, ...]
+    caseid: str
+    _skipped_targets: t.Mapping[str, str]
 
-        bin_found = [0] * len(self.apps)
-        for i, app in enumerate(self.apps):
-            if app.build_dir in app_dirs:
-                bin_found[i] = 1
+    def __init__(
+        self,
+        *,
+        nodeid: str,
+        path: str,
+        name: str,
+        apps: t.Iterable[PytestApp],
+        all_markers: t.Iterable[str],
+        env_markers: t.Iterable[str],
+        skipped_targets: t.Optional[t.Dict[str, str]] = None,
+    ) -> None:
+        _set = super().__setattr__
+        _set('nodeid', nodeid)
+        _set('path', path)
+        _set('name', name)
+        _set('apps', tuple(apps))
+        _set('targets', tuple(app.target for app in self.apps))
+        _set('configs', tuple(app.config for app in self.apps))
+        _set('all_markers', frozenset(all_markers))
+        _set('env_markers', frozenset(env_markers))
+        _set('_skipped_targets', MappingProxyType(dict(skipped_targets or {})))
+        _set('runner_tags', get_runner_tags(self.targets, self.env_markers))
+        _set('caseid', get_caseid(self.name, self.apps, self.all_markers))
+
+    def __setattr__(self, key: str, value: t.Any) -> None:
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __reduce__(self) -> t.Tuple[t.Any, ...]:
+        # attributes can't be set while unpickling
+        return self.__class__.from_dict, (self.to_dict(),)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PytestCaseRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
 
-        if sum(bin_found) == 0:
-            msg = f'Skip test case {self.name} because all following binaries are not listed in the app lists: '
-            for app in self.apps:
-                msg += f'\n - {app.build_dir}'
+    def __hash__(self) -> int:
+        return hash((self.nodeid, self.caseid))
 
-            return msg
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.nodeid!r})'
 
-        if sum(bin_found) == len(self.apps):
-            return None
+    @classmethod
+    def from_case(cls, case: PytestCase) -> 'PytestCaseRecord':
+        return cls(
+            nodeid=case.nodeid,
+            path=case.path,
+            name=case.name,
+            apps=case.apps,
+            all_markers=case.all_markers,
+            env_markers=case.env_markers,
+            skipped_targets=case.skipped_targets(),
+        )
 
-        # some found, some not, looks suspicious
-        msg = f'Found some binaries of test case {self.name} are not listed in the app lists.'
-        for i, app in enumerate(self.apps):
-            if bin_found[i] == 0:
-                msg += f'\n - {app.build_dir}'
+    @property
+    def target_selector(self) -> str:
+        return ','.join(self.targets)
 
-        msg += '\nMight be an issue with .build-test-rules.yml files'
-        return msg
+    @property
+    def env_selector(self) -> str:
+        return ','.join(sorted(self.env_markers))
+
+    @property
+    def is_single_dut(self) -> bool:
+        return len(self.apps) == 1
+
+    @property
+    def is_host_test(self) -> bool:
+        return 'host_test' in self.all_markers or 'linux' in self.targets
+
+    def skipped_targets(self) -> t.Dict[str, str]:
+        return dict(self._skipped_targets)
+
+    def get_skip_reason_if_not_built(self, app_dirs: t.Optional[t.Collection[str]] = None) -> t.Optional[str]:
+        return get_skip_reason_if_not_built(self.name, self.apps, app_dirs)
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        """Convert the record to a dict of JSON compatible types.
+
+        :returns: Dict that could be loaded by :meth:`from_dict`
+        """
+        return {
+            'nodeid': self.nodeid,
+            'path': self.path,
+            'name': self.name,
+            'apps': [[app.path, app.target, app.config] for app in self.apps],
+            'all_markers': sorted(self.all_markers),
+            'env_markers': sorted(self.env_markers),
+            'skipped_targets': dict(self._skipped_targets),
+        }
+
+    @classmethod
+    def from_dict(cls, d: t.Dict[str, t.Any]) -> 'PytestCaseRecord':
+        return cls(
+            nodeid=d['nodeid'],
+            path=d['path'],
+            name=d['name'],
+            apps=[PytestApp(*app) for app in d['apps']],
+            all_markers=d['all_markers'],
+            env_markers=d['env_markers'],
+            skipped_targets=d['skipped_targets'],
+        )
+
+
+def dump_case_records(records: t.Iterable[PytestCaseRecord], filepath: str) -> None:
+    """Write test case records to a file.
+
+    Files ending with ``.msgpack`` are written with msgpack, which is required to be
+    installed. Otherwise, the file is written in JSON.
+
+    :param records: Test case records
+    :param filepath: Output file path
+    """
+    data = [record.to_dict() for record in records]
+
+    if filepath.endswith('.msgpack'):
+        import msgpack
+
+        with open(filepath, 'wb') as fwb:
+            fwb.write(msgpack.packb(data))
+    else:
+        with open(filepath, 'w') as fw:
+            json.dump(data, fw, separators=(',', ':'))
+
+
+def load_case_records(filepath: str) -> t.List[PytestCaseRecord]:
+    """Read test case records written by :func:`dump_case_records`.
+
+    :param filepath: Input file path
+
+    :returns: List of test case records
+    """
+    if filepath.endswith('.msgpack'):
+        import msgpack
+
+        with open(filepath, 'rb') as frb:
+            data = msgpack.unpackb(frb.read())
+    else:
+        with open(filepath) as fr:
+            data = json.load(fr)
+
+    return [PytestCaseRecord.from_dict(d) for d in data]
 
 
 class GroupKey(NamedTuple):
@@ -226,7 +553,7 @@ class GroupKey(NamedTuple):
     runner_tags: t.Tuple[str, ...]
 
     @classmethod
-    def from_case(cls, case: PytestCase):
+    def from_case(cls, case: t.Union[PytestCase, PytestCaseRecord]):
         return cls(case.target_selector, case.env_selector, case.runner_tags)
 
 
@@ -234,7 +561,10 @@ class GroupedPytestCases:
     """Groups pytest cases by target and environment markers."""
 
     def __init__(
-        self, cases: t.List[PytestCase], *, additional_dict: t.Optional[t.Dict[GroupKey, t.Dict[str, t.Any]]] = None
+        self,
+        cases: t.Sequence[t.Union[PytestCase, PytestCaseRecord]],
+        *,
+        additional_dict: t.Optional[t.Dict[GroupKey, t.Dict[str, t.Any]]] = None,
     ) -> None:
         self.cases = cases
 
@@ -242,12 +572,12 @@ class GroupedPytestCases:
 
     @property
     @lru_cache()
-    def grouped_cases(self) -> t.Dict[GroupKey, t.List[PytestCase]]:
+    def grouped_cases(self) -> t.Dict[GroupKey, t.List[t.Union[PytestCase, PytestCaseRecord]]]:
         """Groups test cases by target and environment markers.
 
         :returns: Dictionary of GroupKey to list of PytestCases
         """
-        grouped: t.Dict[GroupKey, t.List[PytestCase]] = defaultdict(list)
+        grouped: t.Dict[GroupKey, t.List[t.Union[PytestCase, PytestCaseRecord]]] = defaultdict(list)
         for case in self.cases:
             grouped[GroupKey.from_case(case)].append(case)
         return grouped
@@ -315,7 +645,7 @@ class GroupedPytestCases:
                     'targets': key.target_selector,
                     'env_markers': key.env_selector,
                     'runner_tags': ['self-hosted', *key.runner_tags],  # self-hosted is required in github
-                    'nodes': ' '.join([c.item.nodeid for c in cases]),
+                    'nodes': ' '.join([c.nodeid for c in cases]),
                 }
             )
 
@@ -15,8 +15,9 @@ from _pytest.python import Metafunc
 from pytest_embedded.plugin import multi_dut_argument, multi_dut_fixture
 
 from ..settings import get_ci_settings
-from ..utils import setup_logging
+from ..utils import canonical_path, setup_logging
 from .models import PytestCase
+from .static_collector import StaticModule, build_static_module
 
 _MODULE_NOT_FOUND_REGEX = re.compile(r"No module named '(.+?)'")
 IDF_CI_PYTEST_CASE_KEY = pytest.StashKey[t.Optional[PytestCase]]()
@@ -35,6 +36,7 @@ class IdfPytestPlugin:
         *,
         cli_target: str,
         sdkconfig_name: t.Optional[str] = None,
+        static_collection: t.Optional[bool] = None,
     ) -> None:
         """Initialize the IDF pytest plugin.
 
@@ -42,11 +44,18 @@ class IdfPytestPlugin:
             separated targets, or 'all'
         :param sdkconfig_name: Filter tests whose apps are built with this sdkconfig
             name
+        :param static_collection: Parse test scripts instead of importing them while
+            running with ``--collect-only``. Defaults to the
+            ``static_pytest_collection`` setting
         """
         self.cli_target = cli_target
         self.sdkconfig_name = sdkconfig_name
 
         settings = get_ci_settings()
+        if static_collection is None:
+            static_collection = settings.static_pytest_collection
+        self.static_collection = static_collection
+
         if settings.is_in_ci:
             self.apps = settings.get_built_apps_list()
         else:
@@ -203,14 +212,31 @@ class IdfPytestPlugin:
     def pytest_pycollect_makemodule(
         self,
         module_path: Path,
-    ):
+        parent: pytest.Collector,
+    ) -> t.Optional[pytest.Module]:
         """Handle module collection for pytest, mocking any missing modules.
 
         This hook runs before module collection to prevent errors from missing
         dependencies by automatically mocking them.
 
+        With static collection enabled, the module is parsed instead of imported
+        when possible.
+
         :param module_path: Path to the module being collected
+        :param parent: The parent collector
+
+        :returns: A statically built module, or None to let pytest import the module
         """
+        if self.static_collection and parent.config.option.collectonly:
+            static_module = StaticModule.from_parent(parent, path=module_path)
+            static_module.static_obj = build_static_module(
+                module_path,
+                is_test_function=static_module.funcnamefilter,
+                is_test_class=static_module.classnamefilter,
+            )
+            if static_module.static_obj is not None:
+                return static_module
+
         while True:
             try:
                 spec = importlib.util.spec_from_file_location('', module_path)
@@ -227,6 +253,8 @@ class IdfPytestPlugin:
                     sys.modules[pkg] = MagicMock()
                     continue
 
+        return None
+
     @pytest.hookimpl(wrapper=True)
     def pytest_collection_modifyitems(self, config: pytest.Config, items: t.List[pytest.Function]):
         """Filter test cases based on target, sdkconfig, and available apps.
@@ -248,82 +276,98 @@ class IdfPytestPlugin:
             # Add 'host_test' marker to host test cases
             if 'qemu' in case.all_markers or 'linux' in case.targets:
                 item.add_marker(pytest.mark.host_test)
+                case.invalidate_markers_cache()
 
         yield
 
-        deselected_items: t.List[pytest.Function] = []
+        # nightly_run cases are selected only in nightly runs, unless both are included
+        nightly_run: t.Optional[bool] = None
+        if os.getenv('INCLUDE_NIGHTLY_RUN') != '1':
+            nightly_run = os.getenv('NIGHTLY_RUN') == '1'
 
-        # Filter by nightly_run marker
-        if os.getenv('INCLUDE_NIGHTLY_RUN') == '1':
-            # Include both nightly_run and non-nightly_run cases
-            pass
-        else:  # Determine if we should select nightly_run tests or non-nightly_run tests
-            nightly_or_not = os.getenv('NIGHTLY_RUN') == '1'
-            filtered_items = []
-            for item in items:
-                case = self.get_case_by_item(item)
-                if case is None:
-                    continue
+        built_app_dirs: t.Optional[t.Set[str]] = None
+        if self.apps is not None:
+            built_app_dirs = {canonical_path(app.build_path) for app in self.apps}
 
-                if ('nightly_run' in case.all_markers) == nightly_or_not:
-                    filtered_items.append(item)
-                else:
-                    deselected_items.append(item)
-            items[:] = filtered_items
-
-        # Filter by target
-        if self.cli_target != 'all':
-            filtered_items = []
-            for item in items:
-                case = self.get_case_by_item(item)
-                if case is None:
-                    continue
+        # items without a test case are dropped only if any filter applies
+        keep_unknown = (
+            nightly_run is None and self.cli_target == 'all' and not self.sdkconfig_name and built_app_dirs is None
+        )
 
-                if case.target_selector != self.cli_target:
-                    item.add_marker(pytest.mark.skip(reason=f'Target mismatch: {self.cli_target}'))
-                    deselected_items.append(item)
-                else:
-                    filtered_items.append(item)
-            items[:] = filtered_items
-
-        # Filter by sdkconfig_name
-        if self.sdkconfig_name:
-            filtered_items = []
-            for item in items:
-                case = self.get_case_by_item(item)
-                if case is None:
-                    continue
+        selected_items: t.List[pytest.Function] = []
+        deselected_items: t.List[pytest.Function] = []
+        for item in items:
+            case = self.get_case_by_item(item)
+            if case is None:
+                if keep_unknown:
+                    selected_items.append(item)
+                continue
 
-                if self.sdkconfig_name not in set(app.config for app in case.apps):
-                    item.stash[IDF_CI_PYTEST_DEBUG_INFO_KEY]['skip_reason'] = (
-                        f'sdkconfig name mismatch. '
-                        f'app sdkconfigs: {case.configs}, but CLI specified: {self.sdkconfig_name}'
-                    )
-                    deselected_items.append(item)
-                else:
-                    filtered_items.append(item)
-            items[:] = filtered_items
-
-        # Filter by app list
-        if self.apps is not None:
-            app_dirs = [os.path.abspath(app.build_path) for app in self.apps]
-            filtered_items = []
-            for item in items:
-                case = self.get_case_by_item(item)
-                if case is None:
-                    continue
+            reason = self._get_deselect_reason(case, nightly_run=nightly_run, built_app_dirs=built_app_dirs)
+            if reason is None:
+                selected_items.append(item)
+                continue
 
-                skip_reason = case.get_skip_reason_if_not_built(app_dirs)
-                if skip_reason:
-                    item.stash[IDF_CI_PYTEST_DEBUG_INFO_KEY]['skip_reason'] = skip_reason
-                    deselected_items.append(item)
-                else:
-                    filtered_items.append(item)
-            items[:] = filtered_items
+            if reason['filter'] == 'target':
+                item.add_marker(pytest.mark.skip(reason=reason['message']))
+                case.invalidate_markers_cache()
+            elif reason['filter'] != 'nightly_run':
+                item.stash[IDF_CI_PYTEST_DEBUG_INFO_KEY]['skip_reason'] = reason['message']
+            item.stash[IDF_CI_PYTEST_DEBUG_INFO_KEY]['deselect_reason'] = reason
+            deselected_items.append(item)
+
+        items[:] = selected_items
 
         # Report deselected items
         config.hook.pytest_deselected(items=deselected_items)
 
+    def _get_deselect_reason(
+        self,
+        case: PytestCase,
+        *,
+        nightly_run: t.Optional[bool],
+        built_app_dirs: t.Optional[t.Set[str]],
+    ) -> t.Optional[t.Dict[str, t.Any]]:
+        """Get the reason why the test case should be deselected.
+
+        :param case: The test case
+        :param nightly_run: Whether nightly_run cases or the other cases are selected,
+            None for both
+        :param built_app_dirs: Build directories of the built apps, None to not filter
+            by built apps
+
+        :returns: Dict with the name of the ``filter`` and a ``message``, or None if
+            the test case is selected
+        """
+        if nightly_run is not None and ('nightly_run' in case.all_markers) != nightly_run:
+            return {
+                'filter': 'nightly_run',
+                'message': (
+                    'only nightly_run cases are selected' if nightly_run else 'nightly_run cases are not selected'
+                ),
+            }
+
+        if self.cli_target != 'all' and case.target_selector != self.cli_target:
+            return {'filter': 'target', 'message': f'Target mismatch: {self.cli_target}'}
+
+        if self.sdkconfig_name and self.sdkconfig_name not in case.configs:
+            return {
+                'filter': 'sdkconfig',
+                'message': f'sdkconfig name mismatch. '
+                f'app sdkconfigs: {case.configs}, but CLI specified: {self.sdkconfig_name}',
+            }
+
+        if built_app_dirs is not None:
+            missing_build_dirs = [app.build_dir for app in case.apps if app.build_dir not in built_app_dirs]
+            if missing_build_dirs:
+                return {
+                    'filter': 'app_list',
+                    'message': case.get_skip_reason_if_not_built(built_app_dirs),
+                    'missing_build_dirs': missing_build_dirs,
+                }
+
+        return None
+
     def pytest_report_collectionfinish(self, items: t.List[pytest.Function]) -> None:
         for item in items:
             case = self.get_case_by_item(item)
@@ -347,6 +391,18 @@ def pytest_addoption(parser: pytest.Parser):
         '--sdkconfig',
         help='Run only tests whose apps are built with this sdkconfig name',
     )
+    idf_ci_group.addoption(
+        '--static-collection',
+        action='store_true',
+        default=None,
+        help='With --collect-only, parse test scripts instead of importing them when possible',
+    )
+    idf_ci_group.addoption(
+        '--no-static-collection',
+        action='store_false',
+        dest='static_collection',
+        help='Always import test scripts while collecting',
+    )
 
     # INI values
     parser.addini(
@@ -375,7 +431,11 @@ def pytest_configure(config: pytest.Config):
 
     PytestCase.KNOWN_ENV_MARKERS = env_markers
 
-    plugin = IdfPytestPlugin(cli_target=cli_target, sdkconfig_name=sdkconfig_name)
+    plugin = IdfPytestPlugin(
+        cli_target=cli_target,
+        sdkconfig_name=sdkconfig_name,
+        static_collection=config.getoption('static_collection'),
+    )
     config.stash[IDF_CI_PLUGIN_KEY] = plugin
     config.pluginmanager.register(plugin)
 
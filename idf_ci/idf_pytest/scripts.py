@@ -5,6 +5,7 @@ import io
 import logging
 import os.path
 import typing as t
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
 
@@ -12,7 +13,7 @@ import pytest
 
 from idf_ci._compat import UNDEF, UndefinedOr, is_undefined
 from idf_ci.envs import GitlabEnvVars
-from idf_ci.settings import get_ci_settings
+from idf_ci.settings import CiSettings, _ci_settings_context, get_ci_settings
 
 from ..utils import remove_subfolders, setup_logging
 from .models import PytestCase
@@ -29,6 +30,8 @@ def get_pytest_cases(
     marker_expr: UndefinedOr[t.Optional[str]] = UNDEF,
     filter_expr: t.Optional[str] = None,
     additional_args: t.Optional[t.List[str]] = None,
+    static_collection: t.Optional[bool] = None,
+    workers: t.Optional[int] = None,
 ) -> t.List[PytestCase]:
     """Collect pytest test cases from specified paths.
 
@@ -38,6 +41,12 @@ def get_pytest_cases(
     :param marker_expr: Filter by pytest marker expression -m
     :param filter_expr: Filter by pytest filter expression -k
     :param additional_args: Additional arguments to pass to pytest
+    :param static_collection: Parse test scripts instead of importing them. Defaults
+        to the ``static_pytest_collection`` setting
+    :param workers: Number of processes to collect the test cases with. The paths are
+        split into shards when greater than 1, and the test cases are detached from the
+        pytest sessions, without :attr:`PytestCase.item`. Defaults to the
+        ``pytest_collection_workers`` setting
 
     :returns: List of collected PytestCase objects
 
@@ -53,11 +62,6 @@ def get_pytest_cases(
     if filter_expr is None:
         filter_expr = envs.IDF_CI_SELECT_BY_FILTER_EXPR
 
-    plugin = IdfPytestPlugin(
-        cli_target=target,
-        sdkconfig_name=sdkconfig_name,
-    )
-
     check_dirs = []
     not_in_folders = [Path(f).resolve() for f in get_ci_settings().exclude_dirs]
     for folder in remove_subfolders(paths):
@@ -76,6 +80,41 @@ def get_pytest_cases(
         logger.info('No valid folders to check after applying exclusions. Skipping pytest collection.')
         return []
 
+    collect_kwargs: t.Dict[str, t.Any] = dict(
+        target=target,
+        sdkconfig_name=sdkconfig_name,
+        marker_expr=marker_expr,
+        filter_expr=filter_expr,
+        static_collection=static_collection,
+    )
+
+    if workers is None:
+        workers = get_ci_settings().pytest_collection_workers
+    if workers > 1:
+        return _collect_pytest_cases_sharded(
+            check_dirs, workers=workers, additional_args=additional_args or [], collect_kwargs=collect_kwargs
+        )
+
+    return _collect_pytest_cases(check_dirs, additional_args=additional_args, **collect_kwargs)
+
+
+def _collect_pytest_cases(
+    check_dirs: t.List[str],
+    *,
+    target: str,
+    sdkconfig_name: t.Optional[str],
+    marker_expr: t.Optional[str],
+    filter_expr: t.Optional[str],
+    additional_args: t.Optional[t.List[str]],
+    static_collection: t.Optional[bool],
+    allow_no_tests: bool = False,
+) -> t.List[PytestCase]:
+    plugin = IdfPytestPlugin(
+        cli_target=target,
+        sdkconfig_name=sdkconfig_name,
+        static_collection=static_collection,
+    )
+
     args = [
         # remove sub folders if parent folder is already in the list
         # https://github.com/pytest-dev/pytest/issues/13319
@@ -91,6 +130,8 @@ def get_pytest_cases(
         args.extend(['-m', f'{marker_expr}'])
     if filter_expr:
         args.extend(['-k', f'{filter_expr}'])
+    if static_collection is not None:
+        args.append('--static-collection' if static_collection else '--no-static-collection')
 
     if additional_args is not None:
         args.extend(additional_args)
@@ -119,4 +160,90 @@ def get_pytest_cases(
     if result == pytest.ExitCode.OK:
         return plugin.cases
 
+    if result == pytest.ExitCode.NO_TESTS_COLLECTED and allow_no_tests:
+        return []
+
     raise RuntimeError(f'pytest collection failed.\nArgs: {args}\nStdout: {stdout_content}\nStderr: {stderr_content}')
+
+
+def _split_into_shards(check_dirs: t.List[str], count: int) -> t.List[t.Tuple[int, str, t.List[str]]]:
+    """Split the folders into at least ``count`` shards, if possible.
+
+    Folders are split level by level into their sub folders, and the folder itself, with
+    its sub folders ignored.
+
+    :returns: List of (index of the check dir, folder, ignored sub folders)
+    """
+    shards: t.List[t.Tuple[int, str, t.List[str]]] = [(i, d, []) for i, d in enumerate(check_dirs)]
+    while len(shards) < count:
+        expanded: t.List[t.Tuple[int, str, t.List[str]]] = []
+        for index, folder, ignores in shards:
+            if ignores:  # already split
+                expanded.append((index, folder, ignores))
+                continue
+
+            subfolders = sorted(
+                entry.path for entry in os.scandir(folder) if entry.is_dir() and not entry.name.startswith(('.', '__'))
+            )
+            if subfolders:
+                expanded.append((index, folder, subfolders))
+                expanded.extend((index, subfolder, []) for subfolder in subfolders)
+            else:
+                expanded.append((index, folder, ignores))
+
+        if len(expanded) == len(shards):
+            break
+
+        shards = expanded
+
+    return shards
+
+
+def _collect_shard(
+    settings: CiSettings,
+    folder: str,
+    ignores: t.List[str],
+    additional_args: t.List[str],
+    collect_kwargs: t.Dict[str, t.Any],
+) -> t.Tuple[t.Set[str], t.List[PytestCase]]:
+    _ci_settings_context.set(settings)
+
+    cases = _collect_pytest_cases(
+        [folder],
+        additional_args=[*additional_args, *(f'--ignore={ignore}' for ignore in ignores)],
+        allow_no_tests=True,
+        **collect_kwargs,
+    )
+
+    return PytestCase.KNOWN_ENV_MARKERS, [case.detach() for case in cases]
+
+
+def _collect_pytest_cases_sharded(
+    check_dirs: t.List[str],
+    *,
+    workers: int,
+    additional_args: t.List[str],
+    collect_kwargs: t.Dict[str, t.Any],
+) -> t.List[PytestCase]:
+    shards = _split_into_shards(check_dirs, workers)
+    logger.debug('Collecting pytest test cases in %d shards with %d workers', len(shards), workers)
+
+    settings = get_ci_settings()
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+        futures = [
+            executor.submit(_collect_shard, settings, folder, ignores, additional_args, collect_kwargs)
+            for _, folder, ignores in shards
+        ]
+        results = [future.result() for future in futures]
+
+    env_markers: t.Set[str] = set()
+    cases: t.List[t.Tuple[t.Tuple[int, t.Tuple[str, ...]], PytestCase]] = []
+    for (index, _, _), (shard_env_markers, shard_cases) in zip(shards, results):
+        # each shard only knows the env markers of its own conftest files
+        env_markers.update(shard_env_markers)
+        cases.extend(((index, Path(case.path).parts), case) for case in shard_cases)
+    PytestCase.KNOWN_ENV_MARKERS = env_markers
+
+    # same order as collected in one pytest session, files are sorted by path, cases within a file keep their order
+    cases.sort(key=lambda x: x[0])
+    return [case for _, case in cases]
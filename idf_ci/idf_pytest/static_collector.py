@@ -0,0 +1,321 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Collect test modules without executing them.
+
+The test module is parsed with :mod:`ast`. Decorators of test functions and fixtures are evaluated with a restricted
+evaluator that only understands literals, module-level constants, ``pytest.mark.*``, ``pytest.param``,
+``pytest.fixture`` and the ``idf_parametrize`` helpers. The result is a stub module with empty function bodies that
+carries the same markers and parametrization as the original one, so that pytest generates the very same items from
+it.
+
+Whenever the module is too dynamic to be analyzed, or on Python 3.7, :func:`build_static_module` returns ``None`` and
+the caller falls back to importing the module.
+"""
+
+import ast
+import copy
+import importlib
+import logging
+import sys
+import types
+import typing as t
+from pathlib import Path
+
+import pytest
+from _pytest.fixtures import FixtureFunctionMarker
+from _pytest.mark.structures import MarkDecorator, MarkGenerator
+
+logger = logging.getLogger(__name__)
+
+# module name -> names that could be imported from it and evaluated statically
+_EVALUABLE_IMPORTS: t.Dict[str, t.Set[str]] = {
+    'pytest': {'mark', 'param', 'fixture'},
+    'pytest_embedded_idf.utils': {'idf_parametrize', 'soc_filtered_targets'},
+}
+_EVALUABLE_PYTEST_ATTRS = _EVALUABLE_IMPORTS['pytest']
+
+
+class NotStaticError(Exception):
+    """Raised when a module can not be analyzed statically."""
+
+
+class _Unresolvable:
+    """Placeholder of a module-level name whose value is unknown without executing the module."""
+
+
+_UNRESOLVABLE = _Unresolvable()
+
+
+class _Evaluator:
+    def __init__(self, tree: ast.Module) -> None:
+        self._nodes: t.Dict[str, t.Optional[ast.expr]] = {}  # None means the value is unknown
+        self._values: t.Dict[str, t.Any] = {}
+        self._evaluating: t.Set[str] = set()
+
+        for stmt in tree.body:
+            self._record(stmt)
+
+    def _bind(self, name: str, node: t.Optional[ast.expr]) -> None:
+        if name in self._nodes or name in self._values:
+            # rebinding, the final value depends on the execution order
+            self._values.pop(name, None)
+            self._nodes[name] = None
+        else:
+            self._nodes[name] = node
+
+    def _bind_value(self, name: str, value: t.Any) -> None:
+        if name in self._nodes or name in self._values:
+            self._nodes[name] = None
+            self._values.pop(name, None)
+        else:
+            self._values[name] = value
+
+    def _record(self, stmt: ast.stmt) -> None:
+        if isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                if alias.asname is None:
+                    # `import a.b` binds `a`
+                    name = alias.name.split('.')[0]
+                    self._bind_value(name, pytest if name == 'pytest' else _UNRESOLVABLE)
+                else:
+                    self._bind_value(alias.asname, pytest if alias.name == 'pytest' else _UNRESOLVABLE)
+        elif isinstance(stmt, ast.ImportFrom):
+            allowed = _EVALUABLE_IMPORTS.get(stmt.module or '', set()) if stmt.level == 0 else set()
+            for alias in stmt.names:
+                if alias.name == '*':
+                    raise NotStaticError('star import')
+
+                name = alias.asname or alias.name
+                if alias.name in allowed:
+                    module = importlib.import_module(stmt.module)  # type: ignore[arg-type]
+                    self._bind_value(name, getattr(module, alias.name))
+                else:
+                    self._bind_value(name, _UNRESOLVABLE)
+        elif isinstance(stmt, ast.Assign):
+            if len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name):
+                self._bind(stmt.targets[0].id, stmt.value)
+            else:
+                for target in stmt.targets:
+                    for node in ast.walk(target):
+                        if isinstance(node, ast.Name):
+                            self._bind(node.id, None)
+        elif isinstance(stmt, ast.AnnAssign):
+            if isinstance(stmt.target, ast.Name):
+                self._bind(stmt.target.id, stmt.value)
+        elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            self._bind(stmt.name, None)
+        elif isinstance(stmt, ast.Expr):
+            pass
+        else:
+            # compound statements, e.g. `if`, `try`, `with`, or augmented assignments
+            for node in ast.walk(stmt):
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    raise NotStaticError(f'"{node.name}" is defined conditionally at line {node.lineno}')
+                if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                    self._bind(node.id, None)
+                elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                    for alias in node.names:
+                        self._bind((alias.asname or alias.name).split('.')[0], None)
+
+    def is_bound(self, name: str) -> bool:
+        return name in self._nodes or name in self._values
+
+    def name(self, name: str) -> t.Any:
+        if name in self._values:
+            value = self._values[name]
+        elif self._nodes.get(name) is not None:
+            if name in self._evaluating:
+                raise NotStaticError(f'recursive definition of "{name}"')
+
+            self._evaluating.add(name)
+            try:
+                value = self._values[name] = self.eval(self._nodes[name])  # type: ignore[arg-type]
+            finally:
+                self._evaluating.discard(name)
+        else:
+            raise NotStaticError(f'unknown name "{name}"')
+
+        if value is _UNRESOLVABLE:
+            raise NotStaticError(f'unknown name "{name}"')
+
+        return value
+
+    def eval(self, node: ast.expr) -> t.Any:
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            return self.name(node.id)
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            items: t.List[t.Any] = []
+            for elt in node.elts:
+                if isinstance(elt, ast.Starred):
+                    items.extend(self.eval(elt.value))
+                else:
+                    items.append(self.eval(elt))
+            if isinstance(node, ast.List):
+                return items
+            if isinstance(node, ast.Tuple):
+                return tuple(items)
+            return set(items)
+        if isinstance(node, ast.Dict):
+            if any(k is None for k in node.keys):
+                raise NotStaticError('dict unpacking')
+            return {self.eval(k): self.eval(v) for k, v in zip(node.keys, node.values)}  # type: ignore[arg-type]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -self.eval(node.operand)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left, right = self.eval(node.left), self.eval(node.right)
+            if type(left) is not type(right) or not isinstance(left, (str, list, tuple, int)):
+                raise NotStaticError(f'unsupported operands at line {node.lineno}')
+            return left + right
+        if isinstance(node, ast.Attribute):
+            value = self.eval(node.value)
+            if value is pytest and node.attr in _EVALUABLE_PYTEST_ATTRS:
+                return getattr(pytest, node.attr)
+            if isinstance(value, MarkGenerator):
+                return getattr(value, node.attr)
+            raise NotStaticError(f'unsupported attribute "{node.attr}" at line {node.lineno}')
+        if isinstance(node, ast.Call):
+            func = self.eval(node.func)
+            if not self._is_evaluable_callable(func):
+                raise NotStaticError(f'unsupported call at line {node.lineno}')
+
+            args: t.List[t.Any] = []
+            for arg in node.args:
+                if isinstance(arg, ast.Starred):
+                    args.extend(self.eval(arg.value))
+                else:
+                    args.append(self.eval(arg))
+
+            kwargs: t.Dict[str, t.Any] = {}
+            for kw in node.keywords:
+                if kw.arg is None:
+                    kwargs.update(self.eval(kw.value))
+                else:
+                    kwargs[kw.arg] = self.eval(kw.value)
+
+            return func(*args, **kwargs)
+
+        raise NotStaticError(f'unsupported expression {type(node).__name__} at line {node.lineno}')
+
+    @staticmethod
+    def _is_evaluable_callable(func: t.Any) -> bool:
+        if isinstance(func, MarkDecorator):
+            return True
+
+        for module_name, names in _EVALUABLE_IMPORTS.items():
+            if getattr(func, '__module__', None) == module_name and getattr(func, '__name__', None) in names:
+                return True
+
+        return func is pytest.param or func is pytest.fixture
+
+
+def _stub_function(node: t.Union[ast.FunctionDef, ast.AsyncFunctionDef], filename: str) -> types.FunctionType:
+    """Compile a function with the same signature and location as ``node``, but with an empty body."""
+    args = copy.copy(node.args)
+    for arg in (*args.posonlyargs, *args.args, args.vararg, *args.kwonlyargs, args.kwarg):
+        if arg is not None:
+            arg.annotation = None
+    # defaults only tell pytest that the argument is not a fixture
+    args.defaults = [ast.Constant(value=None) for _ in args.defaults]
+    args.kw_defaults = [None if d is None else ast.Constant(value=None) for d in args.kw_defaults]
+
+    stub = copy.copy(node)
+    stub.args = args
+    stub.body = [ast.Pass()]
+    stub.decorator_list = []
+    stub.returns = None
+    # co_firstlineno of a decorated function points to its first decorator
+    stub.lineno = min([node.lineno] + [d.lineno for d in node.decorator_list])
+    ast.fix_missing_locations(stub)
+
+    namespace: t.Dict[str, t.Any] = {}
+    exec(compile(ast.Module(body=[stub], type_ignores=[]), filename, 'exec'), namespace)
+    return namespace[node.name]
+
+
+def build_static_module(
+    module_path: Path,
+    *,
+    is_test_function: t.Callable[[str], bool],
+    is_test_class: t.Callable[[str], bool],
+) -> t.Optional[types.ModuleType]:
+    """Build a stub of the test module without importing it.
+
+    :param module_path: Path to the test module
+    :param is_test_function: Whether a module-level function name would be collected as a test
+    :param is_test_class: Whether a module-level class name would be collected as a test class
+
+    :returns: The stub module, or None if the module is too dynamic to be analyzed statically
+    """
+    if sys.version_info < (3, 8):
+        # the stubs rely on `ast.Constant` literals and positional-only arguments, added in Python 3.8
+        logger.debug('Falling back to import %s: static collection requires Python 3.8 or later', module_path)
+        return None
+
+    filename = str(module_path)
+    try:
+        tree = ast.parse(module_path.read_bytes(), filename=filename)
+    except SyntaxError:
+        # let pytest report the error
+        return None
+
+    module = types.ModuleType(module_path.stem)
+    module.__file__ = filename
+
+    try:
+        evaluator = _Evaluator(tree)
+
+        for stmt in tree.body:
+            if isinstance(stmt, ast.ClassDef):
+                if is_test_class(stmt.name):
+                    raise NotStaticError(f'test class "{stmt.name}"')
+                continue
+
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if stmt.name.startswith('pytest_'):
+                    raise NotStaticError(f'hook "{stmt.name}" defined in test module')
+
+                decorators = [evaluator.eval(d) for d in stmt.decorator_list]
+                is_fixture = any(d is pytest.fixture or isinstance(d, FixtureFunctionMarker) for d in decorators)
+                if not is_test_function(stmt.name) and not is_fixture:
+                    continue
+
+                obj: t.Any = _stub_function(stmt, filename)
+                for decorator in reversed(decorators):
+                    obj = decorator(obj)
+                setattr(module, stmt.name, obj)
+                continue
+
+            if isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+                targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+                for target in targets:
+                    for node in ast.walk(target):
+                        if not isinstance(node, ast.Name):
+                            continue
+                        if node.id in ('pytestmark', '__test__'):
+                            setattr(module, node.id, evaluator.name(node.id))
+                        elif is_test_function(node.id) or is_test_class(node.id):
+                            raise NotStaticError(f'test "{node.id}" is not defined by a function')
+
+        for name in ('pytest_plugins', 'pytest_generate_tests'):
+            if evaluator.is_bound(name):
+                raise NotStaticError(f'"{name}" defined in test module')
+    except NotStaticError as e:
+        logger.debug('Falling back to import %s: %s', module_path, e)
+        return None
+    except Exception as e:
+        # errors raised by evaluated decorators, pytest would raise them again while importing the module
+        logger.debug('Falling back to import %s: %r', module_path, e)
+        return None
+
+    return module
+
+
+class StaticModule(pytest.Module):
+    """A pytest module whose object is a stub built by :func:`build_static_module`."""
+
+    static_obj: t.Optional[types.ModuleType] = None
+
+    def _getobj(self):
+        return self.static_obj
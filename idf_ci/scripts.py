@@ -3,18 +3,23 @@
 import logging
 import os
 import typing as t
-from collections import defaultdict
 from dataclasses import dataclass
 
-from idf_build_apps import App, build_apps, find_apps
+from idf_build_apps import App, build_apps
 from idf_build_apps.constants import BuildStatus
 from idf_build_apps.manifest import DEFAULT_BUILD_TARGETS
 from idf_build_apps.utils import get_parallel_start_stop
 
 from ._compat import UNDEF, UndefinedOr, is_defined_and_satisfies, is_undefined
+from .app_durations import dump_build_durations, select_app_shard
+from .app_finder import find_apps_for_targets
+from .app_index import find_apps_with_index
+from .app_list import LazyAppList
+from .build_cache import record_cached_builds, restore_cached_builds
 from .envs import GitlabEnvVars
-from .filters.component_targets import should_skip_build_for_components
+from .filters.component_targets import should_skip_builds_for_components
 from .settings import get_ci_settings
+from .utils import canonical_path
 
 if t.TYPE_CHECKING:
     from .idf_pytest import PytestCase
@@ -22,39 +27,64 @@ if t.TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+class _AppDirTrie:
+    """Prefix trie of the app directories, keyed by path components."""
+
+    def __init__(self, app_dirs: t.Iterable[str]) -> None:
+        self._root: t.Dict[t.Optional[str], t.Any] = {}
+        for app_dir in app_dirs:
+            node = self._root
+            for part in app_dir.split('/'):
+                node = node.setdefault(part, {})
+            # None is never a path component, mark the app directory with it
+            node[None] = app_dir
+
+    def owner(self, path: str) -> t.Optional[str]:
+        """Get the innermost app directory that contains the path.
+
+        :param path: Canonical path of a file or folder
+
+        :returns: The app directory, or None if the path is not inside any app
+        """
+        res = None
+        node = self._root
+        for part in path.split('/'):
+            child = node.get(part)
+            if child is None:
+                break
+            node = child
+            res = node.get(None, res)
+        return res
+
+
 def _filter_apps_by_modified_files(
     apps: t.Iterable['App'],
     modified_files: t.Sequence[str],
+    found_apps: t.Optional[t.Iterable['App']] = None,
 ) -> t.List['App']:
     """Filter a list of apps to include only those affected by modified files.
 
     This ensures that only apps directly affected by changes in the merge request are
     returned, reducing unnecessary processing of unaffected apps.
-    """
-    app_classes = {app.__class__ for app in apps}
-    checked_dirs: t.Set[str] = set()  # folders we've already checked
-    modified_app_dirs: t.Set[str] = set()
-
-    def is_app(path: str) -> bool:
-        return any(c.is_app(path) for c in app_classes)
-
-    for f in modified_files:
-        current = os.path.abspath(f)
-        if not os.path.isdir(current):
-            current = os.path.dirname(current)
 
-        while current and current != '/':
-            if current in checked_dirs:
-                break  # already checked this folder, no need to repeat
-            checked_dirs.add(current)
+    Each modified file belongs to the innermost app directory containing it, among the
+    directories of ``found_apps``, so the file system is not accessed.
 
-            if is_app(current):
-                modified_app_dirs.add(current)
-                break  # found app, stop walking up
+    :param apps: Apps to filter
+    :param modified_files: Modified files
+    :param found_apps: All the found apps, including the ones not in ``apps``. Default to ``apps``
+    """
+    app_list = list(apps)
+    app_dirs = [canonical_path(app.app_dir) for app in app_list]
+    if found_apps is None:
+        trie = _AppDirTrie(app_dirs)
+    else:
+        trie = _AppDirTrie({canonical_path(app.app_dir) for app in found_apps})
 
-            current = os.path.dirname(current)
+    modified_app_dirs = {trie.owner(canonical_path(f)) for f in modified_files}
+    modified_app_dirs.discard(None)
 
-    return [app for app in apps if os.path.abspath(app.app_dir) in modified_app_dirs]
+    return [app for app, app_dir in zip(app_list, app_dirs) if app_dir in modified_app_dirs]
 
 
 def _filter_apps_by_component_target(
@@ -67,15 +97,11 @@ def _filter_apps_by_component_target(
         len(app_list),
     )
 
-    filtered_apps = {
-        _app
-        for _app in app_list
-        if not should_skip_build_for_components(
-            modified_files,
-            _app.depends_components,
-            _app.target,
-        )
-    }
+    skips = should_skip_builds_for_components(
+        modified_files,
+        [(_app.depends_components, _app.target) for _app in app_list],
+    )
+    filtered_apps = [_app for _app, skip in zip(app_list, skips) if not skip]
 
     logger.debug(
         'Number of apps after component-target filter: %d',
@@ -85,6 +111,77 @@ def _filter_apps_by_component_target(
     return filtered_apps
 
 
+def _classify_apps(
+    apps: t.Sequence[App],
+    cases: t.Sequence['PytestCase'],
+    modified_cases: t.Sequence['PytestCase'],
+) -> t.Tuple[t.List[App], t.List[App], t.List[App]]:
+    """Split the apps by the test cases that require them.
+
+    Apps and cases are numbered first, and the join tables between them are built once, so that each case is expanded
+    only once, and the classification is done on sets of integers instead of hashing the apps.
+
+    :param apps: Found apps
+    :param cases: All test cases
+    :param modified_cases: Test cases in the modified test scripts
+
+    :returns: Tuple of (modified test-related apps, test-related apps, non-test-related apps), disjoint and in the
+        order of ``apps``. Modified test-related apps are required by the modified test cases, and must be built.
+        Skipped apps are only test-related if they're required by a case together with another app.
+    """
+    app_ids: t.Dict[t.Tuple[str, str, str], int] = {}
+    app_keys = []
+    for i, app in enumerate(apps):
+        app_key = (canonical_path(app.app_dir), app.target, app.config_name or 'default')
+        app_keys.append(app_key)
+        app_ids[app_key] = i
+
+    def _key_to_app_ids(_cases: t.Sequence['PytestCase']) -> t.Dict[t.Tuple[str, str, str], t.Set[int]]:
+        # app key -> ids of all the apps required by any case that requires the app
+        res: t.Dict[t.Tuple[str, str, str], t.Set[int]] = {}
+        for _case in _cases:
+            _keys = [(_app.path, _app.target, _app.config) for _app in _case.apps]
+            _ids = {app_ids[_k] for _k in _keys if _k in app_ids}
+            for _k in _keys:
+                res.setdefault(_k, set()).update(_ids)
+        return res
+
+    key_to_test_app_ids = _key_to_app_ids(cases)
+    key_to_modified_app_ids = _key_to_app_ids(modified_cases)
+
+    modified_test_ids: t.Set[int] = set()
+    test_ids: t.Set[int] = set()
+    non_test_ids: t.Set[int] = set()
+    for i, app_key in enumerate(app_keys):
+        if app_key in key_to_modified_app_ids:
+            modified_test_ids.update(key_to_modified_app_ids[app_key])
+        elif apps[i].build_status == BuildStatus.SKIPPED:
+            continue
+        elif app_key in key_to_test_app_ids:
+            test_ids.update(key_to_test_app_ids[app_key])
+        else:
+            non_test_ids.add(i)
+
+    test_ids -= modified_test_ids
+    non_test_ids -= modified_test_ids | test_ids
+
+    return (
+        [apps[i] for i in sorted(modified_test_ids)],
+        [apps[i] for i in sorted(test_ids)],
+        [apps[i] for i in sorted(non_test_ids)],
+    )
+
+
+def _set_preserve(apps: t.Sequence[App], preserve: bool) -> None:
+    if isinstance(apps, LazyAppList):
+        # without validating all the apps
+        apps.preserve = preserve
+        return
+
+    for app in apps:
+        app.preserve = preserve
+
+
 @dataclass
 class ProcessedArgs:
     """Container for processed arguments with meaningful field names."""
@@ -93,8 +190,8 @@ class ProcessedArgs:
     modified_components: t.Optional[t.List[str]]
     filter_expr: t.Optional[str]
     default_build_targets: t.List[str]
-    test_related_apps: t.Optional[t.List[App]]
-    non_test_related_apps: t.Optional[t.List[App]]
+    test_related_apps: t.Optional[t.Sequence[App]]
+    non_test_related_apps: t.Optional[t.Sequence[App]]
 
 
 def preprocess_args(
@@ -143,8 +240,8 @@ def preprocess_args(
             processed_components = None
 
     if not settings.is_in_ci:
-        test_related_apps: t.Optional[t.List[App]] = None
-        non_test_related_apps: t.Optional[t.List[App]] = None
+        test_related_apps: t.Optional[t.Sequence[App]] = None
+        non_test_related_apps: t.Optional[t.Sequence[App]] = None
     else:
         logger.debug('Running in CI, reading test-related and non-test-related apps from files if available')
         test_related_apps = settings.read_apps_from_files([settings.collected_test_related_apps_filepath])
@@ -180,9 +277,12 @@ def get_all_apps(
     # additional args
     compare_manifest_sha_filepath: t.Optional[str] = None,
     build_system: UndefinedOr[t.Optional[str]] = UNDEF,
-) -> t.Tuple[t.List[App], t.List[App]]:
+) -> t.Tuple[t.Sequence[App], t.Sequence[App]]:
     """Get test-related and non-test-related applications.
 
+    In CI, the apps are read from ``collected_test_related_apps_filepath`` and
+    ``collected_non_test_related_apps_filepath`` if they exist. Apps in the compact format are validated lazily.
+
     :param paths: List of paths to search for applications
     :param target: Target device(s) separated by commas
     :param modified_files: List of modified files
@@ -207,11 +307,8 @@ def get_all_apps(
     )
 
     if processed_args.test_related_apps is not None and processed_args.non_test_related_apps is not None:
-        for app in processed_args.test_related_apps:
-            app.preserve = settings.preserve_test_related_apps
-
-        for app in processed_args.non_test_related_apps:
-            app.preserve = settings.preserve_non_test_related_apps
+        _set_preserve(processed_args.test_related_apps, settings.preserve_test_related_apps)
+        _set_preserve(processed_args.non_test_related_apps, settings.preserve_non_test_related_apps)
 
         return processed_args.test_related_apps, processed_args.non_test_related_apps
 
@@ -225,24 +322,17 @@ def get_all_apps(
     if settings.exclude_dirs:
         additional_kwargs['exclude'] = settings.exclude_dirs
 
-    apps = []
-    for _t in target.split(','):
-        if _t != 'all' and _t not in processed_args.default_build_targets:
-            _default_build_targets = [*processed_args.default_build_targets, _t]
-        else:
-            _default_build_targets = processed_args.default_build_targets
-
-        apps.extend(
-            find_apps(
-                paths or ['.'],
-                _t,
-                modified_files=processed_args.modified_files,
-                modified_components=processed_args.modified_components,
-                include_skipped_apps=True,
-                default_build_targets=_default_build_targets,
-                **additional_kwargs,
-            )
-        )
+    find_kwargs: t.Dict[str, t.Any] = dict(
+        modified_files=processed_args.modified_files,
+        modified_components=processed_args.modified_components,
+        include_skipped_apps=True,
+        default_build_targets=processed_args.default_build_targets,
+        **additional_kwargs,
+    )
+    if settings.app_index_filepath:
+        apps = find_apps_with_index(paths or ['.'], target, index_filepath=settings.app_index_filepath, **find_kwargs)
+    else:
+        apps = find_apps_for_targets(paths or ['.'], target, **find_kwargs)
 
     _select_by_targets = envs.select_by_targets
 
@@ -281,64 +371,31 @@ def get_all_apps(
             case for case in modified_pytest_cases if any(app.target in _select_by_targets for app in case.apps)
         ]
 
-    # Create dictionaries mapping app info to test cases
-    def get_app_dict(_cases: t.List['PytestCase']) -> t.Dict[t.Tuple[str, str, str], t.List['PytestCase']]:
-        app_dict = defaultdict(list)
-        for _case in _cases:
-            for _case_app in _case.apps:
-                app_dict[(_case_app.path, _case_app.target, _case_app.config)].append(_case)
-        return app_dict
-
-    pytest_dict = get_app_dict(cases)
-    modified_pytest_dict = get_app_dict(modified_pytest_cases)
-
-    modified_test_apps = set()  # set to SHOULD_BE_BUILT
-    test_apps = set()
-    non_test_apps = set()
-
-    app_map = {(os.path.abspath(app.app_dir), app.target, app.config_name or 'default'): app for app in apps}
-
-    def _get_case_apps(_case: 'PytestCase') -> t.Set[App]:
-        _apps = set()
-        for _app in _case.apps:
-            _app_key = (os.path.abspath(_app.path), _app.target, _app.config)
-            if _app_key in app_map:
-                _apps.add(app_map[_app_key])
-        return _apps
-
-    for app in apps:
-        app_key = (os.path.abspath(app.app_dir), app.target, app.config_name or 'default')
-        _modified_cases = modified_pytest_dict.get(app_key)
-        if _modified_cases:
-            for case in _modified_cases:
-                modified_test_apps.update(_get_case_apps(case))
-            continue
-
-        if app.build_status == BuildStatus.SKIPPED:
-            continue
+    if (
+        settings.test_impact_index_filepath
+        and os.path.isfile(settings.test_impact_index_filepath)
+        and (processed_args.modified_files is not None or processed_args.modified_components is not None)
+    ):
+        from .idf_pytest.impact import TestImpactIndex
 
-        _pytest_cases = pytest_dict.get(app_key)
-        if _pytest_cases:
-            for case in _pytest_cases:
-                test_apps.update(_get_case_apps(case))
-        else:
-            non_test_apps.add(app)
+        cases = TestImpactIndex.load(settings.test_impact_index_filepath).filter_cases(
+            cases, processed_args.modified_files, processed_args.modified_components
+        )
 
-    test_apps = test_apps - modified_test_apps
-    non_test_apps = non_test_apps - modified_test_apps - test_apps
+    modified_test_apps, test_apps, non_test_apps = _classify_apps(apps, cases, modified_pytest_cases)
 
     if (
         settings.filter_non_test_related_apps_by_modified_files
         and processed_args.modified_files
         and os.getenv('CI_MERGE_REQUEST_IID') is not None
     ):
-        non_test_apps = set(_filter_apps_by_modified_files(non_test_apps, processed_args.modified_files))
+        non_test_apps = _filter_apps_by_modified_files(non_test_apps, processed_args.modified_files, apps)
     for app in modified_test_apps:
         app.build_status = BuildStatus.SHOULD_BE_BUILT  # must be built
 
     if _select_by_targets:
         # no need to remove test_apps, since they are not in non_test_apps
-        non_test_apps = {app for app in non_test_apps if app.target in _select_by_targets}
+        non_test_apps = [app for app in non_test_apps if app.target in _select_by_targets]
 
     if (
         settings.filter_apps_by_component_target
@@ -346,12 +403,14 @@ def get_all_apps(
         and os.getenv('CI_MERGE_REQUEST_IID') is not None
     ):
         # Build all targets apps for modified folders
-        full_target_apps = set(_filter_apps_by_modified_files(test_apps, processed_args.modified_files))
+        full_target_apps = _filter_apps_by_modified_files(test_apps, processed_args.modified_files, apps)
         # Skip non target-related apps
         filtered_apps = _filter_apps_by_component_target(test_apps, processed_args.modified_files)
-        test_apps = filtered_apps.union(full_target_apps)
+        # both are taken from `test_apps`, compare by identity instead of hashing the apps
+        kept = {id(app) for app in (*full_target_apps, *filtered_apps)}
+        test_apps = [app for app in test_apps if id(app) in kept]
 
-    test_apps = test_apps.union(modified_test_apps)
+    test_apps = [*test_apps, *modified_test_apps]
     for app in test_apps:
         app.preserve = settings.preserve_test_related_apps
 
@@ -414,11 +473,8 @@ def build(
         filter_expr=processed_args.filter_expr,
     )
 
-    for app in test_related_apps:
-        app.preserve = settings.preserve_test_related_apps
-
-    for app in non_test_related_apps:
-        app.preserve = settings.preserve_non_test_related_apps
+    _set_preserve(test_related_apps, settings.preserve_test_related_apps)
+    _set_preserve(non_test_related_apps, settings.preserve_non_test_related_apps)
 
     if processed_args.filter_expr:
         only_test_related = True
@@ -429,28 +485,96 @@ def build(
         only_test_related = True
         logger.debug('Marker expression is set to `%s`, building only test-related applications', marker_expr)
 
+    shard_name = None
     if only_test_related is True or (only_test_related is None and envs.IDF_CI_BUILD_ONLY_TEST_RELATED_APPS):
         logger.info('Building only test-related applications')
         apps = test_related_apps
+        shard_name = 'test_related'
     elif only_non_test_related is True or (
         only_non_test_related is None and envs.IDF_CI_BUILD_ONLY_NON_TEST_RELATED_APPS
     ):
         logger.info('Building only non-test-related applications')
         apps = non_test_related_apps
+        shard_name = 'non_test_related'
     else:
         logger.info('Building all applications')
         apps = sorted([*test_related_apps, *non_test_related_apps])
 
-    ret = build_apps(
-        apps,
-        parallel_count=parallel_count,
-        parallel_index=parallel_index,
-        dry_run=dry_run,
-        modified_files=processed_args.modified_files,
-        modified_components=processed_args.modified_components,
-    )
+    shard_apps = None
+    if shard_name and parallel_count > 1:
+        shard_apps = select_app_shard(
+            apps,
+            settings.gitlab.build_pipeline.app_shards_filepath,
+            shard_name,
+            parallel_count,
+            parallel_index,
+        )
+
+    if shard_apps is not None:
+        built_apps = shard_apps
+    else:
+        # only returning the ones assigned, 1-indexed
+        start, stop = get_parallel_start_stop(len(apps), parallel_count, parallel_index)
+        built_apps = list(apps[start - 1 : stop])
+        if isinstance(apps, LazyAppList):
+            # build the assigned apps only like the recorded shards, the others are never validated
+            shard_apps = built_apps
+
+    fingerprints: t.Dict[int, str] = {}
+    reused_apps: t.List[App] = []
+    if settings.gitlab.build_pipeline.build_cache and not dry_run:
+        fingerprints = restore_cached_builds(built_apps)
+        # no app is built yet, the successful ones are restored
+        reused_apps = [app for app in built_apps if app.build_status == BuildStatus.SUCCESS]
+
+    collect_filenames = _parallel_collect_filenames(parallel_count, parallel_index)
+    duration_filename = settings.gitlab.build_pipeline.duration_filename
+    if duration_filename and not dry_run and not collect_filenames['junitxml_filename']:
+        # the build durations are read from the junitxml report
+        collect_filenames['junitxml_filename'] = f'build_summary_{parallel_index}.xml'
+
+    if shard_apps is not None:
+        logger.info('Building %d apps assigned to parallel index %d', len(shard_apps), parallel_index)
+        ret = build_apps(
+            shard_apps,
+            dry_run=dry_run,
+            modified_files=processed_args.modified_files,
+            modified_components=processed_args.modified_components,
+            **collect_filenames,
+        )
+    else:
+        ret = build_apps(
+            list(apps),
+            parallel_count=parallel_count,
+            parallel_index=parallel_index,
+            dry_run=dry_run,
+            modified_files=processed_args.modified_files,
+            modified_components=processed_args.modified_components,
+            junitxml_filename=collect_filenames['junitxml_filename'],
+        )
 
-    # only returning the ones assigned, 1-indexed
-    start, stop = get_parallel_start_stop(len(apps), parallel_count, parallel_index)
+    if fingerprints:
+        record_cached_builds(built_apps, fingerprints)
+
+    if duration_filename and not dry_run:
+        # the reused apps are not built in this job
+        reused = {id(app) for app in reused_apps}
+        dump_build_durations(
+            [app for app in built_apps if id(app) not in reused],
+            collect_filenames['junitxml_filename'],
+            duration_filename.replace('@p', str(parallel_index)),
+        )
 
-    return apps[start - 1 : stop], ret
+    return built_apps, ret
+
+
+def _parallel_collect_filenames(parallel_count: int, parallel_index: int) -> t.Dict[str, t.Any]:
+    # the apps of the parallel job are built as a whole, keep the parallel index in the collect filenames
+    from idf_build_apps.args import BuildArguments
+
+    args = BuildArguments(parallel_count=parallel_count, parallel_index=parallel_index)
+    return {
+        'collect_app_info_filename': args.collect_app_info,
+        'collect_size_info_filename': args.collect_size_info,
+        'junitxml_filename': args.junitxml,
+    }
@@ -1,5 +1,6 @@
 # SPDX-FileCopyrightText: 2025-2026 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
+import copy
 import logging
 import os
 import re
@@ -7,12 +8,11 @@ import typing as t
 import warnings
 from collections.abc import Mapping
 from contextvars import ContextVar
+from functools import lru_cache
 from pathlib import Path
 
 from esp_bool_parser.constants import ALL_TARGETS
-from idf_build_apps import App, json_list_files_to_apps
-from idf_build_apps.constants import BuildStatus
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 from pydantic_settings import (
     BaseSettings as _BaseSettings,
 )
@@ -23,7 +23,11 @@ from pydantic_settings import (
 )
 from tomlkit import load
 
-from idf_ci._compat import PathLike
+from idf_ci._compat import PathLike, tomllib
+from idf_ci.component_mapping import ComponentMapper, compile_regexes, get_component_mapper
+
+if t.TYPE_CHECKING:
+    from idf_build_apps import App
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,16 @@ LEGACY_ARTIFACT_NATIVE_FIELD_ALIASES = [
     'test_job_filepatterns',
 ]
 
+# settings of the build child pipeline, overridden as unused by the test child pipeline
+_BUILD_ONLY_PIPELINE_SETTINGS = (
+    'default_app_duration',
+    'duration_filename',
+    'app_shards_filepath',
+    'build_cache',
+    'build_cache_component_dirs',
+    'build_cache_toolchain_version',
+)
+
 
 class DeprecatedConfigWarning(FutureWarning):
     """Warning raised when deprecated config keys are used."""
@@ -62,39 +76,45 @@ class TomlConfigSettingsSource(InitSettingsSource):
         if not path or not path.is_file():
             return {}
 
-        with open(path) as f:
-            # tomlkit preserves style-aware wrapper types (e.g. its own `Bool`/`Integer`)
-            # which fail pydantic's strict type checks. `.unwrap()` converts them to
-            # plain python types (bool, int, str, etc.).
-            #
-            # Reproduced with tomlkit==0.13.3, pydantic==2.11.4, pydantic-core==2.33.2,
-            # pydantic-settings==2.9.1: a `bool` field set in the toml file (e.g.
-            # `zip_first = true`) raised `pydantic_core.ValidationError: Input should be
-            # a valid boolean [type=bool_type, input_value=True, input_type=Bool]`.
-            return load(f).unwrap()
+        try:
+            stat = path.stat()
+        except OSError:
+            return {}
 
+        # the validators shall not modify the cached data
+        return copy.deepcopy(_load_toml(str(path), stat.st_mtime_ns, stat.st_size))
 
-def pick_toml_file(provided: t.Optional[PathLike], filename: str = '.idf_ci.toml') -> t.Optional[Path]:
-    """Pick a file path to use.
 
-    If a file path is provided, use it. Otherwise, search up the directory tree for a
-    file with the given name.
+@lru_cache(maxsize=16)
+def _load_toml(path: str, mtime_ns: int, size: int) -> t.Dict[str, t.Any]:  # noqa: ARG001
+    # cached by the modification time and size of the file
+    if tomllib is not None:
+        with open(path, 'rb') as fr:
+            return tomllib.load(fr)
 
-    :param provided: Explicit path provided when instantiating this function.
-    :param filename: Name of the file to search for.
-    """
+    with open(path) as f:
+        # tomlkit preserves style-aware wrapper types (e.g. its own `Bool`/`Integer`)
+        # which fail pydantic's strict type checks. `.unwrap()` converts them to
+        # plain python types (bool, int, str, etc.).
+        #
+        # Reproduced with tomlkit==0.13.3, pydantic==2.11.4, pydantic-core==2.33.2,
+        # pydantic-settings==2.9.1: a `bool` field set in the toml file (e.g.
+        # `zip_first = true`) raised `pydantic_core.ValidationError: Input should be
+        # a valid boolean [type=bool_type, input_value=True, input_type=Bool]`.
+        return load(f).unwrap()
+
+
+def _find_toml_file(provided: t.Optional[str], filename: str, cwd: str) -> t.Optional[Path]:
     if provided:
-        provided_p = Path(provided)
+        provided_p = Path(cwd, provided)
         if provided_p.is_file():
-            fp = provided_p.resolve()
-            logger.debug(f'Loading config file: {fp}')
-            return fp
+            return provided_p.resolve()
 
-    rv = Path.cwd()
+    # up to the root folder, excluded
+    rv = Path(cwd)
     while len(rv.parts) > 1:
         fp = rv / filename
         if fp.is_file():
-            logger.debug(f'Loading config file: {fp}')
             return fp
 
         rv = rv.parent
@@ -102,6 +122,39 @@ def pick_toml_file(provided: t.Optional[PathLike], filename: str = '.idf_ci.toml
     return None
 
 
+# picked file paths, keyed by (cwd, provided, filename)
+_picked_toml_files: t.Dict[t.Tuple[str, t.Optional[str], str], Path] = {}
+
+
+def pick_toml_file(provided: t.Optional[PathLike], filename: str = '.idf_ci.toml') -> t.Optional[Path]:
+    """Pick a file path to use.
+
+    If a file path is provided, use it. Otherwise, search up the directory tree for a
+    file with the given name.
+
+    The picked path is cached by the current working directory and the arguments, and only checked to still be a
+    file on the next calls. Otherwise, the directory tree is searched again. Only regular files are picked.
+
+    :param provided: Explicit path provided when instantiating this function.
+    :param filename: Name of the file to search for.
+    """
+    key = (os.getcwd(), os.fspath(provided) if provided else None, filename)
+
+    fp = _picked_toml_files.get(key)
+    if fp is not None and fp.is_file():
+        return fp
+
+    fp = _find_toml_file(key[1], filename, key[0])
+    if fp is None:
+        # not cached, the file may be created later
+        _picked_toml_files.pop(key, None)
+        return None
+
+    logger.debug(f'Loading config file: {fp}')
+    _picked_toml_files[key] = fp
+    return fp
+
+
 class CliOverridesSettingsSource(InitSettingsSource):
     """A source class that loads variables from an in-memory dict for CLI overrides"""
 
@@ -183,6 +236,10 @@ class ArtifactSettingsS3(BaseModel):
     creating a zip archive.
     """
 
+    build_cache_bucket: str = 'idf-artifacts'
+    """S3 bucket used to record the input fingerprints of the built apps, when ``gitlab.build_pipeline.build_cache``
+    is enabled."""
+
 
 class ArtifactSettingsNative(BaseModel):
     enable: bool = True
@@ -207,6 +264,7 @@ class ArtifactSettingsNative(BaseModel):
         '**/build*/build.log',  # build_log_filename
         'app_info_*.txt',  # collect_app_info_filename
         'build_summary_*.xml',  # junitxml
+        'build_durations_*.txt',  # gitlab.build_pipeline.duration_filename
     ]
     """List of glob patterns for CI build jobs artifacts to collect."""
 
@@ -308,6 +366,78 @@ class BuildPipelineSettings(BaseModel):
     runs_per_job: int = 60
     """Maximum number of apps to build in a single job."""
 
+    runner_counts: t.Dict[str, int] = {}
+    """Number of the available runners of each tag set, keyed by the comma-separated sorted tags, like ``build``.
+
+    If the runners of ``job_tags`` are set, the number of parallel jobs of each build job is chosen to minimize the
+    expected duration of the build stage, instead of by ``runs_per_job``. The chosen numbers are written as a comment
+    block at the top of the generated YAML file.
+    """
+
+    job_startup_overhead: float = 60
+    """Expected startup overhead in seconds of each build job, when choosing the number of parallel jobs by
+    ``runner_counts``."""
+
+    default_app_duration: float = 60
+    """Build duration in seconds of the apps, if no app has recorded build duration."""
+
+    duration_filename: t.Optional[str] = 'build_durations_@p.txt'
+    """Path to the file recording the build durations of the apps built in the job. ``@p`` would be replaced by the
+    parallel index. Set to empty to disable.
+
+    The durations are read from the junitxml report of idf-build-apps, written to ``build_summary_@p.xml`` if
+    ``junitxml_filename`` is not set in the idf-build-apps config file."""
+
+    duration_filepatterns: t.List[str] = []
+    """Glob patterns of the build duration files of previous build jobs.
+
+    If set, the apps of each build job are sharded into the parallel jobs by their recorded build durations, instead
+    of by count. The apps of each parallel job are recorded in ``app_shards_filepath``.
+    """
+
+    app_shards_filepath: str = 'app_shards.json'
+    """Path to the file recording the apps of each parallel build job, while generating the build child pipeline.
+
+    Build jobs build the apps recorded for their parallel index if the file exists.
+    """
+
+    build_cache: bool = False
+    """Reuse the builds of previous pipelines for the apps with the same input fingerprints. Requires S3 artifacts.
+
+    Build jobs download the artifacts of these apps from the S3 prefix of the previous commit instead of building
+    them, and the apps are not counted while choosing the number of parallel build jobs. Only apps with
+    ``depends_components`` set in the manifest files are reused.
+    """
+
+    build_cache_component_dirs: t.List[str] = ['components', '${IDF_PATH}/components']
+    """Dirs to find the components listed in ``depends_components``, the first match wins. Environment variables are
+    expanded."""
+
+    build_cache_toolchain_version: t.Optional[str] = None
+    """Toolchain version included in the input fingerprints of the apps. If not set, the digest of
+    ``$IDF_PATH/tools/tools.json`` is used."""
+
+    generation_cache_dir: t.Optional[str] = None
+    """Folder to cache the generated child pipeline files in, keyed by the digest of the generation inputs.
+
+    On a cache hit, the files are restored instead of generated again, like while retrying the generator job. Cache
+    the folder between pipelines to share the generated files among pipelines with the same inputs. Disabled if not
+    set.
+    """
+
+    generation_cache_filepatterns: t.List[str] = [
+        '**/CMakeLists.txt',
+        '**/sdkconfig.ci*',
+        '**/.build-test-rules.yml',
+        '**/pytest_*.py',
+        '**/test_*.py',
+        '**/conftest.py',
+        'pytest.ini',
+        '.idf_build_apps.toml',
+    ]
+    """Glob patterns of the files tracked by git that are inputs of generating the child pipeline, besides the CI
+    settings, the environment variables and the modified files."""
+
     job_name_suffix: str = ''
     """Suffix to append while generating build child pipeline job names."""
 
@@ -376,6 +506,9 @@ generate_test_child_pipeline{{ settings.gitlab.build_pipeline.job_name_suffix }}
       - "{{ path }}"
     {%- endfor %}
       - "{{ settings.gitlab.test_pipeline.yaml_filename }}"
+    {%- if settings.gitlab.test_pipeline.nodes_file_threshold %}
+      - "{{ settings.gitlab.test_pipeline.nodes_dirpath }}/"
+    {%- endif %}
   script:
     - idf-ci
       --config 'gitlab.build_pipeline.job_name_suffix="{{ settings.gitlab.build_pipeline.job_name_suffix }}"'
@@ -397,7 +530,10 @@ test-child-pipeline{{ settings.gitlab.build_pipeline.job_name_suffix }}:
     strategy: "depend"
 {%- endif %}
 """.strip()
-    """Jinja2 template for the build child pipeline YAML content."""
+    """Jinja2 template for the build child pipeline YAML content.
+
+    The jobs are streamed into the file when ``{{ jobs }}`` is output once and unfiltered.
+    """
 
     yaml_filename: str = 'build_child_pipeline.yml'
     """Filename for the build child pipeline YAML file."""
@@ -449,7 +585,7 @@ class TestPipelineSettings(BuildPipelineSettings):
     - {{ cmd }}
     {%- endfor %}
   script:
-    - eval pytest $nodes
+    - eval pytest ${nodes_file:+$(cat "$nodes_file")} $nodes
       --parallel-count ${CI_NODE_TOTAL:-1}
       --parallel-index ${CI_NODE_INDEX:-1}
       --junitxml "XUNIT_RESULT_${CI_JOB_NAME_SLUG}.xml"
@@ -460,9 +596,80 @@ class TestPipelineSettings(BuildPipelineSettings):
     job_tags: t.List[str] = []
     """Unused. tags are set by test cases."""
 
+    default_app_duration: float = Field(default=60, exclude=True)
+    """Unused. Only read by the build jobs."""
+
+    duration_filename: t.Optional[str] = Field(default=None, exclude=True)
+    """Unused. Only read by the build jobs."""
+
+    app_shards_filepath: str = Field(default='app_shards.json', exclude=True)
+    """Unused. Only read by the build jobs."""
+
+    build_cache: bool = Field(default=False, exclude=True)
+    """Unused. Only read by the build jobs."""
+
+    build_cache_component_dirs: t.List[str] = Field(default=[], exclude=True)
+    """Unused. Only read by the build jobs."""
+
+    build_cache_toolchain_version: t.Optional[str] = Field(default=None, exclude=True)
+    """Unused. Only read by the build jobs."""
+
     runs_per_job: int = 30
     """Maximum number of test cases to run in a single job."""
 
+    runner_counts: t.Dict[str, int] = {}
+    """Number of the available runners of each tag set, keyed by the comma-separated sorted tags, like
+    ``esp32,generic``.
+
+    If the runners of a test job are set, its number of parallel jobs is chosen to minimize its expected duration,
+    instead of by ``runs_per_job`` or ``job_target_duration``. The chosen numbers are written as a comment block at
+    the top of the generated YAML file.
+    """
+
+    job_startup_overhead: float = 60
+    """Expected startup overhead in seconds of each test job, when choosing the number of parallel jobs by
+    ``runner_counts``."""
+
+    duration_filepatterns: t.List[str] = []
+    """Glob patterns of the JUnit XML reports of previous test jobs.
+
+    If set, the test cases of each job are split into parallel jobs by their recorded durations, instead of by count.
+    Each parallel job runs its own list of test cases.
+    """
+
+    duration_store_filepath: str = 'test_durations.db'
+    """Path to the duration store file, created by ``idf-ci test durations ingest``.
+
+    If the file exists, the median durations of the test cases in it are used to split the test cases, instead of
+    the ones in ``duration_filepatterns``.
+    """
+
+    fail_fast_ordering: bool = True
+    """Whether to order the test cases of each job to fail fast.
+
+    Test cases failed in the most recent run come first, then the flaky ones, then the ones of the modified test
+    scripts, then the rest. Each part is ordered by ascending duration. Failures are read from
+    ``duration_store_filepath`` or ``duration_filepatterns``.
+    """
+
+    job_target_duration: float = 1800
+    """Target duration in seconds of each test job, when splitting the test cases by durations."""
+
+    default_case_duration: float = 60
+    """Duration in seconds of the test cases without recorded duration, if no test case has one."""
+
+    nodes_file_threshold: t.Optional[int] = None
+    """Maximum length of the ``nodes`` variable of a test job.
+
+    Longer node ids are written into a file under ``nodes_dirpath`` instead, referenced by the ``nodes_file``
+    variable, since GitLab limits the size of the variables. The files are kept as artifacts of the job generating
+    the test child pipeline. Disabled if not set.
+    """
+
+    nodes_dirpath: str = 'test_nodes'
+    """Path to the folder of the node id files of the test jobs. Removed while generating the test child pipeline
+    if ``nodes_file_threshold`` is set."""
+
     jobs_jinja: str = """
 {% for job in jobs %}
 {{ job['name'] }}{{ settings.gitlab.test_pipeline.job_name_suffix }}:
@@ -476,7 +683,11 @@ class TestPipelineSettings(BuildPipelineSettings):
   parallel: {{ job['parallel_count'] }}
 {%- endif %}
   variables:
+{%- if job.get('nodes_file') %}
+    nodes_file: "{{ job['nodes_file'] }}"
+{%- else %}
     nodes: {{ job['nodes'] }}
+{%- endif %}
 {% endfor %}
 """.strip()
     """Jinja2 template for test jobs configuration."""
@@ -495,11 +706,29 @@ workflow:
 
 {{ jobs }}
 """.strip()
-    """Jinja2 template for the test child pipeline YAML content."""
+    """Jinja2 template for the test child pipeline YAML content.
+
+    The jobs are streamed into the file when ``{{ jobs }}`` is output once and unfiltered.
+    """
 
     yaml_filename: str = 'test_child_pipeline.yml'
     """Filename for the test child pipeline YAML file."""
 
+    @model_validator(mode='before')
+    @classmethod
+    def reject_build_only_settings(cls, data: t.Any) -> t.Any:
+        if not isinstance(data, Mapping):
+            return data
+
+        build_only_keys = sorted(k for k in _BUILD_ONLY_PIPELINE_SETTINGS if k in data)
+        if build_only_keys:
+            raise ValueError(
+                f'Config keys {", ".join(build_only_keys)} are only used by the build child pipeline. '
+                f'Please set them under `gitlab.build_pipeline` instead.'
+            )
+
+        return data
+
 
 class GitlabSettings(BaseModel):
     project: str = 'espressif/esp-idf'
@@ -562,12 +791,27 @@ class CiSettings(BaseSettings):
     built_app_list_filepatterns: t.List[str] = ['app_info_*.txt']
     """Glob patterns for files containing built app information."""
 
+    test_impact_index_filepath: t.Optional[str] = None
+    """Path to the test impact index file, created by ``idf-ci test impact-index``.
+
+    If the file exists and the modified files are known, only the test cases requiring apps that depend on the
+    modified files are test-related. Apps of the other test cases are built as non-test-related apps.
+    """
+
     collected_test_related_apps_filepath: str = 'test_related_apps.txt'
     """Path to file containing test-related apps."""
 
     collected_non_test_related_apps_filepath: str = 'non_test_related_apps.txt'
     """Path to file containing non-test-related apps."""
 
+    compact_collected_apps: bool = False
+    """Whether to write the collected test-related and non-test-related apps in the compact format.
+
+    The compact format stores the distinct field values once, and the apps are validated only when accessed, so that
+    each parallel build job only validates the apps it builds. Files in both formats are readable either way. Files
+    ending with ``.msgpack`` are always in the compact format, and require msgpack to be installed.
+    """
+
     preserve_test_related_apps: bool = True
     """Whether to preserve test-related apps."""
 
@@ -586,6 +830,28 @@ class CiSettings(BaseSettings):
     exclude_dirs: t.List[str] = []
     """Directories to ignore when searching for apps."""
 
+    app_index_filepath: t.Optional[str] = None
+    """Path to the app index file, which stores the apps found in each search path.
+
+    Apps are searched again only in the paths modified since the index was written. The index could be shipped as an
+    artifact to the jobs of the same commit. Disabled if not set.
+    """
+
+    # test related settings
+    static_pytest_collection: bool = False
+    """Collect test cases by parsing the test scripts instead of importing them.
+
+    Test scripts that are too dynamic to be parsed are still imported. Requires Python 3.8 or later, test scripts
+    are always imported on Python 3.7.
+    """
+
+    pytest_collection_workers: int = 1
+    """Number of processes to collect test cases with.
+
+    When greater than 1, the test paths are split into shards by sub folders and collected in parallel. The collected
+    test cases are detached from the pytest sessions, so they have no ``item``.
+    """
+
     # env vars
     ci_detection_envs: t.List[str] = [
         'CI',
@@ -669,7 +935,7 @@ class CiSettings(BaseSettings):
 
         :returns: Set of compiled regex patterns
         """
-        return {re.compile(regex) for regex in self.component_mapping_regexes + self.extend_component_mapping_regexes}
+        return set(compile_regexes(tuple(self.component_mapping_regexes + self.extend_component_mapping_regexes)))
 
     @property
     def all_component_mapping_exclude_regexes(self) -> t.Set[re.Pattern]:
@@ -677,7 +943,7 @@ class CiSettings(BaseSettings):
 
         :returns: Set of compiled regex patterns
         """
-        return {re.compile(regex) for regex in self.component_mapping_exclude_regexes}
+        return set(compile_regexes(tuple(self.component_mapping_exclude_regexes)))
 
     @property
     def all_component_target_regexes(self) -> t.Set[re.Pattern]:
@@ -685,7 +951,21 @@ class CiSettings(BaseSettings):
 
         :returns: Set of compiled regex patterns
         """
-        return {re.compile(regex) for regex in self.component_target_regexes + self.extend_component_target_regexes}
+        return set(compile_regexes(tuple(self.component_target_regexes + self.extend_component_target_regexes)))
+
+    @property
+    def component_mapper(self) -> ComponentMapper:
+        """Get the compiled component mapping settings.
+
+        Built once for the same component mapping settings.
+
+        :returns: Component mapper
+        """
+        return get_component_mapper(
+            tuple(self.component_mapping_regexes + self.extend_component_mapping_regexes),
+            tuple(self.component_mapping_exclude_regexes),
+            tuple(self.component_ignored_file_extensions + self.extend_component_ignored_file_extensions),
+        )
 
     def get_modified_components(self, modified_files: t.Iterable[str]) -> t.Set[str]:
         """Get the set of components that have been modified based on the provided files.
@@ -694,40 +974,17 @@ class CiSettings(BaseSettings):
 
         :returns: Set of component names that have been modified
         """
-        modified_components = set()
-
-        for modified_file in modified_files:
-            file_path = Path(modified_file)
-            if (
-                file_path.suffix
-                in self.component_ignored_file_extensions + self.extend_component_ignored_file_extensions
-            ):
-                continue
-
-            # always use absolute path as posix string
-            # Path.resolve return relative path when file does not exist. so use os.path.abspath
-            abs_path = Path(os.path.abspath(modified_file)).as_posix()
-
-            for regex in self.all_component_mapping_regexes:
-                match = regex.search(abs_path)
-                if match:
-                    for exclude_regex in self.all_component_mapping_exclude_regexes:
-                        if exclude_regex.search(abs_path):
-                            logger.debug(f'Excluding {abs_path} from component mapping')
-                            break
-                    else:
-                        modified_components.add(match.group(1))
-                        break
-
-        return modified_components
+        return self.component_mapper.get_modified_components(modified_files)
 
     @classmethod
-    def read_apps_from_files(cls, filepaths: t.Sequence[PathLike]) -> t.Optional[t.List[App]]:
+    def read_apps_from_files(cls, filepaths: t.Sequence[PathLike]) -> t.Optional[t.Sequence['App']]:
         """Helper method to read apps from files.
 
+        A single file in the compact format is read lazily, the apps are validated when accessed.
+
         :param filepaths: List of file paths to read
 
-        :returns: List of App objects read from the files, or None if no files found
+        :returns: Sequence of App objects read from the files, or None if no files found
         """
         valid_filepaths = []
         for filepath in filepaths:
@@ -739,10 +996,25 @@ class CiSettings(BaseSettings):
         if not valid_filepaths:
             return None
 
-        return json_list_files_to_apps(valid_filepaths)
+        from idf_build_apps import json_list_files_to_apps
+
+        from .app_list import LazyAppList, is_compact_app_list
+
+        compact = [is_compact_app_list(filepath) for filepath in valid_filepaths]
+        if not any(compact):
+            return json_list_files_to_apps(valid_filepaths)
+
+        if len(valid_filepaths) == 1:
+            return LazyAppList.from_file(valid_filepaths[0])
+
+        apps: t.List[App] = []
+        for filepath, is_compact in zip(valid_filepaths, compact):
+            apps.extend(LazyAppList.from_file(filepath) if is_compact else json_list_files_to_apps([filepath]))
+
+        return apps
 
     @classmethod
-    def read_apps_from_filepatterns(cls, patterns: t.List[str]) -> t.Optional[t.List[App]]:
+    def read_apps_from_filepatterns(cls, patterns: t.List[str]) -> t.Optional[t.List['App']]:
         """Helper method to read apps from files matching given patterns.
 
         :param patterns: List of file patterns to search for
@@ -757,6 +1029,8 @@ class CiSettings(BaseSettings):
             logger.debug(f'No files found for patterns: {patterns}')
             return None
 
+        from idf_build_apps import json_list_files_to_apps
+
         apps = json_list_files_to_apps(found_files)
 
         if not apps:
@@ -764,7 +1038,7 @@ class CiSettings(BaseSettings):
 
         return apps
 
-    def get_built_apps_list(self) -> t.Optional[t.List[App]]:
+    def get_built_apps_list(self) -> t.Optional[t.List['App']]:
         """Get the list of successfully built applications from the app info files.
 
         :returns: List of App objects representing successfully built applications, or
@@ -776,18 +1050,33 @@ class CiSettings(BaseSettings):
         if apps is None:
             return None
 
+        from idf_build_apps.constants import BuildStatus
+
         # Filter for successful builds
         built_apps = [app for app in apps if app.build_status == BuildStatus.SUCCESS]
 
         return built_apps
 
 
-_ci_settings_context: ContextVar['CiSettings'] = ContextVar('ci_settings', default=CiSettings())
+_ci_settings_context: ContextVar[t.Optional['CiSettings']] = ContextVar('ci_settings', default=None)
+_default_ci_settings: t.Optional['CiSettings'] = None
 
 
 def get_ci_settings() -> 'CiSettings':
-    """Get the current CiSettings instance from the context."""
-    return _ci_settings_context.get()
+    """Get the current CiSettings instance from the context.
+
+    The default instance is created on the first call, instead of when importing this module.
+    """
+    global _default_ci_settings
+
+    settings = _ci_settings_context.get()
+    if settings is not None:
+        return settings
+
+    if _default_ci_settings is None:
+        _default_ci_settings = CiSettings()
+
+    return _default_ci_settings
 
 
 def _refresh_ci_settings(
@@ -1,14 +1,20 @@
 # SPDX-FileCopyrightText: 2025-2026 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
+import heapq
 import logging
+import os
 import subprocess
+import sys
 import typing as t
+from functools import lru_cache
 from pathlib import Path
 
-from idf_build_apps.log import get_rich_log_handler
+from ._compat import PathLike
 
 _T = t.TypeVar('_T')
 
+PATH_CACHE_SIZE = 65536
+
 
 @t.overload
 def to_list(s: None) -> None: ...
@@ -49,6 +55,8 @@ def setup_logging(level: t.Optional[int] = logging.INFO) -> None:
 
     :param level: logging level
     """
+    from idf_build_apps.log import get_rich_log_handler
+
     if level is None:
         level = logging.INFO
 
@@ -62,6 +70,77 @@ def setup_logging(level: t.Optional[int] = logging.INFO) -> None:
     package_logger.propagate = False
 
 
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _canonical_path(path: str, cwd: str) -> str:
+    res = os.path.normpath(os.path.join(cwd, path))
+    if os.sep != '/':
+        res = res.replace(os.sep, '/')
+    return sys.intern(res)
+
+
+def canonical_path(path: PathLike) -> str:
+    """Get the canonical key of a path, the absolute normalized POSIX path.
+
+    Same as ``Path(os.path.abspath(path)).as_posix()``, without touching the file system. Results are cached and
+    interned, since the same paths are normalized again and again while matching apps, test cases and modified files.
+
+    :param path: File or folder path, relative to the current working directory
+
+    :returns: Absolute POSIX path
+    """
+    path = os.fspath(path)
+    # relative paths are cached per working directory
+    return _canonical_path(path, '' if os.path.isabs(path) else os.getcwd())
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _project_relative_path(path: str, project_root: str) -> str:
+    if path == project_root:
+        return '.'
+    if path.startswith(project_root.rstrip('/') + '/'):
+        return sys.intern(path[len(project_root.rstrip('/')) + 1 :])
+    return path
+
+
+def project_relative_path(path: PathLike, project_root: PathLike) -> str:
+    """Get the canonical key of a path relative to the project root.
+
+    :param path: File or folder path, relative to the current working directory
+    :param project_root: Project root folder
+
+    :returns: POSIX path relative to the project root, or the absolute one if it's outside the project root
+    """
+    return _project_relative_path(canonical_path(path), canonical_path(project_root))
+
+
+def lpt_partition(
+    costs: t.Sequence[float],
+    bin_count: int,
+    *,
+    max_items_per_bin: t.Optional[int] = None,
+) -> t.List[t.List[int]]:
+    """Partition the items into bins of similar total costs, with the longest-processing-time-first heuristic.
+
+    The most costly items are assigned first, each to the bin with the least total cost that is not full yet.
+
+    :param costs: Costs of the items
+    :param bin_count: Number of bins
+    :param max_items_per_bin: Maximum number of items in each bin. Unlimited if not provided
+
+    :returns: Indices of the items in each bin, in ascending order
+    """
+    bins: t.List[t.List[int]] = [[] for _ in range(bin_count)]
+    # (total cost, bin index) of the bins that are not full
+    heap = [(0.0, i) for i in range(bin_count)]
+    for i in sorted(range(len(costs)), key=lambda _i: -costs[_i]):
+        total, bin_index = heapq.heappop(heap)
+        bins[bin_index].append(i)
+        if max_items_per_bin is None or len(bins[bin_index]) < max_items_per_bin:
+            heapq.heappush(heap, (total + costs[i], bin_index))
+
+    return [sorted(b) for b in bins]
+
+
 def remove_subfolders(paths: t.List[str]) -> t.List[Path]:
     """Remove paths that are subfolders of other paths in the list.
 
@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Micro-benchmark of reading the collected apps in a parallel build job.
+
+Compares reading all the apps from the default app list file, one JSON app per line, with selecting the apps of one
+parallel job from the compact app list file.
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_app_list.py --apps 20000 --parallel-count 300
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import typing as t
+
+from idf_build_apps import App, CMakeApp, json_list_files_to_apps
+from idf_build_apps.utils import get_parallel_start_stop
+
+from idf_ci.app_list import LazyAppList, dump_compact_apps
+
+TARGETS = ['esp32', 'esp32s2', 'esp32c3', 'esp32s3', 'esp32c6', 'esp32h2']
+CONFIGS = ['default', 'psram', 'release', 'flash', 'ota']
+
+
+def generate(app_count: int) -> t.List[App]:
+    per_dir = len(TARGETS) * len(CONFIGS)
+    return [
+        CMakeApp(
+            f'/bench/app_{i // per_dir}',
+            TARGETS[i % len(TARGETS)],
+            config_name=CONFIGS[(i // len(TARGETS)) % len(CONFIGS)],
+        )
+        for i in range(app_count)
+    ]
+
+
+def read_default(filepath: str, start: int, stop: int) -> t.List[App]:
+    return json_list_files_to_apps([filepath])[start - 1 : stop]
+
+
+def read_compact(filepath: str, start: int, stop: int) -> t.List[App]:
+    return LazyAppList.from_file(filepath)[start - 1 : stop]
+
+
+def timeit(func, *args) -> t.Tuple[float, t.Any]:
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    res = func(*args)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed, res
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--apps', type=int, default=20_000)
+    parser.add_argument('--parallel-count', type=int, default=300)
+    args = parser.parse_args()
+
+    apps = generate(args.apps)
+    start, stop = get_parallel_start_stop(len(apps), args.parallel_count, 1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        default_filepath = os.path.join(tmp_dir, 'apps.txt')
+        with open(default_filepath, 'w') as fw:
+            for app in apps:
+                fw.write(app.model_dump_json() + '\n')
+
+        compact_filepath = os.path.join(tmp_dir, 'apps_compact.txt')
+        dump_compact_apps(apps, compact_filepath)
+
+        default, expected = timeit(read_default, default_filepath, start, stop)
+        compact, res = timeit(read_compact, compact_filepath, start, stop)
+        assert res == expected
+
+        print(f'{args.apps} apps, {len(res)} apps per parallel job')
+        print(f'default: {default:.3f}s, {os.path.getsize(default_filepath)} bytes')
+        print(f'compact: {compact:.3f}s ({default / compact:.1f}x), {os.path.getsize(compact_filepath)} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Micro-benchmark of the marker related PytestCase properties.
+
+Runs ``IdfPytestPlugin.pytest_collection_modifyitems`` and groups the cases afterwards, over synthetic items, with
+and without the per-case cache.
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_case_markers.py --items 50000
+"""
+
+import argparse
+import gc
+import time
+import typing as t
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from idf_ci.idf_pytest.models import GroupedPytestCases, PytestCase
+from idf_ci.idf_pytest.plugin import IDF_CI_PYTEST_CASE_KEY, IdfPytestPlugin
+
+TARGETS = ['esp32', 'esp32s2', 'esp32c3', 'esp32s3', 'esp32c6', 'esp32h2', 'esp32p4', 'linux']
+ENV_MARKERS = ['generic', 'flash_encryption', 'ethernet', 'wifi_ap', 'usb_device']
+
+
+class FakeNode:
+    def __init__(self, parent: t.Optional['FakeNode'], own_markers: t.List[t.Any]) -> None:
+        self.parent = parent
+        self.own_markers = own_markers
+
+    # same as `_pytest.nodes.Node`
+    def listchain(self) -> t.List['FakeNode']:
+        chain = []
+        node: t.Optional[FakeNode] = self
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        chain.reverse()
+        return chain
+
+    def iter_markers(self) -> t.Iterator[t.Any]:
+        for node in reversed(self.listchain()):
+            yield from node.own_markers
+
+
+SESSION = FakeNode(None, [])
+DIRS = [FakeNode(FakeNode(SESSION, []), []) for _ in range(10)]
+MODULES: t.Dict[int, FakeNode] = {}
+
+
+class FakeItem(FakeNode):
+    def __init__(self, index: int) -> None:
+        target = TARGETS[index % len(TARGETS)]
+        self.originalname = f'test_case_{index}'
+        self.name = f'{self.originalname}[{target}]'
+        self.path = Path(f'/bench/test_module_{index // 100}.py')
+        self.nodeid = f'{self.path.name}::{self.name}'
+        self.callspec = SimpleNamespace(params={'target': target, 'config': 'default'})
+        self.stash = pytest.Stash()
+        self.own_markers = [
+            pytest.mark.parametrize('target', [target], indirect=True).mark,
+            getattr(pytest.mark, ENV_MARKERS[index % len(ENV_MARKERS)]).mark,
+        ]
+        if index % 7 == 0:
+            self.own_markers.append(pytest.mark.qemu.mark)
+
+        module_index = index // 100
+        if module_index not in MODULES:
+            MODULES[module_index] = FakeNode(
+                DIRS[module_index % len(DIRS)], [pytest.mark.timeout(300).mark, pytest.mark.flaky(reruns=2).mark]
+            )
+        self.parent = MODULES[module_index]
+
+    def add_marker(self, marker: pytest.MarkDecorator) -> None:
+        self.own_markers.append(marker.mark)
+
+
+def run(count: int) -> float:
+    items = [FakeItem(i) for i in range(count)]
+    config = SimpleNamespace(hook=SimpleNamespace(pytest_deselected=lambda items: None))  # noqa: ARG005
+
+    plugin = IdfPytestPlugin(cli_target='all')
+    plugin.apps = None
+
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+
+    hook = plugin.pytest_collection_modifyitems(config, items)  # type: ignore[arg-type]
+    next(hook)
+    with pytest.raises(StopIteration):
+        hook.send(None)
+
+    cases = [item.stash[IDF_CI_PYTEST_CASE_KEY] for item in items]
+    GroupedPytestCases([c for c in cases if c]).output_as_string()
+
+    elapsed = time.perf_counter() - start
+    gc.enable()
+
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=50_000)
+    args = parser.parse_args()
+
+    PytestCase.KNOWN_ENV_MARKERS = set(ENV_MARKERS)
+
+    cached = run(args.items)
+    with mock.patch.object(PytestCase, '_markers_cache', lambda self: {}):  # noqa: ARG005
+        uncached = run(args.items)
+
+    print(f'{args.items} items')
+    print(f'uncached: {uncached:.3f}s')
+    print(f'cached:   {cached:.3f}s ({uncached / cached:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Micro-benchmark of splitting the found apps into test-related and non-test-related ones.
+
+Compares ``idf_ci.scripts._classify_apps`` with the previous implementation over synthetic apps and cases.
+
+.. code-block:: bash
+
+    IDF_PATH=/path/to/esp-idf python tests/benchmarks/bench_classify_apps.py --apps 30000 --cases 10000
+"""
+
+import argparse
+import gc
+import os
+import time
+import typing as t
+from collections import defaultdict
+from types import SimpleNamespace
+
+from idf_build_apps import App, CMakeApp
+from idf_build_apps.constants import BuildStatus
+
+from idf_ci.idf_pytest.models import PytestApp
+from idf_ci.scripts import _classify_apps
+
+TARGETS = ['esp32', 'esp32s2', 'esp32c3', 'esp32s3', 'esp32c6', 'esp32h2']
+CONFIGS = ['default', 'psram', 'release', 'flash', 'ota']
+
+
+def classify_apps_legacy(apps, cases, modified_cases):
+    def get_app_dict(_cases):
+        app_dict = defaultdict(list)
+        for _case in _cases:
+            for _case_app in _case.apps:
+                app_dict[(_case_app.path, _case_app.target, _case_app.config)].append(_case)
+        return app_dict
+
+    pytest_dict = get_app_dict(cases)
+    modified_pytest_dict = get_app_dict(modified_cases)
+
+    modified_test_apps = set()
+    test_apps = set()
+    non_test_apps = set()
+
+    app_map = {(os.path.abspath(app.app_dir), app.target, app.config_name or 'default'): app for app in apps}
+
+    def _get_case_apps(_case):
+        _apps = set()
+        for _app in _case.apps:
+            _app_key = (os.path.abspath(_app.path), _app.target, _app.config)
+            if _app_key in app_map:
+                _apps.add(app_map[_app_key])
+        return _apps
+
+    for app in apps:
+        app_key = (os.path.abspath(app.app_dir), app.target, app.config_name or 'default')
+        _modified_cases = modified_pytest_dict.get(app_key)
+        if _modified_cases:
+            for case in _modified_cases:
+                modified_test_apps.update(_get_case_apps(case))
+            continue
+
+        if app.build_status == BuildStatus.SKIPPED:
+            continue
+
+        _pytest_cases = pytest_dict.get(app_key)
+        if _pytest_cases:
+            for case in _pytest_cases:
+                test_apps.update(_get_case_apps(case))
+        else:
+            non_test_apps.add(app)
+
+    test_apps = test_apps - modified_test_apps
+    non_test_apps = non_test_apps - modified_test_apps - test_apps
+
+    return modified_test_apps, test_apps, non_test_apps
+
+
+def generate(app_count: int, case_count: int) -> t.Tuple[t.List[App], t.List[t.Any], t.List[t.Any]]:
+    per_dir = len(TARGETS) * len(CONFIGS)
+    apps: t.List[App] = []
+    for i in range(app_count):
+        app: App = CMakeApp(
+            f'/bench/app_{i // per_dir}',
+            TARGETS[i % len(TARGETS)],
+            config_name=CONFIGS[(i // len(TARGETS)) % len(CONFIGS)],
+        )
+        if i % 11 == 0:
+            app.build_status = BuildStatus.SKIPPED
+        apps.append(app)
+
+    # cases of the same test function are parametrized by target, each app is required by several cases
+    cases = []
+    for i in range(case_count):
+        app = apps[(i * 7) % (app_count // 2)]
+        case_apps = [PytestApp(app.app_dir, app.target, app.config_name or 'default')]
+        if i % 5 == 0:
+            # multi-dut
+            other = apps[(i * 7 + len(TARGETS)) % (app_count // 2)]
+            case_apps.append(PytestApp(other.app_dir, other.target, other.config_name or 'default'))
+        cases.append(SimpleNamespace(apps=case_apps))
+
+    return apps, cases, cases[::50]
+
+
+def timeit(func, *args) -> t.Tuple[float, t.Any]:
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    res = func(*args)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed, res
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--apps', type=int, default=30_000)
+    parser.add_argument('--cases', type=int, default=10_000)
+    args = parser.parse_args()
+
+    apps, cases, modified_cases = generate(args.apps, args.cases)
+
+    legacy, expected = timeit(classify_apps_legacy, apps, cases, modified_cases)
+    indexed, res = timeit(_classify_apps, apps, cases, modified_cases)
+    assert tuple(set(_apps) for _apps in res) == expected
+
+    print(f'{args.apps} apps, {args.cases} cases')
+    print(f'legacy:  {legacy:.3f}s')
+    print(f'indexed: {indexed:.3f}s ({legacy / indexed:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
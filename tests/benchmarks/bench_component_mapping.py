@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+"""Micro-benchmark of mapping modified files to components.
+
+Compares ``CiSettings.get_modified_components`` with the previous implementation over a synthetic change list.
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_component_mapping.py --files 50000
+"""
+
+import argparse
+import gc
+import re
+import time
+import typing as t
+from pathlib import Path
+
+from idf_ci.settings import CiSettings
+from idf_ci.utils import canonical_path
+
+COMPONENTS = ['esp_wifi', 'bt', 'esp_system', 'driver', 'freertos', 'lwip', 'esp_hw_support', 'nvs_flash']
+EXTENSIONS = ['.c', '.h', '.md', '.py', '.cmake', '.yml', '.txt', '.S']
+
+
+def get_modified_components_legacy(settings: CiSettings, modified_files: t.Iterable[str]) -> t.Set[str]:
+    modified_components = set()
+
+    for modified_file in modified_files:
+        file_path = Path(modified_file)
+        if (
+            file_path.suffix
+            in settings.component_ignored_file_extensions + settings.extend_component_ignored_file_extensions
+        ):
+            continue
+
+        abs_path = canonical_path(modified_file)
+
+        # the regexes were compiled on each access of the properties
+        for regex in {
+            re.compile(r) for r in settings.component_mapping_regexes + settings.extend_component_mapping_regexes
+        }:
+            match = regex.search(abs_path)
+            if match:
+                for exclude_regex in {re.compile(r) for r in settings.component_mapping_exclude_regexes}:
+                    if exclude_regex.search(abs_path):
+                        break
+                else:
+                    modified_components.add(match.group(1))
+                    break
+
+    return modified_components
+
+
+def generate(file_count: int) -> t.List[str]:
+    files = []
+    for i in range(file_count):
+        ext = EXTENSIONS[i % len(EXTENSIONS)]
+        if i % 10 == 0:
+            files.append(f'examples/peripherals/example_{i}/main/main{ext}')
+        elif i % 10 == 1:
+            files.append(f'components/{COMPONENTS[i % len(COMPONENTS)]}/test_apps/app_{i}/main/test{ext}')
+        elif i % 10 == 2:
+            files.append(f'common_components/common_{i % 50}/src/file_{i}{ext}')
+        else:
+            files.append(f'components/{COMPONENTS[i % len(COMPONENTS)]}_{i % 300}/src/sub_{i % 7}/file_{i}{ext}')
+    return files
+
+
+def timeit(func, *args) -> t.Tuple[float, t.Any]:
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    res = func(*args)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed, res
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=50_000)
+    args = parser.parse_args()
+
+    settings = CiSettings()
+    files = generate(args.files)
+
+    legacy, expected = timeit(get_modified_components_legacy, settings, files)
+    compiled, res = timeit(settings.get_modified_components, files)
+    assert res == expected
+
+    print(f'{args.files} files, {len(res)} components')
+    print(f'legacy:   {legacy:.3f}s')
+    print(f'compiled: {compiled:.3f}s ({legacy / compiled:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+import json
+
+import pytest
+from idf_build_apps import CMakeApp
+from idf_build_apps.constants import BuildStatus
+
+from idf_ci import CiSettings
+from idf_ci.app_durations import dump_app_shards, get_app_key, select_app_shard
+from idf_ci.app_list import LazyAppList, dump_compact_apps
+from idf_ci.idf_gitlab.pipeline import dump_apps_to_txt
+from idf_ci.settings import _refresh_ci_settings
+
+
+def _apps():
+    return sorted(
+        CMakeApp(app_dir=app_dir, target=target, config_name=config_name)
+        for app_dir in ['foo', 'bar']
+        for target in ['esp32', 'esp32s2']
+        for config_name in ['default', 'psram']
+    )
+
+
+def test_compact_app_list(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _refresh_ci_settings(config_overrides={'compact_collected_apps': True})
+
+    apps = _apps()
+    apps[0].build_status = BuildStatus.SHOULD_BE_BUILT
+    dump_apps_to_txt(apps, 'apps.txt')
+
+    with open('apps.txt') as fr:
+        data = json.load(fr)
+    # shared values are stored once
+    assert data['values'].count('esp32s2') == 1
+
+    lazy_apps = CiSettings.read_apps_from_files(['apps.txt'])
+    assert isinstance(lazy_apps, LazyAppList)
+    assert lazy_apps.keys() == [get_app_key(app) for app in apps]
+    assert len(lazy_apps._apps) == 0
+
+    assert list(lazy_apps) == apps
+    assert lazy_apps[0].build_status == BuildStatus.SHOULD_BE_BUILT
+    assert lazy_apps[-1] is lazy_apps[len(apps) - 1]
+
+    lazy_apps.preserve = False
+    assert all(app.preserve is False for app in lazy_apps)
+
+    # mixed with the default format
+    with open('more_apps.txt', 'w') as fw:
+        fw.write(apps[0].model_dump_json() + '\n')
+    assert CiSettings.read_apps_from_files(['apps.txt', 'more_apps.txt']) == [*apps, apps[0]]
+
+
+def test_select_app_shard_lazily(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    apps = _apps()
+    dump_compact_apps(apps, 'apps.txt')
+    dump_app_shards({'test_related': [apps[:2], apps[2:]]}, 'app_shards.json')
+
+    lazy_apps = LazyAppList.from_file('apps.txt')
+    assert select_app_shard(lazy_apps, 'app_shards.json', 'test_related', 2, 1) == apps[:2]
+    # only the apps of the shard are validated
+    assert sorted(lazy_apps._apps) == [0, 1]
+
+
+def test_compact_app_list_msgpack(tmp_path, monkeypatch):
+    pytest.importorskip('msgpack')
+    monkeypatch.chdir(tmp_path)
+    _refresh_ci_settings()
+
+    apps = _apps()
+    dump_apps_to_txt(apps, 'apps.msgpack')
+    assert list(CiSettings.read_apps_from_files(['apps.msgpack']) or []) == apps
@@ -3,11 +3,21 @@
 
 import os
 import textwrap
+import typing as t
 from pathlib import Path
 
 import pytest
 from conftest import create_project
-
+from idf_build_apps import App
+from idf_build_apps.constants import BuildStatus
+
+from idf_ci.app_durations import (
+    dump_app_shards,
+    dump_build_durations,
+    load_build_durations,
+    select_app_shard,
+    shard_apps_by_duration,
+)
 from idf_ci.scripts import build
 
 
@@ -130,3 +140,68 @@ class TestBuild:
 
         # Should build only non-test-related apps (none for esp32 since foo and bar are test-related)
         assert len(built_apps) == 0
+
+
+def _built_app(app_dir: str, target: str) -> App:
+    return App(app_dir, target, config_name='default', build_dir='build_@t_@w', build_status=BuildStatus.SUCCESS)
+
+
+def _write_junitxml(filepath: str, durations: t.Dict[App, float]) -> None:
+    # same as the report of idf-build-apps, test cases are named by the build paths
+    testcases = ''.join(f'<testcase name="{app.build_path}" time="{d}" />' for app, d in durations.items())
+    Path(filepath).write_text(f'<testsuites><testsuite name="build">{testcases}</testsuite></testsuites>')
+
+
+def test_build_durations(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    apps = [_built_app('foo', 'esp32'), _built_app('foo', 'esp32s2'), App('bar', 'esp32'), _built_app('baz', 'esp32')]
+    _write_junitxml('build_summary_1.xml', {apps[0]: 100, apps[1]: 10, apps[2]: 5})
+    dump_build_durations(apps, 'build_summary_1.xml', 'build_durations_1.txt')
+
+    app = _built_app('foo', 'esp32')
+    _write_junitxml('build_summary_2.xml', {app: 200})
+    dump_build_durations([app], 'build_summary_2.xml', 'build_durations_2.txt')
+
+    # the build stopped before writing the report
+    dump_build_durations([app], 'build_summary_3.xml', 'build_durations_3.txt')
+
+    assert load_build_durations(['build_durations_*.txt']) == {
+        ('foo', 'esp32', 'default'): 150,
+        ('foo', 'esp32s2', 'default'): 10,
+    }
+
+
+def test_app_shards(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    apps = [App(f'app_{i}', 'esp32', config_name='default') for i in range(5)]
+    durations = {
+        ('app_0', 'esp32', 'default'): 100,
+        ('app_1', 'esp32', 'default'): 10,
+        ('app_2', 'esp32', 'default'): 10,
+        ('app_3', 'esp32', 'default'): 50,
+    }
+    # app_4 counted as the median duration, 30
+    shards = shard_apps_by_duration(apps, durations, 2)
+    assert [[app.app_dir for app in shard] for shard in shards] == [['app_0'], ['app_1', 'app_2', 'app_3', 'app_4']]
+
+    dump_app_shards({'test_related': shards}, 'app_shards.json')
+
+    # new app not recorded while generating the pipeline
+    apps.append(App('app_5', 'esp32', config_name='default'))
+    assert [app.app_dir for app in select_app_shard(apps, 'app_shards.json', 'test_related', 2, 1)] == [
+        'app_0',
+        'app_5',
+    ]
+    assert [app.app_dir for app in select_app_shard(apps, 'app_shards.json', 'test_related', 2, 2)] == [
+        'app_1',
+        'app_2',
+        'app_3',
+        'app_4',
+    ]
+
+    # parallel count changed, or not recorded
+    assert select_app_shard(apps, 'app_shards.json', 'test_related', 3, 1) is None
+    assert select_app_shard(apps, 'app_shards.json', 'non_test_related', 2, 1) is None
+    assert select_app_shard(apps, 'missing.json', 'test_related', 2, 1) is None
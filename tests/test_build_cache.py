@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+import subprocess
+
+import pytest
+from idf_build_apps import App
+from idf_build_apps.constants import BuildStatus
+
+from idf_ci.build_cache import AppFingerprinter, record_cached_builds, restore_cached_builds
+from idf_ci.idf_gitlab.api import ArtifactManager
+from idf_ci.settings import _refresh_ci_settings
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for f in ['app/main/main.c', 'app/sdkconfig.defaults', 'components/foo/foo.c', 'components/bar/bar.c']:
+        (tmp_path / f).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / f).write_text(f)
+
+    subprocess.run(['git', 'init', '-q'], check=True)
+    subprocess.run(['git', 'add', '.'], check=True)
+
+    depends_components = {'app': ['foo']}
+    monkeypatch.setattr(App, 'depends_components', property(lambda self: depends_components.get(self.app_dir, [])))
+    return tmp_path
+
+
+def _fingerprint(app_dir='app', target='esp32', toolchain_version='1.0'):
+    return AppFingerprinter(['components'], toolchain_version).fingerprint(App(app_dir, target))
+
+
+def test_app_fingerprint(project):
+    fingerprint = _fingerprint()
+    assert fingerprint is not None
+
+    # untracked files, and files of other components
+    (project / 'app' / 'build').mkdir()
+    (project / 'app' / 'build' / 'app.bin').write_text('bin')
+    (project / 'components' / 'bar' / 'bar.c').write_text('modified')
+    assert _fingerprint() == fingerprint
+
+    assert _fingerprint(target='esp32s2') != fingerprint
+    assert _fingerprint(toolchain_version='2.0') != fingerprint
+
+    (project / 'app' / 'sdkconfig.defaults').write_text('CONFIG_FOO=y\n')
+    assert _fingerprint() != fingerprint
+    fingerprint = _fingerprint()
+
+    (project / 'components' / 'foo' / 'foo.c').write_text('modified')
+    assert _fingerprint() != fingerprint
+
+    # may depend on any component
+    assert _fingerprint(app_dir='components/bar') is None
+
+
+@pytest.mark.usefixtures('project')
+def test_restore_cached_builds(monkeypatch):
+    _refresh_ci_settings(config_overrides={'gitlab': {'build_pipeline': {'build_cache_toolchain_version': '1.0'}}})
+
+    apps = [App('app', 'esp32'), App('app', 'esp32s2'), App('components/bar', 'esp32')]
+    fingerprint = _fingerprint()
+
+    monkeypatch.setattr(
+        ArtifactManager,
+        'get_build_cache_entries',
+        lambda _self, _fingerprints: {fingerprint: {'commit_sha': 'abc', 'build_dir': 'app/build'}},
+    )
+    downloaded = []
+    monkeypatch.setattr(
+        ArtifactManager,
+        'download_artifacts',
+        lambda _self, *, commit_sha, build_dir: downloaded.append((commit_sha, build_dir)) or 2,
+    )
+
+    fingerprints = restore_cached_builds(apps)
+    assert downloaded == [('abc', apps[0].build_path)]
+    assert apps[0].build_status == BuildStatus.SUCCESS
+    assert apps[1].build_status == BuildStatus.UNKNOWN
+    # the app without depends_components is never reused
+    assert list(fingerprints) == [1]
+
+    recorded = {}
+    monkeypatch.setattr(
+        ArtifactManager,
+        'put_build_cache_entries',
+        lambda _self, build_dirs: recorded.update(build_dirs),
+    )
+    apps[1].build_status = BuildStatus.SUCCESS
+    record_cached_builds(apps, fingerprints)
+    assert recorded == {fingerprints[1]: 'app/build'}
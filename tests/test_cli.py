@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+import subprocess
+import sys
 from pathlib import Path
 
 import pytest
@@ -130,3 +132,29 @@ class TestConfig:
         result = runner.invoke(click_cli, ['--config', ' = 1', 'completions'])
         assert result.exit_code != 0
         assert 'Empty key in --config assignment' in result.output
+
+
+# modules that take the most time to import
+HEAVY_MODULES = {'gitlab', 'idf_build_apps', 'jinja2', 'minio', 'pytest', 'pytest_embedded', 'requests', 'yaml'}
+
+
+def _imported_modules(code: str):
+    res = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True)
+    # `import time: self [us] | cumulative | imported package`
+    return {line.rsplit('|', 1)[-1].strip() for line in res.stderr.splitlines() if line.startswith('import time:')}
+
+
+@pytest.mark.parametrize(
+    'code, allowed',
+    [
+        ('import idf_ci.cli', set()),
+        # idf-build-apps provides the log handler
+        (
+            "from idf_ci.cli import click_cli; click_cli(['config', 'show', 'gitlab.project'])",
+            {'idf_build_apps', 'yaml'},
+        ),
+        ("from idf_ci.cli import click_cli; click_cli(['gitlab', 'pipeline-variables'])", {'idf_build_apps', 'yaml'}),
+    ],
+)
+def test_cli_import_budget(code, allowed):
+    assert _imported_modules(code) & (HEAVY_MODULES - allowed) == set()
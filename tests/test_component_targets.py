@@ -187,6 +187,21 @@ def test_extract_targets_uses_configured_regexes(monkeypatch):
     assert ct.extract_targets('components/foo/esp32/main.c') == set()
 
 
+def test_extract_targets_cached_per_folder(monkeypatch):
+    _patch_settings(monkeypatch, component_target_regexes=[r'(?<![a-z0-9])(esp32|esp32s2)(?![a-z0-9])'])
+
+    assert ct.extract_targets('components/foo/esp32_esp32s2') == {'esp32', 'esp32s2'}
+    hits = ct._extract_targets.cache_info().hits
+
+    # another file list with the same folder
+    ct.component_targets_from_files(('components/foo/esp32_esp32s2/a.c',))
+    ct.component_targets_from_files(('components/foo/esp32_esp32s2/b.c', 'components/foo/esp32_esp32s2/c.c'))
+    assert ct._extract_targets.cache_info().hits == hits + 2
+
+    _patch_settings(monkeypatch, component_target_regexes=[r'(esp32s2)'])
+    assert ct.extract_targets('components/foo/esp32_esp32s2') == {'esp32s2'}
+
+
 def test_combined_targets_for_components_only_uses_requested_components():
     modified_files = (
         'components/foo/esp32/main.c',
@@ -233,3 +248,25 @@ def test_combined_targets_for_components_only_uses_requested_components():
 )
 def test_should_skip_build_for_components(modified_files, check_components, current_target, expected):
     assert ct.should_skip_build_for_components(modified_files, check_components, current_target) is expected
+
+
+def test_should_skip_builds_for_components():
+    modified_files = (
+        'components/foo/esp32/main.c',
+        'components/bar/esp32s2/main.c',
+        'components/baz/Kconfig',
+    )
+    checks = [
+        (['foo'], 'esp32'),
+        (['foo'], 'esp32s2'),
+        (['bar', 'foo'], 'esp32s2'),
+        (['foo', 'bar'], 'esp32c3'),
+        (['baz'], 'esp32c3'),
+        (['missing'], 'esp32c3'),
+        ([], 'esp32c3'),
+        (None, 'esp32c3'),
+    ]
+
+    assert ct.should_skip_builds_for_components(modified_files, checks) == [
+        ct.should_skip_build_for_components(modified_files, components or [], target) for components, target in checks
+    ]
@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+from idf_ci.cli import click_cli
+from idf_ci.idf_pytest import durations
+from idf_ci.idf_pytest.durations import CaseDurationStats, DurationStore
+
+
+def _write_junit(filepath, *testcases: str) -> None:
+    filepath.write_text('<testsuites><testsuite name="pytest">' + ''.join(testcases) + '</testsuite></testsuites>')
+
+
+def test_duration_store(tmp_path):
+    for i in range(1, 5):
+        _write_junit(
+            tmp_path / f'XUNIT_RESULT_{i}.xml',
+            f'<testcase name="esp32.default.test_foo" time="{i * 10}" />',
+            f'<testcase name="esp32.default.test_bar" time="1">{"<failure />" if i == 2 else ""}</testcase>',
+            '<testcase name="esp32.default.test_baz" time="2"><error /></testcase>',
+        )
+
+    with DurationStore(tmp_path / 'durations.db', window=3) as store:
+        assert store.ingest([str(tmp_path / 'XUNIT_RESULT_*.xml')]) == 12
+        # ingested already
+        assert store.ingest([str(tmp_path / '**' / 'XUNIT_RESULT_*.xml')]) == 0
+
+        # only the last 3 runs are kept
+        assert store.get('esp32.default.test_foo') == CaseDurationStats(
+            runs=3, p50=30, p95=40, flake_rate=0, last_failed=False
+        )
+        assert store.get('esp32.default.test_bar') == CaseDurationStats(
+            runs=3, p50=1, p95=1, flake_rate=1 / 3, last_failed=False
+        )
+        # always failing, not flaky
+        assert store.get('esp32.default.test_baz') == CaseDurationStats(
+            runs=3, p50=2, p95=2, flake_rate=0, last_failed=True
+        )
+        assert store.get('esp32.default.test_missing') is None
+
+        assert store.durations() == {
+            'esp32.default.test_foo': 30,
+            'esp32.default.test_bar': 1,
+            'esp32.default.test_baz': 2,
+        }
+
+
+def test_duration_store_stats_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(durations, '_QUERY_BATCH_SIZE', 2)
+    _write_junit(
+        tmp_path / 'XUNIT_RESULT.xml',
+        *(f'<testcase name="esp32.default.test_{i}" time="{i}" />' for i in range(5)),
+    )
+
+    with DurationStore(tmp_path / 'durations.db') as store:
+        store.ingest([str(tmp_path / 'XUNIT_RESULT.xml')])
+
+        stats = store.stats(f'esp32.default.test_{i}' for i in [4, 0, 2, 3, 3, 9])
+        assert list(stats) == [f'esp32.default.test_{i}' for i in [0, 2, 3, 4]]
+        assert stats['esp32.default.test_4'].p50 == 4
+        assert store.stats([]) == {}
+
+
+def test_duration_store_export_import(tmp_path):
+    _write_junit(tmp_path / 'old.xml', '<testcase name="esp32.default.test_foo" time="100" />')
+    _write_junit(tmp_path / 'new.xml', '<testcase name="esp32.default.test_foo" time="10" />')
+
+    with DurationStore(tmp_path / 'a.db') as store:
+        store.ingest([str(tmp_path / 'old.xml')])
+        store.export_store(tmp_path / 'exported.db')
+
+    with DurationStore(tmp_path / 'b.db', window=1) as store:
+        store.ingest([str(tmp_path / 'new.xml')])
+        assert store.import_store(tmp_path / 'exported.db') == 1
+
+        # imported results are older
+        assert store.durations() == {'esp32.default.test_foo': 10}
+        # and the imported reports are not ingested again
+        assert store.ingest([str(tmp_path / '*.xml')]) == 0
+
+
+def test_durations_cli(runner, tmp_path):
+    _write_junit(tmp_path / 'XUNIT_RESULT.xml', '<testcase name="esp32.default.test_foo" time="5" />')
+    store = str(tmp_path / 'durations.db')
+
+    result = runner.invoke(click_cli, ['test', 'durations', '--store', store, 'ingest', str(tmp_path / '*.xml')])
+    assert result.exit_code == 0, result.output
+    assert 'Ingested 1 test case results' in result.output
+
+    result = runner.invoke(click_cli, ['test', 'durations', '--store', store, 'show', '--format', 'json'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == {
+        'esp32.default.test_foo': {'runs': 1, 'p50': 5.0, 'p95': 5.0, 'flake_rate': 0.0, 'last_failed': False},
+    }
+
+    result = runner.invoke(click_cli, ['test', 'durations', '--store', store, 'export', str(tmp_path / 'exported.db')])
+    assert result.exit_code == 0, result.output
+
+    imported = str(tmp_path / 'imported.db')
+    result = runner.invoke(
+        click_cli,
+        ['test', 'durations', '--store', imported, 'import', '--window', '1', str(tmp_path / 'exported.db')],
+    )
+    assert result.exit_code == 0, result.output
+    assert 'Imported 1 test case results' in result.output
+
+    # missing stores are not created
+    for args in (
+        ['--store', str(tmp_path / 'missing.db'), 'export', str(tmp_path / 'out.db')],
+        ['--store', store, 'import', str(tmp_path / 'missing.db')],
+    ):
+        result = runner.invoke(click_cli, ['test', 'durations', *args])
+        assert result.exit_code != 0
+        assert 'does not exist' in result.output
+    assert not (tmp_path / 'missing.db').exists()
@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+import subprocess
+
+from idf_ci.idf_gitlab import pipeline as pipeline_module
+from idf_ci.idf_gitlab.generation_cache import GenerationCache
+from idf_ci.idf_pytest import PytestApp, PytestCaseRecord
+from idf_ci.settings import _refresh_ci_settings
+
+
+def test_generation_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    outputs = ['pipeline.yml', 'nodes', 'missing.txt']
+
+    cache = GenerationCache('cache', 'abc')
+    assert cache.restore(outputs) is False
+
+    (tmp_path / 'pipeline.yml').write_text('generated')
+    (tmp_path / 'nodes').mkdir()
+    (tmp_path / 'nodes' / 'job.txt').write_text('nodes')
+    cache.store(outputs)
+
+    (tmp_path / 'pipeline.yml').write_text('stale')
+    (tmp_path / 'nodes' / 'stale.txt').write_text('')
+    (tmp_path / 'missing.txt').write_text('stale')
+    assert cache.restore(outputs) is True
+    assert (tmp_path / 'pipeline.yml').read_text() == 'generated'
+    assert sorted(p.name for p in (tmp_path / 'nodes').iterdir()) == ['job.txt']
+    assert not (tmp_path / 'missing.txt').exists()
+
+    # different outputs
+    assert cache.restore(['pipeline.yml']) is False
+
+
+def test_test_child_pipeline_generation_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('CHANGED_FILES_SEMICOLON_SEPARATED', raising=False)
+    _refresh_ci_settings(config_overrides={'gitlab': {'test_pipeline': {'generation_cache_dir': 'cache'}}})
+
+    (tmp_path / 'pytest_foo.py').write_text('def test_foo(): pass\n')
+    subprocess.run(['git', 'init', '-q'], check=True)
+    subprocess.run(['git', 'add', '.'], check=True)
+
+    collected = []
+
+    def _get_pytest_cases():
+        collected.append(None)
+        return [
+            PytestCaseRecord(
+                nodeid='pytest_foo.py::test_foo',
+                path='pytest_foo.py',
+                name='test_foo',
+                apps=[PytestApp('app', 'esp32', 'default')],
+                all_markers=['generic'],
+                env_markers=['generic'],
+            )
+        ]
+
+    monkeypatch.setattr(pipeline_module, 'get_pytest_cases', _get_pytest_cases)
+
+    pipeline_module.test_child_pipeline('pipeline.yml')
+    content = (tmp_path / 'pipeline.yml').read_text()
+    assert len(collected) == 1
+
+    # retried
+    (tmp_path / 'pipeline.yml').unlink()
+    pipeline_module.test_child_pipeline('pipeline.yml')
+    assert (tmp_path / 'pipeline.yml').read_text() == content
+    assert len(collected) == 1
+
+    # inputs changed
+    pipeline_module.test_child_pipeline('pipeline.yml', modified_files=['pytest_foo.py'])
+    assert len(collected) == 2
+
+    (tmp_path / 'pytest_foo.py').write_text('def test_bar(): pass\n')
+    subprocess.run(['git', 'add', '.'], check=True)
+    pipeline_module.test_child_pipeline('pipeline.yml')
+    assert len(collected) == 3
+
+
+def test_build_child_pipeline_generation_cache_impact_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('CHANGED_FILES_SEMICOLON_SEPARATED', raising=False)
+    _refresh_ci_settings(
+        config_overrides={
+            'test_impact_index_filepath': 'test_impact_index.json',
+            'gitlab': {'build_pipeline': {'generation_cache_dir': 'cache'}},
+        }
+    )
+    subprocess.run(['git', 'init', '-q'], check=True)
+
+    generated = []
+
+    def _generate_build_child_pipeline(yaml_output, **kwargs):
+        generated.append(None)
+        (tmp_path / yaml_output).write_text('generated')
+
+    monkeypatch.setattr(pipeline_module, '_generate_build_child_pipeline', _generate_build_child_pipeline)
+
+    (tmp_path / 'test_impact_index.json').write_text('{"version": 1}')
+    pipeline_module.build_child_pipeline(yaml_output='pipeline.yml')
+    pipeline_module.build_child_pipeline(yaml_output='pipeline.yml')
+    assert len(generated) == 1
+
+    # a new index downloaded
+    (tmp_path / 'test_impact_index.json').write_text('{"version": 2}')
+    pipeline_module.build_child_pipeline(yaml_output='pipeline.yml')
+    assert len(generated) == 2
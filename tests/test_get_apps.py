@@ -2,17 +2,21 @@
 # SPDX-License-Identifier: Apache-2.0
 import os
 import textwrap
+import typing as t
 from pathlib import Path
+from unittest import mock
 
 import pytest
 from conftest import create_project
-from idf_build_apps import CMakeApp
+from idf_build_apps import CMakeApp, find_apps
 from idf_build_apps.constants import BuildStatus
 from idf_build_apps.manifest import DEFAULT_BUILD_TARGETS
 
 from idf_ci import CiSettings, get_all_apps
+from idf_ci.app_finder import find_apps_by_arguments, find_apps_for_targets
 from idf_ci.cli import click_cli
 from idf_ci.idf_gitlab.pipeline import dump_apps_to_txt
+from idf_ci.scripts import _filter_apps_by_modified_files
 from idf_ci.settings import _refresh_ci_settings
 
 SUPPORTED_TARGETS = [
@@ -356,3 +360,121 @@ class TestGetAllApps:
             'no_test-esp32s3',
             'single_dut-esp32s3',
         ]
+
+
+@pytest.mark.skipif(os.getenv('IDF_PATH') is None, reason='IDF_PATH is set')
+class TestAppIndex:
+    @pytest.fixture(autouse=True)
+    def _setup(self, runner, tmp_path: Path):
+        assert runner.invoke(click_cli, ['build', 'init']).exit_code == 0
+        assert runner.invoke(click_cli, ['test', 'init']).exit_code == 0
+
+        DEFAULT_BUILD_TARGETS.set(SUPPORTED_TARGETS)
+
+        (tmp_path / '.idf_ci.toml').write_text('app_index_filepath = "app_index.json"', encoding='utf-8')
+        _refresh_ci_settings()
+
+        yield
+
+        _refresh_ci_settings()
+
+    @staticmethod
+    def _get_apps(paths):
+        test_related_apps, non_test_related_apps = get_all_apps(paths=[str(p) for p in paths], target='esp32')
+        return sorted(app.to_json() for app in [*test_related_apps, *non_test_related_apps])
+
+    def test_incremental_refresh(self, tmp_path: Path) -> None:
+        create_project('foo', tmp_path / 'a')
+        create_project('bar', tmp_path / 'b')
+        paths = [tmp_path / 'a', tmp_path / 'b']
+
+        with mock.patch('idf_ci.app_index.find_apps_by_arguments', wraps=find_apps_by_arguments) as mock_find_apps:
+            apps = self._get_apps(paths)
+            assert len(apps) == 2
+            assert mock_find_apps.call_count == 2
+            assert (tmp_path / 'app_index.json').is_file()
+
+            mock_find_apps.reset_mock()
+            assert self._get_apps(paths) == apps
+            assert mock_find_apps.call_count == 0
+
+            # only the modified path is searched again
+            create_project('baz', tmp_path / 'b')
+            assert len(self._get_apps(paths)) == 3
+            assert [c.args[0].paths for c in mock_find_apps.call_args_list] == [[str(tmp_path / 'b')]]
+
+            # modified manifest invalidates the whole index
+            mock_find_apps.reset_mock()
+            (tmp_path / '.build-test-rules.yml').write_text('a/foo:\n  disable:\n    - if: IDF_TARGET == "esp32"\n')
+            apps = self._get_apps(paths)
+            assert mock_find_apps.call_count == 2
+            assert len(apps) == 2
+            assert not any('foo' in app for app in apps)
+
+
+@pytest.mark.skipif(os.getenv('IDF_PATH') is None, reason='IDF_PATH is set')
+@pytest.mark.parametrize('target', ['esp32', 'all', 'esp32,esp32s2', 'all,esp32c5', 'esp32c5,esp32'])
+def test_find_apps_for_targets(tmp_path: Path, target: str) -> None:
+    create_project('foo', tmp_path)
+    (tmp_path / 'foo' / 'sdkconfig.ci.a').touch()
+    (tmp_path / 'foo' / 'sdkconfig.ci.b').write_text('CONFIG_IDF_TARGET="esp32s2"\n')
+    create_project('bar', tmp_path)
+    # the nested app is only found for the targets that the outer app is disabled for
+    create_project('outer', tmp_path)
+    create_project('inner', tmp_path / 'outer')
+    (tmp_path / '.build-test-rules.yml').write_text(
+        textwrap.dedent("""
+            bar:
+              enable:
+                - if: IDF_TARGET in ["esp32", "esp32c5"]
+            outer:
+              disable:
+                - if: IDF_TARGET == "esp32"
+            outer/inner:
+              disable:
+                - if: IDF_TARGET == "esp32s2"
+                  temporary: true
+                  reason: skipped
+        """)
+    )
+    kwargs: t.Dict[str, t.Any] = dict(
+        recursive=True,
+        include_skipped_apps=True,
+        config_rules=['sdkconfig.ci=default', 'sdkconfig.ci.*='],
+        manifest_files=[str(tmp_path / '.build-test-rules.yml')],
+    )
+
+    expected = set()
+    for _t in target.split(','):
+        default_build_targets = SUPPORTED_TARGETS if _t == 'all' else [*SUPPORTED_TARGETS, _t]
+        expected.update(find_apps([str(tmp_path)], _t, default_build_targets=default_build_targets, **kwargs))
+
+    apps = find_apps_for_targets([str(tmp_path)], target, default_build_targets=SUPPORTED_TARGETS, **kwargs)
+
+    assert len(apps) == len(set(apps))
+    assert sorted(app.to_json() for app in apps) == sorted(app.to_json() for app in expected)
+    assert any(app.name == 'inner' for app in apps) == ('esp32' in target.split(',') or target.startswith('all'))
+
+
+def test_filter_apps_by_modified_files(tmp_path: Path) -> None:
+    apps = [
+        CMakeApp(str(tmp_path / 'foo'), 'esp32'),
+        CMakeApp(str(tmp_path / 'foo'), 'esp32s2'),
+        CMakeApp(str(tmp_path / 'foo' / 'test_apps' / 'bar'), 'esp32'),
+        CMakeApp(str(tmp_path / 'foobar'), 'esp32'),
+    ]
+
+    def _filter(*files):
+        filtered = _filter_apps_by_modified_files(apps, files)
+        return [(os.path.relpath(app.app_dir, tmp_path), app.target) for app in filtered]
+
+    assert _filter('foo/main/foo.c') == [('foo', 'esp32'), ('foo', 'esp32s2')]
+    # the innermost app owns the file
+    assert _filter(str(tmp_path / 'foo' / 'test_apps' / 'bar' / 'main' / 'bar.c')) == [('foo/test_apps/bar', 'esp32')]
+    assert _filter('foo/test_apps/README.md', 'foobar') == [('foo', 'esp32'), ('foo', 'esp32s2'), ('foobar', 'esp32')]
+    assert _filter('components/foo/foo.c', 'fo') == []
+
+    # owned by the found app not in the filtered apps
+    filtered = _filter_apps_by_modified_files(apps[:2], ['foo/test_apps/bar/main/bar.c'], apps)
+    assert filtered == []
+    assert _filter_apps_by_modified_files(apps[:2], ['foo/test_apps/bar/main/bar.c']) == apps[:2]
@@ -1,13 +1,27 @@
 # SPDX-FileCopyrightText: 2025-2026 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
 
+import os
+import pickle
+import sys
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
+import yaml
 
-from idf_ci import get_pytest_cases
+from idf_ci import PytestCaseRecord, get_pytest_cases
 from idf_ci.cli import click_cli
+from idf_ci.idf_gitlab import pipeline
+from idf_ci.idf_pytest import (
+    GroupedPytestCases,
+    PytestCase,
+    dump_case_records,
+    load_case_records,
+    scripts,
+    static_collector,
+)
 
 
 class TestGetPytestCases:
@@ -193,6 +207,28 @@ class TestGetPytestCases:
         assert cases[0].name == 'test_foo_single'
         assert cases[0].caseid == 'esp32.default.test_foo_single'
 
+    def test_markers_cache(self, tmp_path: Path) -> None:
+        script = tmp_path / 'test_markers_cache.py'
+        script.write_text(self.TEMPLATE_SCRIPT)
+
+        cases = get_pytest_cases(paths=[str(tmp_path)], target='esp32', marker_expr='qemu')
+        assert 'host_test' in cases[0].all_markers  # added by the plugin after the case is created
+        assert cases[0].caseid == 'esp32_qemu.default.test_foo_qemu'
+
+        # cached until invalidated
+        cases[0].item.add_marker(pytest.mark.generic)
+        assert 'generic' not in cases[0].all_markers
+        cases[0].invalidate_markers_cache()
+        assert 'generic' in cases[0].all_markers
+        assert hash(cases[0])
+
+        # added to the module
+        module = cases[0].item.getparent(pytest.Module)
+        assert module is not None
+        module.add_marker(pytest.mark.xfail)
+        cases[0].invalidate_markers_cache()
+        assert 'xfail' in cases[0].all_markers
+
     def test_exclude_dirs(self, tmp_path: Path) -> None:
         script = tmp_path / 'test_exclude_dirs.py'
         script.write_text(self.TEMPLATE_SCRIPT)
@@ -205,3 +241,199 @@ class TestGetPytestCases:
             assert len(cases) == 0
         finally:
             _ci_settings_context.reset(token)
+
+
+class TestStaticCollection:
+    @pytest.fixture(autouse=True)
+    def _setup(self, runner):
+        assert runner.invoke(click_cli, ['test', 'init']).exit_code == 0
+
+        yield
+
+    @staticmethod
+    def _summary(cases):
+        return [
+            (c.item.nodeid, c.caseid, c.target_selector, c.env_selector, [a.build_dir for a in c.apps]) for c in cases
+        ]
+
+    def test_same_as_import(self, tmp_path: Path) -> None:
+        (tmp_path / 'test_template.py').write_text(TestGetPytestCases.TEMPLATE_SCRIPT)
+        (tmp_path / 'test_idf_parametrize.py').write_text(
+            textwrap.dedent("""
+            import pytest
+            from pytest_embedded_idf.utils import idf_parametrize
+
+            CONFIGS = ['foo', 'bar']
+
+            pytestmark = [pytest.mark.generic]
+
+            @pytest.fixture
+            def extra(dut: 'IdfDut') -> str:
+                return 'extra'
+
+            @pytest.mark.parametrize('config', CONFIGS, indirect=True)
+            @idf_parametrize('target', ['esp32', 'esp32s3'], indirect=['target'])
+            def test_configs(dut, extra, config) -> None:
+                pass
+
+            @pytest.mark.parametrize(
+                'count, target', [pytest.param(2, 'esp32|esp32c3', marks=pytest.mark.flaky)], indirect=True
+            )
+            def test_param(dut):
+                pass
+            """)
+        )
+
+        for target in ['all', 'esp32', 'esp32,esp32c3']:
+            assert self._summary(get_pytest_cases(paths=[str(tmp_path)], target=target, static_collection=True)) == (
+                self._summary(get_pytest_cases(paths=[str(tmp_path)], target=target, static_collection=False))
+            )
+
+        cases = get_pytest_cases(paths=[str(tmp_path)], target='esp32', marker_expr='generic', static_collection=True)
+        assert [c.caseid for c in cases] == ['esp32.foo.test_configs', 'esp32.bar.test_configs']
+
+    def test_do_not_import(self, tmp_path: Path) -> None:
+        (tmp_path / 'test_side_effect.py').write_text(
+            textwrap.dedent("""
+            import pytest
+            import not_installed_package
+
+            open('imported', 'w').close()
+
+            @pytest.mark.parametrize('target', ['esp32'], indirect=True)
+            def test_foo(dut):
+                pass
+            """)
+        )
+
+        cases = get_pytest_cases(paths=[str(tmp_path)], target='esp32', static_collection=True)
+        assert [c.caseid for c in cases] == ['esp32.default.test_foo']
+        assert not (tmp_path / 'imported').exists()
+
+    def test_fallback_to_import(self, tmp_path: Path) -> None:
+        (tmp_path / 'test_dynamic.py').write_text(
+            textwrap.dedent("""
+            import pytest
+
+            open('imported', 'w').close()
+
+            def _targets():
+                return ['esp32', 'esp32c3']
+
+            @pytest.mark.parametrize('target', _targets(), indirect=True)
+            def test_foo(dut):
+                pass
+            """)
+        )
+
+        cases = get_pytest_cases(paths=[str(tmp_path)], target='esp32c3', static_collection=True)
+        assert [c.caseid for c in cases] == ['esp32c3.default.test_foo']
+        assert (tmp_path / 'imported').exists()
+
+    def test_fallback_to_import_on_python37(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        (tmp_path / 'test_static.py').write_text(TestGetPytestCases.TEMPLATE_SCRIPT)
+
+        def _build():
+            return static_collector.build_static_module(
+                tmp_path / 'test_static.py', is_test_function=lambda _: True, is_test_class=lambda _: True
+            )
+
+        assert _build() is not None
+
+        monkeypatch.setattr(sys, 'version_info', (3, 7, 17, 'final', 0))
+        assert _build() is None
+
+
+class TestShardedCollection:
+    @pytest.fixture(autouse=True)
+    def _setup(self, runner):
+        assert runner.invoke(click_cli, ['test', 'init']).exit_code == 0
+
+        yield
+
+    def test_same_as_sequential(self, tmp_path: Path) -> None:
+        for folder in ['', 'a', 'a/b', 'c', 'c/d', 'e']:
+            (tmp_path / folder).mkdir(parents=True, exist_ok=True)
+
+        for i, folder in enumerate(['', 'a', 'a/b', 'c/d', 'c/d']):
+            (tmp_path / folder / f'test_script_{i}.py').write_text(TestGetPytestCases.TEMPLATE_SCRIPT)
+
+        def _summary(cases):
+            return [(c.nodeid, c.caseid, c.runner_tags) for c in cases]
+
+        for target in ['all', 'esp32']:
+            sequential = get_pytest_cases(paths=[str(tmp_path)], target=target, workers=1)
+            sharded = get_pytest_cases(paths=[str(tmp_path)], target=target, workers=3)
+            assert sequential
+            assert _summary(sharded) == _summary(sequential)
+
+            # collected in other processes
+            with pytest.raises(AttributeError):
+                sharded[0].item
+
+    def test_env_markers_of_all_shards(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        for folder in ['a', 'b']:
+            (tmp_path / folder).mkdir()
+
+        def _collect_shard(_settings, folder, *_args):
+            return {os.path.basename(folder), 'shared'}, []
+
+        monkeypatch.setattr(scripts, 'ProcessPoolExecutor', ThreadPoolExecutor)
+        monkeypatch.setattr(scripts, '_collect_shard', _collect_shard)
+        monkeypatch.setattr(PytestCase, 'KNOWN_ENV_MARKERS', set())
+
+        scripts._collect_pytest_cases_sharded([str(tmp_path)], workers=2, additional_args=[], collect_kwargs={})
+        # the root folder is collected in its own shard, without the sub folders
+        assert PytestCase.KNOWN_ENV_MARKERS == {tmp_path.name, 'a', 'b', 'shared'}
+
+
+class TestPytestCaseRecord:
+    @pytest.fixture(autouse=True)
+    def _setup(self, runner):
+        assert runner.invoke(click_cli, ['test', 'init']).exit_code == 0
+
+        yield
+
+    def test_same_as_case(self, tmp_path: Path) -> None:
+        (tmp_path / 'test_record.py').write_text(
+            textwrap.dedent("""
+            import pytest
+
+            @pytest.mark.generic
+            @pytest.mark.temp_skip_ci(targets=['esp32c3'], reason='not supported yet')
+            @pytest.mark.parametrize('count, target, config', [
+                (2, 'esp32|esp32c3', 'foo'),
+                (1, 'esp32', 'bar'),
+            ], indirect=True)
+            def test_foo(dut):
+                pass
+            """)
+        )
+
+        cases = get_pytest_cases(paths=[str(tmp_path)])
+        records = [PytestCaseRecord.from_case(c) for c in cases]
+        assert len(records) == 2
+
+        for case, record in zip(cases, records):
+            assert record.nodeid == case.item.nodeid
+            assert record.caseid == case.caseid
+            assert record.runner_tags == case.runner_tags
+            assert record.env_selector == case.env_selector == 'generic'
+            assert record.skipped_targets() == case.skipped_targets() == {'esp32c3': 'not supported yet'}
+            assert record.get_skip_reason_if_not_built([]) == case.get_skip_reason_if_not_built([])
+
+        with pytest.raises(AttributeError):
+            records[0].name = 'bar'
+        with pytest.raises(TypeError):
+            records[0]._skipped_targets['esp32'] = 'foo'  # type: ignore[index]
+        assert records[0].targets == ('esp32', 'esp32c3')
+        assert pickle.loads(pickle.dumps(records[0])) == records[0]
+
+        dump_case_records(records, str(tmp_path / 'cases.json'))
+        assert load_case_records(str(tmp_path / 'cases.json')) == records
+
+        assert GroupedPytestCases(records).output_as_github_ci() == GroupedPytestCases(cases).output_as_github_ci()
+
+        pipeline.test_child_pipeline(str(tmp_path / 'pipeline.yml'), cases=GroupedPytestCases(records))
+        jobs = yaml.safe_load((tmp_path / 'pipeline.yml').read_text())
+        assert jobs['esp32 - generic']['variables']['nodes'] == f"'{records[1].nodeid}'"
@@ -8,8 +8,11 @@ import yaml
 from jinja2 import Environment
 
 from idf_ci.idf_gitlab import ArtifactManager
-from idf_ci.idf_gitlab.pipeline import _parallel_count
+from idf_ci.idf_gitlab import pipeline as pipeline_module
+from idf_ci.idf_gitlab.pipeline import _parallel_count, _plan_parallel_count, _split_cases_by_duration
 from idf_ci.idf_gitlab.scripts import pipeline_variables
+from idf_ci.idf_pytest import GroupedPytestCases, PytestApp, PytestCaseRecord
+from idf_ci.idf_pytest.durations import CaseDurationStats, load_junit_durations
 from idf_ci.settings import CiSettings, _refresh_ci_settings
 
 
@@ -279,3 +282,241 @@ def test_generate_test_child_pipeline_forwards_empty_suffixes():
 )
 def test_parallel_count(item_count, runs_per_job, expected):
     assert _parallel_count(item_count, runs_per_job) == expected
+
+
+def _record(name: str, target: str = 'esp32') -> PytestCaseRecord:
+    return PytestCaseRecord(
+        nodeid=f'test_foo.py::{name}',
+        path='test_foo.py',
+        name=name,
+        apps=[PytestApp('app', target, 'default')],
+        all_markers=['generic'],
+        env_markers=['generic'],
+    )
+
+
+def test_split_cases_by_duration():
+    cases = [_record(f'test_{i}') for i in range(6)]
+    durations = {'esp32.default.test_0': 50, 'esp32.default.test_1': 40, 'esp32.default.test_2': 30}
+
+    # 50 + 40 + 30 + 3 * 10, in 3 jobs
+    jobs = _split_cases_by_duration(cases, durations, target_duration=60, max_cases_per_job=30, default_duration=10)
+    assert [[c.name for c in job] for job in jobs] == [
+        ['test_0'],
+        ['test_1', 'test_4'],
+        ['test_2', 'test_3', 'test_5'],
+    ]
+
+    # limited by the number of cases per job
+    jobs = _split_cases_by_duration(cases, {}, target_duration=1000, max_cases_per_job=2, default_duration=10)
+    assert [len(job) for job in jobs] == [2, 2, 2]
+
+    assert _split_cases_by_duration([], {}, target_duration=1, max_cases_per_job=1, default_duration=1) == []
+
+
+def test_load_junit_durations(tmp_path):
+    (tmp_path / 'XUNIT_RESULT_1.xml').write_text(
+        """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest">
+<testcase classname="test_foo" name="esp32.default.test_foo" time="10.0" />
+<testcase classname="test_foo" name="esp32.default.test_bar" time="5.5"><failure message="x" /></testcase>
+<testcase classname="test_foo" name="esp32.default.test_skipped" time="0.1"><skipped message="x" /></testcase>
+</testsuite></testsuites>
+"""
+    )
+    (tmp_path / 'XUNIT_RESULT_2.xml').write_text(
+        '<testsuite><testcase name="esp32.default.test_foo" time="20.0" /></testsuite>'
+    )
+    (tmp_path / 'XUNIT_RESULT_3.xml').write_text('<testsuite>')
+
+    assert load_junit_durations([str(tmp_path / 'XUNIT_RESULT_*.xml')]) == {
+        'esp32.default.test_foo': 15.0,
+        'esp32.default.test_bar': 5.5,
+    }
+
+
+def test_child_pipeline_split_by_duration(tmp_path):
+    _refresh_ci_settings(config_overrides={'gitlab': {'test_pipeline': {'job_target_duration': 100}}})
+
+    cases = GroupedPytestCases([_record('test_0'), _record('test_1'), _record('test_2', 'esp32s2')])
+    pipeline_module.test_child_pipeline(
+        str(tmp_path / 'pipeline.yml'),
+        cases=cases,
+        durations={'esp32.default.test_0': 90, 'esp32.default.test_1': 30},
+    )
+    jobs = yaml.safe_load((tmp_path / 'pipeline.yml').read_text())
+
+    assert jobs['esp32 - generic 1/2']['variables']['nodes'] == "'test_foo.py::test_0'"
+    assert jobs['esp32 - generic 2/2']['variables']['nodes'] == "'test_foo.py::test_1'"
+    assert jobs['esp32s2 - generic']['variables']['nodes'] == "'test_foo.py::test_2'"
+    assert 'parallel' not in jobs['esp32 - generic 1/2']
+
+
+@pytest.mark.parametrize(
+    'durations, runner_count, startup_overhead, expected',
+    [
+        # startup overhead dominates
+        ([10] * 4, 1, 60, (1, 100)),
+        ([10] * 4, 10, 60, (4, 70)),
+        # limited by the longest one
+        ([100, 10, 10, 10], 10, 10, (2, 110)),
+        # limited by the runners
+        ([100] * 10, 3, 10, (3, 1030 / 3)),
+        ([100] * 10, 10, 10, (10, 110)),
+    ],
+)
+def test_plan_parallel_count(durations, runner_count, startup_overhead, expected):
+    assert _plan_parallel_count(durations, runner_count, startup_overhead) == pytest.approx(expected)
+
+
+def test_child_pipeline_parallel_by_runners(tmp_path):
+    _refresh_ci_settings(
+        config_overrides={
+            'gitlab': {'test_pipeline': {'runner_counts': {'esp32,generic': 2}, 'job_startup_overhead': 10}}
+        }
+    )
+
+    cases = GroupedPytestCases([_record(f'test_{i}') for i in range(4)] + [_record('test_4', 'esp32s2')])
+    pipeline_module.test_child_pipeline(str(tmp_path / 'pipeline.yml'), cases=cases)
+    content = (tmp_path / 'pipeline.yml').read_text()
+    jobs = yaml.safe_load(content)
+
+    # default case duration 60s, 4 cases on 2 runners
+    assert content.startswith(
+        '# Parallel jobs chosen by the available runners:\n'
+        '#   esp32 - generic: 4 items, 240s in total, 2 runners -> parallel 2, expected 130s\n'
+    )
+    assert jobs['esp32 - generic']['parallel'] == 2
+    # no runners configured
+    assert 'parallel' not in jobs['esp32s2 - generic']
+
+    pipeline_module.test_child_pipeline(
+        str(tmp_path / 'pipeline.yml'),
+        cases=cases,
+        durations={'esp32.default.test_0': 200, 'esp32.default.test_1': 50},
+    )
+    jobs = yaml.safe_load((tmp_path / 'pipeline.yml').read_text())
+    # test_2 and test_3 are counted as the median, 125s. shorter ones first
+    assert jobs['esp32 - generic 1/2']['variables']['nodes'] == "'test_foo.py::test_1' 'test_foo.py::test_0'"
+    assert jobs['esp32 - generic 2/2']['variables']['nodes'] == "'test_foo.py::test_2' 'test_foo.py::test_3'"
+
+
+def test_child_pipeline_fail_fast_ordering(tmp_path):
+    _refresh_ci_settings()
+
+    cases = [_record(f'test_{i}') for i in range(5)]
+    cases.append(
+        PytestCaseRecord(
+            nodeid='modified/test_bar.py::test_bar',
+            path='modified/test_bar.py',
+            name='test_bar',
+            apps=[PytestApp('app', 'esp32', 'default')],
+            all_markers=['generic'],
+            env_markers=['generic'],
+        )
+    )
+    case_stats = {
+        'esp32.default.test_0': CaseDurationStats(runs=5, p50=50, p95=60, flake_rate=0, last_failed=False),
+        'esp32.default.test_1': CaseDurationStats(runs=5, p50=40, p95=60, flake_rate=0, last_failed=False),
+        'esp32.default.test_2': CaseDurationStats(runs=5, p50=90, p95=90, flake_rate=0.2, last_failed=False),
+        'esp32.default.test_3': CaseDurationStats(runs=5, p50=99, p95=99, flake_rate=0.2, last_failed=True),
+    }
+
+    def _nodes(**kwargs):
+        pipeline_module.test_child_pipeline(
+            str(tmp_path / 'pipeline.yml'),
+            cases=GroupedPytestCases(cases),
+            case_stats=case_stats,
+            modified_files=['modified/test_bar.py', 'modified/README.md'],
+            **kwargs,
+        )
+        jobs = yaml.safe_load((tmp_path / 'pipeline.yml').read_text())
+        return [n.strip("'").split('::')[1] for n in jobs['esp32 - generic']['variables']['nodes'].split()]
+
+    # test_4 is counted as the median duration, 70s
+    assert _nodes() == ['test_3', 'test_2', 'test_bar', 'test_1', 'test_0', 'test_4']
+
+    _refresh_ci_settings(config_overrides={'gitlab': {'test_pipeline': {'fail_fast_ordering': False}}})
+    assert _nodes() == ['test_0', 'test_1', 'test_2', 'test_3', 'test_4', 'test_bar']
+
+
+def test_build_child_pipeline_excludes_cached_builds(tmp_path, monkeypatch):
+    from idf_build_apps import App
+
+    monkeypatch.chdir(tmp_path)
+    _refresh_ci_settings(config_overrides={'gitlab': {'build_pipeline': {'runs_per_job': 2, 'build_cache': True}}})
+
+    apps = [App(f'app_{i}', 'esp32') for i in range(5)]
+    monkeypatch.setattr(pipeline_module, 'get_all_apps', lambda **kwargs: (apps, []))
+    monkeypatch.setattr(
+        pipeline_module, 'find_cached_builds', lambda _apps: {0: 'abc', 1: 'abc', 2: 'abc'} if _apps else {}
+    )
+
+    pipeline_module.build_child_pipeline(yaml_output='pipeline.yml')
+    jobs = yaml.safe_load((tmp_path / 'pipeline.yml').read_text())
+    # 2 apps to build
+    assert 'parallel' not in jobs['build_test_related_apps']
+
+    monkeypatch.setattr(pipeline_module, 'find_cached_builds', lambda _apps: {i: 'abc' for i in range(len(_apps))})
+    pipeline_module.build_child_pipeline(yaml_output='pipeline.yml')
+    jobs = yaml.safe_load((tmp_path / 'pipeline.yml').read_text())
+    # still a job to download the cached builds
+    assert 'build_test_related_apps' in jobs
+
+
+def test_write_pipeline_yaml():
+    import io
+
+    settings = CiSettings()
+    jobs = [{'name': f'job_{i}', 'tags': ['esp32'], 'nodes': f'"\'test_{i}\'"', 'parallel_count': 1} for i in range(3)]
+    context = {'default_template': 'template:', 'settings': settings}
+
+    fw = io.StringIO()
+    pipeline_module._write_pipeline_yaml(
+        fw, settings.gitlab.test_pipeline.yaml_jinja, settings.gitlab.test_pipeline.jobs_jinja, context, {'jobs': jobs}
+    )
+    # same as rendering the jobs within the pipeline YAML template
+    assert fw.getvalue() == Environment().from_string(settings.gitlab.test_pipeline.yaml_jinja).render(
+        jobs=Environment().from_string(settings.gitlab.test_pipeline.jobs_jinja).render(jobs=jobs, **context),
+        **context,
+    )
+
+    # customized templates
+    fw = io.StringIO()
+    pipeline_module._write_pipeline_yaml(
+        fw, '{{ jobs }}\n---\n{{ jobs }}', '{{ jobs | length }} jobs', {}, {'jobs': jobs}
+    )
+    assert fw.getvalue() == '3 jobs\n---\n3 jobs'
+
+    fw = io.StringIO()
+    pipeline_module._write_pipeline_yaml(fw, 'no jobs', '{{ jobs | length }} jobs', {}, {'jobs': jobs})
+    assert fw.getvalue() == 'no jobs'
+
+    # filtered jobs are not streamed
+    fw = io.StringIO()
+    pipeline_module._write_pipeline_yaml(
+        fw, 'jobs:\n  {{ jobs | indent(2) }}', '{% for job in jobs %}{{ job.name }}:\n{% endfor %}', {}, {'jobs': jobs}
+    )
+    assert fw.getvalue() == 'jobs:\n  job_0:\n  job_1:\n  job_2:\n'
+
+    fw = io.StringIO()
+    pipeline_module._write_pipeline_yaml(fw, '{{ jobs | upper }}', '{{ jobs | length }} jobs', {}, {'jobs': jobs})
+    assert fw.getvalue() == '3 JOBS'
+
+
+def test_child_pipeline_nodes_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _refresh_ci_settings(config_overrides={'gitlab': {'test_pipeline': {'nodes_file_threshold': 30}}})
+    (tmp_path / 'test_nodes').mkdir()
+    (tmp_path / 'test_nodes' / 'stale.txt').write_text('')
+
+    cases = GroupedPytestCases([_record('test_0'), _record('test_1'), _record('test_2', 'esp32s2')])
+    pipeline_module.test_child_pipeline('pipeline.yml', cases=cases)
+    jobs = yaml.safe_load((tmp_path / 'pipeline.yml').read_text())
+
+    assert jobs['esp32 - generic']['variables'] == {'nodes_file': 'test_nodes/0_esp32_generic.txt'}
+    assert (tmp_path / 'test_nodes' / '0_esp32_generic.txt').read_text() == (
+        "'test_foo.py::test_0' 'test_foo.py::test_1'\n"
+    )
+    assert jobs['esp32s2 - generic']['variables'] == {'nodes': "'test_foo.py::test_2'"}
+    assert sorted(os.listdir(tmp_path / 'test_nodes')) == ['0_esp32_generic.txt']
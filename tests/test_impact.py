@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2026 Espressif Systems (Shanghai) CO LTD
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+import pytest
+
+from idf_ci.cli import click_cli
+from idf_ci.idf_pytest import PytestApp, PytestCaseRecord
+from idf_ci.idf_pytest.impact import TestImpactIndex, build_test_impact_index
+
+IDF_PATH = '/builds/espressif/esp-idf'
+
+
+def _write_project_description(tmp_path, app: str, components: dict) -> None:
+    build_dir = tmp_path / app / 'build_esp32_default'
+    build_dir.mkdir(parents=True)
+    (build_dir / 'project_description.json').write_text(
+        json.dumps(
+            {
+                'project_name': app,
+                'project_path': f'{IDF_PATH}/{app}',
+                'build_dir': f'{IDF_PATH}/{app}/build_esp32_default',
+                'idf_path': IDF_PATH,
+                'target': 'esp32',
+                'build_component_info': {
+                    name: {
+                        'dir': f'{IDF_PATH}/components/{name}',
+                        'sources': [f'{IDF_PATH}/components/{name}/{src}' for src in srcs],
+                    }
+                    for name, srcs in components.items()
+                },
+            }
+        )
+    )
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch) -> TestImpactIndex:
+    monkeypatch.chdir(tmp_path)
+    _write_project_description(tmp_path, 'foo', {'esp_wifi': ['wifi.c'], 'driver': ['gpio.c']})
+    _write_project_description(tmp_path, 'bar', {'driver': ['gpio.c', 'uart.c']})
+
+    index = build_test_impact_index(['**/build*/project_description.json'])
+    index.dump('index.json')
+    return TestImpactIndex.load('index.json')
+
+
+@pytest.mark.parametrize(
+    'modified_files, expected',
+    [
+        (['components/driver/uart.c'], {'bar'}),
+        (['components/driver/gpio.c'], {'foo', 'bar'}),
+        # not built for esp32
+        (['components/driver/esp32s2/gpio.c'], set()),
+        # headers and build scripts may affect all the apps using the component
+        (['components/driver/include/gpio.h'], {'foo', 'bar'}),
+        (['components/esp_wifi/CMakeLists.txt'], {'foo'}),
+        (['foo/sdkconfig.defaults'], {'foo'}),
+    ],
+)
+def test_is_impacted(index, modified_files, expected):
+    assert {app for app in ['foo', 'bar'] if index.is_impacted(f'{app}/build_esp32_default', modified_files)} == (
+        expected
+    )
+
+
+@pytest.mark.parametrize(
+    'modified_files',
+    [
+        ['conftest.py'],
+        ['pytest.ini'],
+        ['.idf_ci.toml'],
+        ['tools/ci/idf_pytest/plugin.py'],
+        ['README.md'],
+        # not a component of any indexed app
+        ['components/esp_system/startup.c'],
+        ['components/driver/esp32s2/gpio.c', 'conftest.py'],
+    ],
+)
+def test_is_impacted_outside_component_dirs(index, modified_files):
+    assert index.is_impacted('foo/build_esp32_default', modified_files) is None
+    assert index.is_impacted('bar/build_esp32_default', modified_files) is None
+    # known dependencies still count
+    assert index.is_impacted('bar/build_esp32_default', [*modified_files, 'components/driver/uart.c']) is True
+    assert index.is_impacted('foo/build_esp32_default', ['components/driver/esp32s2/gpio.c']) is False
+
+
+def test_filter_cases(index):
+    def _case(name, *app_paths):
+        return PytestCaseRecord(
+            nodeid=f'test.py::{name}',
+            path='test.py',
+            name=name,
+            apps=[PytestApp(p, 'esp32', 'default') for p in app_paths],
+            all_markers=['generic'],
+            env_markers=['generic'],
+        )
+
+    cases = [_case('test_foo', 'foo'), _case('test_bar', 'bar'), _case('test_both', 'foo', 'bar'), _case('new', 'baz')]
+
+    # apps not in the index are always impacted
+    assert [c.name for c in index.filter_cases(cases, ['components/esp_wifi/wifi.c'])] == [
+        'test_foo',
+        'test_both',
+        'new',
+    ]
+    assert [c.name for c in index.filter_cases(cases, None, ['driver'])] == ['test_foo', 'test_bar', 'test_both', 'new']
+
+    # may affect any test case
+    assert index.filter_cases(cases, ['conftest.py']) == cases
+    assert index.filter_cases(cases, ['tools/ci/check_build.py', 'components/esp_wifi/wifi.c']) == cases
+
+
+def test_impact_index_cli(runner, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_project_description(tmp_path, 'foo', {'esp_wifi': ['wifi.c']})
+
+    result = runner.invoke(click_cli, ['test', 'impact-index', '-o', 'index.json'])
+    assert result.exit_code == 0, result.output
+    assert 'Created test impact index of 1 apps' in result.output
+    assert TestImpactIndex.load('index.json').is_impacted('foo/build_esp32_default', ['components/esp_wifi/wifi.c'])
@@ -1,5 +1,6 @@
 # SPDX-FileCopyrightText: 2025-2026 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
+import json
 import os
 
 from conftest import create_project
@@ -43,6 +44,52 @@ class TestPytestPlugin:
         res = pytester.runpytest('--target', 'esp32', '--log-cli-level', 'DEBUG', '-s')
         res.assert_outcomes(errors=2, deselected=1)
 
+    def test_deselect_reasons(self, pytester, runner, monkeypatch):
+        assert runner.invoke(click_cli, ['test', 'init', '--path', pytester.path]).exit_code == 0
+
+        create_project('app1', pytester.path)
+        create_project('app2', pytester.path)
+
+        pytester.maketxtfile(
+            app_info_mock="""
+            {"app_dir": "app1", "target": "esp32", "config_name": "default", "build_dir": "build_esp32_default", "build_system": "cmake", "build_status": "build success"}
+            """  # noqa: E501
+        )
+        pytester.makeconftest("""
+                import json
+
+                from idf_ci.idf_pytest import IDF_CI_PYTEST_DEBUG_INFO_KEY
+
+                def pytest_deselected(items):
+                    with open('deselected.json', 'a') as fw:
+                        for item in items:
+                            fw.write(json.dumps(item.stash[IDF_CI_PYTEST_DEBUG_INFO_KEY]['deselect_reason']) + '\\n')
+            """)
+        pytester.makepyfile("""
+                import pytest
+
+                @pytest.mark.parametrize('target', ['esp32', 'esp32s2'], indirect=True)
+                @pytest.mark.parametrize('app_path', ['app1', 'app2'], indirect=True)
+                def test_deselect(dut):
+                    pass
+
+                @pytest.mark.nightly_run
+                @pytest.mark.parametrize('target', ['esp32'], indirect=True)
+                def test_nightly(dut):
+                    pass
+            """)
+
+        monkeypatch.setenv('CI', '1')
+        res = pytester.runpytest('--target', 'esp32', '--collect-only')
+        res.assert_outcomes(deselected=4)
+
+        with open(pytester.path / 'deselected.json') as fr:
+            reasons = [json.loads(line) for line in fr]
+
+        assert sorted(r['filter'] for r in reasons) == ['app_list', 'nightly_run', 'target', 'target']
+        app_list_reason = next(r for r in reasons if r['filter'] == 'app_list')
+        assert app_list_reason['missing_build_dirs'] == [str(pytester.path / 'app2' / 'build_esp32_default')]
+
     def test_env_markers(self, pytester, runner):
         assert runner.invoke(click_cli, ['test', 'init', '--path', pytester.path]).exit_code == 0
         pytester.makepyfile("""
@@ -3,12 +3,15 @@
 
 import os
 import re
+from unittest import mock
 
 import pytest
 from esp_bool_parser.constants import ALL_TARGETS
+from pydantic import ValidationError
 
+from idf_ci import settings as settings_module
 from idf_ci.cli import click_cli
-from idf_ci.settings import CiSettings, DeprecatedConfigWarning
+from idf_ci.settings import CiSettings, DeprecatedConfigWarning, get_ci_settings, pick_toml_file
 
 
 def test_test_pipeline_job_before_script_extra_default():
@@ -36,6 +39,18 @@ def test_test_pipeline_job_before_script_extra_from_config():
     ]
 
 
+def test_test_pipeline_no_build_only_settings():
+    """Settings of the build jobs are overridden as unused by the test pipeline."""
+    settings = CiSettings()
+    test_pipeline_dump = settings.gitlab.test_pipeline.model_dump()
+    for name in ['default_app_duration', 'duration_filename', 'app_shards_filepath', 'build_cache']:
+        assert name in settings.gitlab.build_pipeline.model_dump()
+        assert name not in test_pipeline_dump
+
+    with pytest.raises(ValidationError, match='only used by the build child pipeline'):
+        CiSettings.model_validate({'gitlab': {'test_pipeline': {'build_cache': True}}})
+
+
 def test_default_component_mapping_regexes():
     expected_regexes = [
         '/components/(.+?)/',
@@ -159,6 +174,32 @@ def test_component_mapping_with_absolute_paths():
     assert components == {'wifi'}
 
 
+def test_component_mapper_cached():
+    assert CiSettings().component_mapper is CiSettings().component_mapper
+
+    settings = CiSettings(extend_component_ignored_file_extensions=['.txt'])
+    assert settings.component_mapper is not CiSettings().component_mapper
+    assert '.txt' in settings.component_mapper.ignored_file_extensions
+
+
+@pytest.mark.parametrize(
+    'mapping_regexes',
+    [
+        ['/components/(.+?)/', '/vendor/(.+?)/'],
+        # not mergeable, searched one by one
+        ['/components/(.+?)/', '(?i)/VENDOR/(.+?)/'],
+    ],
+)
+def test_component_mapper_leftmost_match(mapping_regexes):
+    mapper = CiSettings(component_mapping_regexes=mapping_regexes).component_mapper
+
+    assert mapper.get_component('/a/components/foo/vendor/bar/x.c') == 'foo'
+    assert mapper.get_component('/a/vendor/bar/components/foo/x.c') == 'bar'
+    assert mapper.get_component('/a/components/foo/test_apps/x.c') is None
+    assert mapper.get_component('/a/components/foo/README.md') is None
+    assert mapper.get_component('/a/other/x.c') is None
+
+
 def test_ci_config_file_option(tmp_path, runner):
     custom_config = tmp_path / 'custom_ci_config.toml'
     with open(custom_config, 'w') as f:
@@ -221,6 +262,52 @@ zip_first = true
     assert type(flash_zip_first) is bool
 
 
+def test_config_file_lookup_cached(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    os.chdir(tmp_path / 'sub')
+    assert pick_toml_file('.idf_ci.toml') is None
+
+    # created in the current folder, or removed
+    (tmp_path / 'sub' / '.idf_ci.toml').write_text('exclude_dirs = ["a"]\n')
+    assert pick_toml_file('.idf_ci.toml') == tmp_path / 'sub' / '.idf_ci.toml'
+    assert CiSettings().exclude_dirs == ['a']
+    assert CiSettings().project_root == tmp_path / 'sub'
+
+    (tmp_path / '.idf_ci.toml').write_text('exclude_dirs = ["b"]\n')
+    (tmp_path / 'sub' / '.idf_ci.toml').unlink()
+    assert pick_toml_file('.idf_ci.toml') == tmp_path / '.idf_ci.toml'
+    assert CiSettings().exclude_dirs == ['b']
+
+    # created in a parent folder, the current folder is not modified
+    (tmp_path / '.idf_ci.toml').unlink()
+    assert pick_toml_file(None) is None
+    (tmp_path / '.idf_ci.toml').write_text('exclude_dirs = ["c"]\n')
+    assert pick_toml_file(None) == tmp_path / '.idf_ci.toml'
+    assert CiSettings().exclude_dirs == ['c']
+
+    # folders are ignored
+    (tmp_path / 'sub' / '.idf_ci.toml').mkdir()
+    assert pick_toml_file('.idf_ci.toml') == tmp_path / '.idf_ci.toml'
+    assert CiSettings().exclude_dirs == ['c']
+
+    # the picked file is not searched again
+    with mock.patch.object(settings_module, '_find_toml_file', side_effect=AssertionError):
+        assert pick_toml_file('.idf_ci.toml') == tmp_path / '.idf_ci.toml'
+
+
+def test_default_ci_settings_lazy(monkeypatch):
+    monkeypatch.setattr(settings_module, '_default_ci_settings', None)
+
+    settings = get_ci_settings()
+    assert get_ci_settings() is settings
+
+    token = settings_module._ci_settings_context.set(CiSettings())
+    try:
+        assert get_ci_settings() is not settings
+    finally:
+        settings_module._ci_settings_context.reset(token)
+
+
 def test_ci_profile_not_specified(runner):
     original_config_path = CiSettings.CONFIG_FILE_PATH
     with runner.isolated_filesystem() as tmp_d:
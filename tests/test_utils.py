@@ -1,11 +1,13 @@
 # SPDX-FileCopyrightText: 2025-2026 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
 
+import os
 import sys
+from pathlib import Path
 
 import pytest
 
-from idf_ci.utils import remove_subfolders
+from idf_ci.utils import canonical_path, lpt_partition, project_relative_path, remove_subfolders
 
 
 @pytest.mark.parametrize(
@@ -24,3 +26,31 @@ def test_remove_subfolders(tmp_path, relpaths, expected_relpaths):
         paths.append(str(dir_path))
     expected = [(tmp_path / rel) for rel in expected_relpaths]
     assert remove_subfolders(paths) == expected
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Using Unix paths')
+def test_canonical_path(tmp_path):
+    assert canonical_path('a/../b/./c/') == f'{tmp_path}/b/c'
+    assert canonical_path(Path('/x//y/../z')) == '/x/z'
+    # cached per working directory
+    (tmp_path / 'sub').mkdir()
+    os.chdir(tmp_path / 'sub')
+    assert canonical_path('a') == f'{tmp_path}/sub/a'
+
+    assert project_relative_path('a/b', tmp_path) == 'sub/a/b'
+    assert project_relative_path(tmp_path, tmp_path) == '.'
+    assert project_relative_path('/x/y', tmp_path) == '/x/y'
+    assert project_relative_path(f'{tmp_path}2/a', tmp_path) == f'{tmp_path}2/a'
+
+
+@pytest.mark.parametrize(
+    'costs,bin_count,max_items_per_bin,expected',
+    [
+        ([5, 4, 3, 3, 3], 2, None, [[0, 3], [1, 2, 4]]),
+        ([1, 1, 1, 1, 10], 2, None, [[4], [0, 1, 2, 3]]),
+        ([1, 1, 1, 1, 10], 2, 3, [[3, 4], [0, 1, 2]]),
+        ([], 2, None, [[], []]),
+    ],
+)
+def test_lpt_partition(costs, bin_count, max_items_per_bin, expected):
+    assert lpt_partition(costs, bin_count, max_items_per_bin=max_items_per_bin) == expected